@@ -2,13 +2,15 @@ import os
 import json
 import hashlib
 import secrets
-from datetime import datetime, timedelta
+from datetime import timedelta
 from flask import Flask, request, jsonify
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
 import stripe
 import google.generativeai as genai
 from dotenv import load_dotenv
+from auth_storage import open_repository, public_user, utc_now_iso
+from auth_stats import SERIES_DAYS, MAX_SERIES_DAYS
+from password_hashing import PasswordHasher, HasherBusy, RETRY_AFTER_SECONDS
 
 load_dotenv()
 
@@ -37,56 +39,34 @@ stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
 genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
 model = genai.GenerativeModel('gemini-pro')
 
-# User data storage (in production, use a proper database)
-USERS_FILE = 'users.json'
-ONBOARDING_FILE = 'onboarding_data.json'
+# User data storage: 'json' for users.json / onboarding_data.json, or a database URL
+# (sqlite:///..., postgresql://...) once migrate_auth_data.py has copied the files over
+AUTH_STORAGE = os.getenv('AUTH_STORAGE', 'json')
+storage = open_repository(app, AUTH_STORAGE)
 
-def load_users():
-    try:
-        with open(USERS_FILE, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-
-def save_users(users):
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2)
+# Password hashing runs in a bounded process pool; see password_hashing.py for its settings
+hasher = PasswordHasher()
 
 def create_admin_user():
     """Create admin user if it doesn't exist"""
-    users = load_users()
     admin_email = 'admin@projectx.com'
     admin_password = 'password123'
     
-    if admin_email not in users:
-        users[admin_email] = {
-            'id': 'admin_user_001',
-            'email': admin_email,
-            'password_hash': generate_password_hash(admin_password),
-            'created_at': datetime.now().isoformat(),
-            'payment_completed': True,
-            'is_admin': True,
-            'role': 'admin'
-        }
-        save_users(users)
+    if storage.add_user({
+        'id': 'admin_user_001',
+        'email': admin_email,
+        'password_hash': hasher.hash_password(admin_password),
+        'created_at': utc_now_iso(),
+        'payment_completed': True,
+        'is_admin': True,
+        'role': 'admin'
+    }):
         print(f"Admin user created: {admin_email} / {admin_password}")
     else:
         # Update existing admin password
-        users[admin_email]['password_hash'] = generate_password_hash(admin_password)
-        save_users(users)
+        storage.update_user(admin_email, password_hash=hasher.hash_password(admin_password))
         print(f"Admin user password updated: {admin_email} / {admin_password}")
 
-def load_onboarding_data():
-    try:
-        with open(ONBOARDING_FILE, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-
-def save_onboarding_data(data):
-    with open(ONBOARDING_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
-
 @app.route('/api/auth/register', methods=['POST', 'OPTIONS'])
 def register():
     # Handle preflight OPTIONS request
@@ -111,22 +91,21 @@ def register():
             except stripe.error.StripeError:
                 return jsonify({'error': 'Invalid payment'}), 400
         
-        users = load_users()
-        
-        if email in users:
+        if storage.get_user(email) is not None:
             return jsonify({'error': 'User already exists'}), 400
         
-        # Create user
+        # Create user; add_user() re-checks the email atomically
         user_id = secrets.token_urlsafe(16)
-        users[email] = {
+        created = storage.add_user({
             'id': user_id,
             'email': email,
-            'password_hash': generate_password_hash(password),
-            'created_at': datetime.now().isoformat(),
+            'password_hash': hasher.hash_password(password),
+            'created_at': utc_now_iso(),
             'payment_completed': bool(payment_intent_id)
-        }
+        })
         
-        save_users(users)
+        if not created:
+            return jsonify({'error': 'User already exists'}), 400
         
         # Create access token
         access_token = create_access_token(identity=email)
@@ -137,6 +116,8 @@ def register():
             'user_id': user_id
         }), 201
         
+    except HasherBusy:
+        return jsonify({'error': 'Too many sign-in attempts, please retry shortly'}), 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -154,16 +135,19 @@ def login():
         if not email or not password:
             return jsonify({'error': 'Email and password are required'}), 400
         
-        users = load_users()
+        user = storage.get_user(email)
         
-        if email not in users:
+        if user is None:
             return jsonify({'error': 'Invalid credentials'}), 401
         
-        user = users[email]
-        
-        if not check_password_hash(user['password_hash'], password):
+        matches, new_hash = hasher.verify_password(user['password_hash'], password)
+        if not matches:
             return jsonify({'error': 'Invalid credentials'}), 401
         
+        # Stored with older hash parameters; upgrade now that we know the password
+        if new_hash:
+            storage.update_user(email, password_hash=new_hash)
+        
         # Create access token
         access_token = create_access_token(identity=email)
         
@@ -174,6 +158,8 @@ def login():
         })
         return response, 200
         
+    except HasherBusy:
+        return jsonify({'error': 'Too many sign-in attempts, please retry shortly'}), 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -182,20 +168,12 @@ def login():
 def get_current_user():
     try:
         email = get_jwt_identity()
-        users = load_users()
+        user = storage.get_user(email)
         
-        if email not in users:
+        if user is None:
             return jsonify({'error': 'User not found'}), 404
         
-        user = users[email]
-        return jsonify({
-            'id': user['id'],
-            'email': user['email'],
-            'created_at': user['created_at'],
-            'payment_completed': user['payment_completed'],
-            'is_admin': user.get('is_admin', False),
-            'role': user.get('role', 'user')
-        }), 200
+        return jsonify(public_user(user)), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -238,14 +216,7 @@ def save_onboarding_data():
         email = get_jwt_identity()
         data = request.get_json()
         
-        onboarding_data = load_onboarding_data()
-        onboarding_data[email] = {
-            'user_email': email,
-            'data': data,
-            'created_at': datetime.now().isoformat()
-        }
-        
-        save_onboarding_data(onboarding_data)
+        storage.save_onboarding(email, data)
         
         return jsonify({'message': 'Onboarding data saved successfully'}), 200
         
@@ -257,12 +228,12 @@ def save_onboarding_data():
 def get_onboarding_data():
     try:
         email = get_jwt_identity()
-        onboarding_data = load_onboarding_data()
+        onboarding = storage.get_onboarding(email)
         
-        if email not in onboarding_data:
+        if onboarding is None:
             return jsonify({'error': 'Onboarding data not found'}), 404
         
-        return jsonify(onboarding_data[email]), 200
+        return jsonify(onboarding), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -275,11 +246,11 @@ def generate_autofill_data():
         data = request.get_json()
         
         # Get user's onboarding data
-        onboarding_data = load_onboarding_data()
-        if email not in onboarding_data:
+        onboarding = storage.get_onboarding(email)
+        if onboarding is None:
             return jsonify({'error': 'User onboarding data not found'}), 404
         
-        user_data = onboarding_data[email]['data']
+        user_data = onboarding['data']
         form_fields = data.get('form_fields', [])
         job_description = data.get('job_description', '')
         
@@ -319,23 +290,13 @@ def get_all_users():
     """Get all users (admin only)"""
     try:
         email = get_jwt_identity()
-        users = load_users()
         
         # Check if user is admin
-        if email not in users or not users[email].get('is_admin', False):
+        if not storage.is_admin(email):
             return jsonify({'error': 'Admin access required'}), 403
         
         # Return all users (without password hashes)
-        admin_users = {}
-        for user_email, user_data in users.items():
-            admin_users[user_email] = {
-                'id': user_data['id'],
-                'email': user_data['email'],
-                'created_at': user_data['created_at'],
-                'payment_completed': user_data['payment_completed'],
-                'is_admin': user_data.get('is_admin', False),
-                'role': user_data.get('role', 'user')
-            }
+        admin_users = {user['email']: public_user(user) for user in storage.list_users()}
         
         return jsonify(admin_users), 200
         
@@ -348,14 +309,12 @@ def get_all_onboarding_data():
     """Get all onboarding data (admin only)"""
     try:
         email = get_jwt_identity()
-        users = load_users()
         
         # Check if user is admin
-        if email not in users or not users[email].get('is_admin', False):
+        if not storage.is_admin(email):
             return jsonify({'error': 'Admin access required'}), 403
         
-        onboarding_data = load_onboarding_data()
-        return jsonify(onboarding_data), 200
+        return jsonify(storage.list_onboarding()), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -366,23 +325,14 @@ def get_admin_stats():
     """Get admin statistics"""
     try:
         email = get_jwt_identity()
-        users = load_users()
         
         # Check if user is admin
-        if email not in users or not users[email].get('is_admin', False):
+        if not storage.is_admin(email):
             return jsonify({'error': 'Admin access required'}), 403
         
-        onboarding_data = load_onboarding_data()
-        
-        stats = {
-            'total_users': len(users),
-            'admin_users': len([u for u in users.values() if u.get('is_admin', False)]),
-            'paid_users': len([u for u in users.values() if u.get('payment_completed', False)]),
-            'users_with_onboarding': len(onboarding_data),
-            'recent_users': len([u for u in users.values() 
-                               if datetime.fromisoformat(u['created_at'].replace('Z', '+00:00')) > 
-                               datetime.now() - timedelta(days=7)])
-        }
+        # Totals, recent signups and a daily signup series from per-day counts
+        days = min(max(request.args.get('days', SERIES_DAYS, type=int), 1), MAX_SERIES_DAYS)
+        stats = storage.stats(days)
         
         return jsonify(stats), 200
         
@@ -391,5 +341,6 @@ def get_admin_stats():
 
 if __name__ == '__main__':
     # Create admin user on startup
-    create_admin_user()
+    with app.app_context():
+        create_admin_user()
     app.run(debug=True, port=8001)
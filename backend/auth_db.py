@@ -3,12 +3,15 @@ import json
 import secrets
 from datetime import datetime, timedelta
 from flask import Flask, request, jsonify
-from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_jwt_extended import JWTManager, create_access_token, jwt_required
 import stripe
 import google.generativeai as genai
 from dotenv import load_dotenv
 from models import db, User, OnboardingData, CVMetadata
+from auth_storage import SqlRepository, DEFAULT_DATABASE_URL, normalize_database_url
+from auth_stats import SERIES_DAYS, MAX_SERIES_DAYS
+from password_hashing import PasswordHasher, HasherBusy, RETRY_AFTER_SECONDS
+from principal_cache import principals
 
 load_dotenv()
 
@@ -16,7 +19,7 @@ load_dotenv()
 app = Flask(__name__)
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-secret-key-change-this')
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=30)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///jobform_autofill.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = normalize_database_url(os.getenv('DATABASE_URL', DEFAULT_DATABASE_URL))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # Enable CORS for frontend - allow any origin for testing
@@ -30,6 +33,8 @@ CORS(app,
 # Initialize extensions
 jwt = JWTManager(app)
 db.init_app(app)
+storage = SqlRepository(db)
+hasher = PasswordHasher()
 
 # Initialize Stripe
 stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
@@ -59,22 +64,21 @@ def register():
                 return jsonify({'error': 'Invalid payment'}), 400
         
         # Check if user already exists
-        existing_user = User.query.filter_by(email=email).first()
-        if existing_user:
+        if storage.get_user(email) is not None:
             return jsonify({'error': 'User already exists'}), 400
         
-        # Create user
+        # Create user; the unique email index catches a concurrent registration
         user_id = secrets.token_urlsafe(16)
-        new_user = User(
-            id=user_id,
-            email=email,
-            password_hash=generate_password_hash(password),
-            payment_completed=bool(payment_intent_id),
-            payment_intent_id=payment_intent_id
-        )
-        
-        db.session.add(new_user)
-        db.session.commit()
+        created = storage.add_user({
+            'id': user_id,
+            'email': email,
+            'password_hash': hasher.hash_password(password),
+            'payment_completed': bool(payment_intent_id),
+            'payment_intent_id': payment_intent_id
+        })
+        
+        if not created:
+            return jsonify({'error': 'User already exists'}), 400
         
         # Create access token
         access_token = create_access_token(identity=email)
@@ -85,6 +89,8 @@ def register():
             'user_id': user_id
         }), 201
         
+    except HasherBusy:
+        return jsonify({'error': 'Too many sign-in attempts, please retry shortly'}), 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -99,20 +105,30 @@ def login():
         if not email or not password:
             return jsonify({'error': 'Email and password are required'}), 400
         
-        user = User.query.filter_by(email=email).first()
+        user = storage.get_user(email)
         
-        if not user or not check_password_hash(user.password_hash, password):
+        if not user:
             return jsonify({'error': 'Invalid credentials'}), 401
         
+        matches, new_hash = hasher.verify_password(user['password_hash'], password)
+        if not matches:
+            return jsonify({'error': 'Invalid credentials'}), 401
+        
+        # Stored with older hash parameters; upgrade now that we know the password
+        if new_hash:
+            storage.update_user(email, password_hash=new_hash)
+        
         # Create access token
         access_token = create_access_token(identity=email)
         
         return jsonify({
             'message': 'Login successful',
             'access_token': access_token,
-            'user_id': user.id
+            'user_id': user['id']
         }), 200
         
+    except HasherBusy:
+        return jsonify({'error': 'Too many sign-in attempts, please retry shortly'}), 503, {'Retry-After': str(RETRY_AFTER_SECONDS)}
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -120,13 +136,12 @@ def login():
 @jwt_required()
 def get_current_user():
     try:
-        email = get_jwt_identity()
-        user = User.query.filter_by(email=email).first()
+        user = principals.current()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        return jsonify(user.to_dict()), 200
+        return jsonify(user), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -159,30 +174,15 @@ def create_payment_intent():
 @jwt_required()
 def save_onboarding_data():
     try:
-        email = get_jwt_identity()
-        user = User.query.filter_by(email=email).first()
+        user = principals.current()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         data = request.get_json()
         
-        # Check if onboarding data already exists
-        onboarding = OnboardingData.query.filter_by(user_id=user.id).first()
-        
-        if onboarding:
-            # Update existing data
-            onboarding.set_data(data)
-            onboarding.updated_at = datetime.utcnow()
-        else:
-            # Create new onboarding data
-            onboarding = OnboardingData(
-                user_id=user.id,
-                data=json.dumps(data, indent=2)
-            )
-            db.session.add(onboarding)
-        
-        db.session.commit()
+        # Creates or updates the user's onboarding row
+        storage.save_onboarding(user['email'], data, user_id=user['id'])
         
         return jsonify({'message': 'Onboarding data saved successfully'}), 200
         
@@ -194,13 +194,12 @@ def save_onboarding_data():
 @jwt_required()
 def get_onboarding_data():
     try:
-        email = get_jwt_identity()
-        user = User.query.filter_by(email=email).first()
+        user = principals.current()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        onboarding = OnboardingData.query.filter_by(user_id=user.id).first()
+        onboarding = OnboardingData.query.filter_by(user_id=user['id']).first()
         
         if not onboarding:
             return jsonify({'error': 'Onboarding data not found'}), 404
@@ -214,18 +213,17 @@ def get_onboarding_data():
 @jwt_required()
 def generate_autofill_data():
     try:
-        email = get_jwt_identity()
-        user = User.query.filter_by(email=email).first()
+        user = principals.current()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         # Get user's onboarding data
-        onboarding = OnboardingData.query.filter_by(user_id=user.id).first()
+        onboarding = storage.get_onboarding(user['email'])
         if not onboarding:
             return jsonify({'error': 'User onboarding data not found'}), 404
         
-        user_data = onboarding.get_data()
+        user_data = onboarding['data']
         form_fields = request.json.get('form_fields', [])
         job_description = request.json.get('job_description', '')
         
@@ -272,8 +270,8 @@ app.register_blueprint(onboarding_bp)
 def get_profile():
     """Get user profile data"""
     try:
-        email = get_jwt_identity()
-        user = User.query.filter_by(email=email).first()
+        principal = principals.current()
+        user = db.session.get(User, principal['id']) if principal else None
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -320,8 +318,8 @@ def get_profile():
 def update_profile():
     """Update user profile data"""
     try:
-        email = get_jwt_identity()
-        user = User.query.filter_by(email=email).first()
+        principal = principals.current()
+        user = db.session.get(User, principal['id']) if principal else None
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -366,6 +364,7 @@ def update_profile():
                 # In a real implementation, you'd save the file and store the URL
                 user.resume_url = documents['resume']
         
+        # Committing a changed User row also drops its cached principal
         db.session.commit()
         
         return jsonify({
@@ -383,10 +382,9 @@ def update_profile():
 def get_all_users():
     """Get all users (admin only)"""
     try:
-        email = get_jwt_identity()
-        user = User.query.filter_by(email=email).first()
+        user = principals.current()
         
-        if not user or not user.is_admin:
+        if not user or not user['is_admin']:
             return jsonify({'error': 'Admin access required'}), 403
         
         # Return all users (without password hashes)
@@ -410,28 +408,14 @@ def get_all_users():
 def get_admin_stats():
     """Get admin statistics"""
     try:
-        email = get_jwt_identity()
-        user = User.query.filter_by(email=email).first()
+        user = principals.current()
         
-        if not user or not user.is_admin:
+        if not user or not user['is_admin']:
             return jsonify({'error': 'Admin access required'}), 403
         
-        total_users = User.query.count()
-        admin_users = User.query.filter_by(is_admin=True).count()
-        paid_users = User.query.filter_by(payment_completed=True).count()
-        users_with_onboarding = db.session.query(OnboardingData).count()
-        
-        from datetime import timedelta
-        recent_cutoff = datetime.utcnow() - timedelta(days=7)
-        recent_users = User.query.filter(User.created_at >= recent_cutoff).count()
-        
-        stats = {
-            'total_users': total_users,
-            'admin_users': admin_users,
-            'paid_users': paid_users,
-            'users_with_onboarding': users_with_onboarding,
-            'recent_users': recent_users
-        }
+        # Totals, recent signups and a daily signup series from per-day counts
+        days = min(max(request.args.get('days', SERIES_DAYS, type=int), 1), MAX_SERIES_DAYS)
+        stats = storage.stats(days)
         
         return jsonify(stats), 200
         
@@ -443,10 +427,9 @@ def get_admin_stats():
 def get_all_onboarding_data():
     """Get all onboarding data (admin only)"""
     try:
-        email = get_jwt_identity()
-        user = User.query.filter_by(email=email).first()
+        user = principals.current()
         
-        if not user or not user.is_admin:
+        if not user or not user['is_admin']:
             return jsonify({'error': 'Admin access required'}), 403
         
         onboarding_data = OnboardingData.query.all()
@@ -465,11 +448,10 @@ def create_tables():
         # Create admin user if it doesn't exist
         admin = User.query.filter_by(email='admin@projectx.com').first()
         if not admin:
-            from werkzeug.security import generate_password_hash
             admin = User(
                 id='admin_user_001',
                 email='admin@projectx.com',
-                password_hash=generate_password_hash('password123'),
+                password_hash=hasher.hash_password('password123'),
                 payment_completed=True,
                 is_admin=True,
                 role='admin'
@@ -479,9 +461,9 @@ def create_tables():
             print("Admin user created: admin@projectx.com / password123")
         else:
             # Update admin password if needed
-            from werkzeug.security import generate_password_hash, check_password_hash
-            if not check_password_hash(admin.password_hash, 'password123'):
-                admin.password_hash = generate_password_hash('password123')
+            matches, new_hash = hasher.verify_password(admin.password_hash, 'password123')
+            if not matches or new_hash:
+                admin.password_hash = new_hash or hasher.hash_password('password123')
                 db.session.commit()
                 print("Admin user password updated: admin@projectx.com / password123")
         
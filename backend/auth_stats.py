@@ -0,0 +1,83 @@
+"""
+Admin dashboard statistics
+
+Both storage backends reduce their users to the same per-day buckets:
+{date: [signups, admins, paid]}. The JSON store keeps the buckets as
+counters updated on every registration and user change, and the SQL
+store fetches them in one GROUP BY query. The dashboard totals, the
+recent-signup count and the signup series are all sums over those
+buckets, so a refresh grows with the number of signup days, not users.
+
+Days are UTC days in both stores. created_at is written in UTC everywhere;
+naive timestamp text, which older users.json files hold, was written in
+the server's local time and is converted.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+RECENT_DAYS = 7  # Days counted as recent signups, today included
+SERIES_DAYS = 30  # Default length of the signup series
+MAX_SERIES_DAYS = 365
+
+def utc_datetime(value):
+    """Naive UTC datetime from ISO text; text without an offset is local time"""
+    timestamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+def utc_today():
+    return datetime.now(timezone.utc).date()
+
+def signup_day(created_at):
+    """UTC date a user signed up as ISO text, or None if unknown
+
+    datetime objects come from the database and are already naive UTC.
+    """
+    if isinstance(created_at, (date, datetime)):
+        return created_at.isoformat()[:10]
+    try:
+        return utc_datetime(str(created_at)).date().isoformat()
+    except ValueError:
+        return None
+
+def summarize(buckets, users_with_onboarding, days=SERIES_DAYS, today=None):
+    """Dashboard stats from {UTC day or None: (signups, admins, paid)}"""
+    today = today or utc_today()
+    totals = [0, 0, 0]
+    for counts in buckets.values():
+        for index, count in enumerate(counts):
+            totals[index] += count
+    series = [(today - timedelta(days=offset)).isoformat() for offset in range(days - 1, -1, -1)]
+    recent = [(today - timedelta(days=offset)).isoformat() for offset in range(RECENT_DAYS)]
+    return {
+        'total_users': totals[0],
+        'admin_users': totals[1],
+        'paid_users': totals[2],
+        'users_with_onboarding': users_with_onboarding,
+        'recent_users': sum(buckets[day][0] for day in recent if day in buckets),
+        'signups': [{'date': day, 'count': buckets[day][0] if day in buckets else 0} for day in series]
+    }
+
+class SignupCounters:
+    """Per-day signup, admin and paid counts maintained as users change"""
+
+    def __init__(self, users=()):
+        self.buckets = defaultdict(lambda: [0, 0, 0])
+        for user in users:
+            self.add(user)
+
+    def _count(self, user, sign):
+        counts = self.buckets[signup_day(user.get('created_at'))]
+        counts[0] += sign
+        counts[1] += sign * bool(user.get('is_admin'))
+        counts[2] += sign * bool(user.get('payment_completed'))
+
+    def add(self, user):
+        self._count(user, 1)
+
+    def remove(self, user):
+        self._count(user, -1)
+
+    def change(self, old, new):
+        self.remove(old)
+        self.add(new)
@@ -0,0 +1,293 @@
+"""
+Storage backends for users and onboarding answers
+
+auth.py (JSON files) and auth_db.py (SQLAlchemy) serve the same routes
+from different stores. Both now go through an AuthRepository:
+
+- JsonRepository: users.json through the in-memory UserStore, plus
+  onboarding_data.json
+- SqlRepository: the models in models.py on whatever database
+  SQLALCHEMY_DATABASE_URI points at, SQLite or PostgreSQL
+
+Users are exchanged as plain dicts in the users.json shape (id, email,
+password_hash, created_at as ISO text, payment_completed, is_admin, role);
+onboarding records as {'user_email', 'data', 'created_at'}. Timestamps
+are UTC: the JSON store writes them with an offset, the database as
+naive UTC.
+
+open_repository picks the backend from a setting such as AUTH_STORAGE, so
+a deployment can move from the JSON files to a database by running
+migrate_auth_data.py and restarting with a database URL.
+"""
+
+import json
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+
+from auth_stats import SERIES_DAYS, SignupCounters, summarize, utc_datetime
+from user_store import UserStore, write_json_atomic
+
+USERS_FILE = 'users.json'
+ONBOARDING_FILE = 'onboarding_data.json'
+DEFAULT_DATABASE_URL = 'sqlite:///jobform_autofill.db'
+
+USER_FIELDS = ('id', 'email', 'password_hash', 'created_at', 'payment_completed', 'payment_intent_id',
+               'is_admin', 'role')
+
+def public_user(user):
+    """User fields that may leave the server (no password hash)"""
+    return {
+        'id': user['id'],
+        'email': user['email'],
+        'created_at': user['created_at'],
+        'payment_completed': user.get('payment_completed', False),
+        'is_admin': user.get('is_admin', False),
+        'role': user.get('role', 'user')
+    }
+
+def normalize_database_url(url):
+    """SQLAlchemy only accepts the postgresql:// scheme Heroku-style URLs lack"""
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+def utc_now_iso():
+    """Current time as ISO text with a UTC offset, as the JSON store writes it"""
+    return datetime.now(timezone.utc).isoformat()
+
+def parse_timestamp(value):
+    """Naive UTC datetime for a database column; naive text is legacy local time"""
+    if isinstance(value, datetime):
+        return value
+    if not value:
+        return None
+    return utc_datetime(value)
+
+class AuthRepository(ABC):
+    """Users keyed by email and one onboarding record per user"""
+
+    @abstractmethod
+    def get_user(self, email):
+        """The user as a dict, or None"""
+
+    @abstractmethod
+    def add_user(self, user):
+        """Insert a user; False if the email is already registered"""
+
+    @abstractmethod
+    def update_user(self, email, **fields):
+        """Change fields of a user; False if there is no such user"""
+
+    @abstractmethod
+    def list_users(self):
+        """Every user as a dict"""
+
+    def is_admin(self, email):
+        user = self.get_user(email)
+        return user is not None and user.get('is_admin', False)
+
+    @abstractmethod
+    def get_onboarding(self, email):
+        """{'user_email', 'data', 'created_at'} or None"""
+
+    @abstractmethod
+    def save_onboarding(self, email, data):
+        """Store a user's onboarding answers, replacing earlier ones"""
+
+    @abstractmethod
+    def list_onboarding(self):
+        """{email: onboarding record}"""
+
+    @abstractmethod
+    def stats(self, days=SERIES_DAYS):
+        """Admin dashboard totals plus a daily signup series of `days` UTC days"""
+
+class JsonRepository(AuthRepository):
+    """users.json and onboarding_data.json"""
+
+    def __init__(self, users_path=USERS_FILE, onboarding_path=ONBOARDING_FILE):
+        self.users = UserStore(users_path)
+        self.onboarding_path = onboarding_path
+        self.onboarding = None
+        self.onboarding_lock = threading.Lock()
+        self.counters = None  # Built on the first stats() call, then kept current by every write
+
+    def get_user(self, email):
+        return self.users.get(email)
+
+    def add_user(self, user):
+        with self.users.lock:
+            added = self.users.add(user['email'], user)
+            if added and self.counters is not None:
+                self.counters.add(user)
+            return added
+
+    def update_user(self, email, **fields):
+        with self.users.lock:
+            old = self.users.get(email)
+            updated = self.users.update(email, **fields)
+            if updated and self.counters is not None:
+                self.counters.change(old, dict(old, **fields))
+            return updated
+
+    def list_users(self):
+        return list(self.users.all().values())
+
+    def _load_onboarding(self):
+        if self.onboarding is None:
+            try:
+                with open(self.onboarding_path, 'r') as f:
+                    self.onboarding = json.load(f)
+            except FileNotFoundError:
+                self.onboarding = {}
+        return self.onboarding
+
+    def get_onboarding(self, email):
+        with self.onboarding_lock:
+            return self._load_onboarding().get(email)
+
+    def save_onboarding(self, email, data):
+        with self.onboarding_lock:
+            onboarding = self._load_onboarding()
+            onboarding[email] = {
+                'user_email': email,
+                'data': data,
+                'created_at': utc_now_iso()
+            }
+            write_json_atomic(self.onboarding_path, onboarding)
+
+    def list_onboarding(self):
+        with self.onboarding_lock:
+            return dict(self._load_onboarding())
+
+    def stats(self, days=SERIES_DAYS):
+        with self.users.lock:
+            if self.counters is None:
+                self.counters = SignupCounters(self.users.all().values())
+            buckets = {day: tuple(counts) for day, counts in self.counters.buckets.items()}
+        with self.onboarding_lock:
+            onboarded = len(self._load_onboarding())
+        return summarize(buckets, onboarded, days)
+
+class SqlRepository(AuthRepository):
+    """The SQLAlchemy models; needs an app context, as inside a request
+
+    OnboardingData has a column per question rather than a free-form
+    document, so onboarding answers whose keys are not columns are dropped.
+    """
+
+    def __init__(self, db):
+        from models import User, OnboardingData
+        self.db = db
+        self.User = User
+        self.OnboardingData = OnboardingData
+
+    @staticmethod
+    def user_dict(user):
+        return {
+            'id': user.id,
+            'email': user.email,
+            'password_hash': user.password_hash,
+            'created_at': user.created_at.isoformat() if user.created_at else None,
+            'payment_completed': bool(user.payment_completed),
+            'payment_intent_id': user.payment_intent_id,
+            'is_admin': bool(user.is_admin),
+            'role': user.role or 'user'
+        }
+
+    def get_user(self, email):
+        user = self.User.query.filter_by(email=email).first()
+        return self.user_dict(user) if user else None
+
+    def add_user(self, user):
+        from sqlalchemy.exc import IntegrityError
+        fields = {field: user[field] for field in USER_FIELDS if field in user}
+        fields['created_at'] = parse_timestamp(fields.get('created_at')) or datetime.utcnow()
+        self.db.session.add(self.User(**fields))
+        try:
+            self.db.session.commit()
+        except IntegrityError:
+            # The unique email index is what makes concurrent sign-ups safe
+            self.db.session.rollback()
+            return False
+        return True
+
+    def update_user(self, email, **fields):
+        user = self.User.query.filter_by(email=email).first()
+        if not user:
+            return False
+        for field, value in fields.items():
+            setattr(user, field, parse_timestamp(value) if field == 'created_at' else value)
+        self.db.session.commit()
+        return True
+
+    def list_users(self):
+        return [self.user_dict(user) for user in self.User.query.all()]
+
+    def onboarding_record(self, email, onboarding):
+        data = {key: value for key, value in onboarding.to_dict().items()
+                if value is not None and key not in ('user_id', 'created_at', 'updated_at')}
+        return {'user_email': email, 'data': data, 'created_at': onboarding.created_at.isoformat()}
+
+    def get_onboarding(self, email):
+        row = (self.db.session.query(self.OnboardingData)
+               .join(self.User, self.User.id == self.OnboardingData.user_id)
+               .filter(self.User.email == email).first())
+        return self.onboarding_record(email, row) if row else None
+
+    def save_onboarding(self, email, data, user_id=None):
+        """user_id, when the caller already knows it, saves looking the user up"""
+        if user_id is None:
+            user = self.User.query.filter_by(email=email).first()
+            if not user:
+                raise KeyError(email)
+            user_id = user.id
+        onboarding = self.OnboardingData.query.filter_by(user_id=user_id).first()
+        if onboarding is None:
+            onboarding = self.OnboardingData(user_id=user_id)
+            self.db.session.add(onboarding)
+        for field, value in data.items():
+            if field in self.OnboardingData.__table__.columns and field not in ('id', 'user_id'):
+                setattr(onboarding, field, value)
+        onboarding.updated_at = datetime.utcnow()
+        self.db.session.commit()
+
+    def list_onboarding(self):
+        rows = (self.db.session.query(self.User.email, self.OnboardingData)
+                .join(self.OnboardingData, self.User.id == self.OnboardingData.user_id).all())
+        return {email: self.onboarding_record(email, row) for email, row in rows}
+
+    def stats(self, days=SERIES_DAYS):
+        """One GROUP BY over users: a row per signup day with its admin and paid counts"""
+        from sqlalchemy import case, func, select
+        User = self.User
+        day = func.date(User.created_at)
+        rows = self.db.session.query(
+            day,
+            func.count(User.id),
+            func.sum(case((User.is_admin.is_(True), 1), else_=0)),
+            func.sum(case((User.payment_completed.is_(True), 1), else_=0)),
+            select(func.count(self.OnboardingData.id)).scalar_subquery()
+        ).group_by(day).all()
+        # DATE() of the naive UTC column is already a UTC day, as a date or as text
+        buckets = {str(row[0])[:10] if row[0] else None: (row[1], int(row[2] or 0), int(row[3] or 0))
+                   for row in rows}
+        onboarded = rows[0][4] if rows else self.OnboardingData.query.count()
+        return summarize(buckets, onboarded, days)
+
+def open_repository(app, setting=None):
+    """Repository for a storage setting: 'json' (or empty) or a database URL
+
+    For a database the app is configured for Flask-SQLAlchemy and the
+    tables are created if missing.
+    """
+    if not setting or setting == 'json':
+        return JsonRepository()
+    from models import db
+    app.config['SQLALCHEMY_DATABASE_URI'] = normalize_database_url(setting)
+    app.config.setdefault('SQLALCHEMY_TRACK_MODIFICATIONS', False)
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return SqlRepository(db)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Auth storage backend benchmark
+
+Seeds each AuthRepository backend with the same synthetic users and
+measures registrations/sec (add_user), lookups/sec (get_user, the login
+and /api/auth/me path) and the time to list every user, which the admin
+endpoints do. Each backend runs in a fresh temporary directory.
+
+Backends are 'json' and 'sqlite' by default; pass --database-url to add
+a PostgreSQL (or any SQLAlchemy) database, which must be empty.
+
+Usage:
+    python benchmarks/auth_storage_benchmark.py
+    python benchmarks/auth_storage_benchmark.py --users 100000 --output auth_bench.json
+    python benchmarks/auth_storage_benchmark.py --database-url postgresql://localhost/auth_bench
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+from flask import Flask
+from sqlalchemy import insert
+
+from auth_storage import JsonRepository, open_repository, utc_now_iso
+from migrate_auth_data import user_row
+from models import db, User
+from user_store import write_json_atomic
+
+DEFAULT_USERS = 10000
+REGISTRATIONS = 500  # add_user calls timed per backend
+LOOKUPS = 5000  # get_user calls timed per backend
+
+def fake_user(index):
+    email = f"user{index}@example.com"
+    return {
+        'id': f"user_{index:08d}",
+        'email': email,
+        'password_hash': 'scrypt:32768:8:1$benchmark$' + '0' * 128,
+        'created_at': utc_now_iso(),
+        'payment_completed': index % 3 == 0,
+        'is_admin': False,
+        'role': 'user'
+    }
+
+def seed(backend, repository, count):
+    users = [fake_user(index) for index in range(count)]
+    if isinstance(repository, JsonRepository):
+        write_json_atomic(repository.users.path, {user['email']: user for user in users})
+    else:
+        for start in range(0, count, 1000):
+            db.session.execute(insert(User), [user_row(user) for user in users[start:start + 1000]])
+            db.session.commit()
+
+def rate(count, seconds):
+    return round(count / seconds, 1) if seconds else None
+
+def measure(backend, repository, count):
+    seed(backend, repository, count)
+
+    started = time.perf_counter()
+    for index in range(count, count + REGISTRATIONS):
+        repository.add_user(fake_user(index))
+    register_seconds = time.perf_counter() - started
+
+    emails = [f"user{random.randrange(count)}@example.com" for _ in range(LOOKUPS)]
+    started = time.perf_counter()
+    for email in emails:
+        repository.get_user(email)
+    lookup_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    listed = len(repository.list_users())
+    list_seconds = time.perf_counter() - started
+
+    return {
+        'backend': backend,
+        'users': listed,
+        'registrations_per_sec': rate(REGISTRATIONS, register_seconds),
+        'lookups_per_sec': rate(LOOKUPS, lookup_seconds),
+        'list_users_seconds': round(list_seconds, 4)
+    }
+
+def run_backend(backend, setting, count):
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            app = Flask(__name__)
+            if setting == 'sqlite':
+                setting = f"sqlite:///{os.path.join(workdir, 'auth_bench.db')}"
+            repository = open_repository(app, setting)
+            with app.app_context():
+                return measure(backend, repository, count)
+        finally:
+            os.chdir(cwd)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare auth storage backends")
+    parser.add_argument('--users', type=int, default=DEFAULT_USERS, help="Users seeded before timing")
+    parser.add_argument('--database-url', help="Extra SQLAlchemy database to benchmark (must be empty)")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    backends = [('json', 'json'), ('sqlite', 'sqlite')]
+    if args.database_url:
+        backends.append((args.database_url.split(':', 1)[0], args.database_url))
+
+    results = []
+    for backend, setting in backends:
+        result = run_backend(backend, setting, args.users)
+        results.append(result)
+        print(f"{backend:>10}: {result['registrations_per_sec']} registrations/s, "
+              f"{result['lookups_per_sec']} lookups/s, list {result['users']} users in "
+              f"{result['list_users_seconds']}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'users': args.users, 'at': datetime.now().isoformat(), 'results': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Crawl throughput benchmark
+
+Replays the recorded career pages in benchmarks/fixtures from a local
+fixture server and measures, for each site count:
+
+- parse time per page for every fixture (parse_jobs)
+- pages/sec of crawler.crawl fetching and parsing a sample, without the job store
+- end-to-end check_websites cycle time, cold and with a warm HTTP cache
+- memory high-water mark (max RSS) of the measuring process
+
+Every site count is measured in a fresh process with its own state files,
+so RSS and the SQLite store do not carry over. Per-host politeness limits
+are lifted because every site is served from 127.0.0.1; the numbers are
+for the crawler, not for the rate limiter. Results are written as JSON
+so runs on different commits can be compared with --compare.
+
+Usage:
+    python benchmarks/crawl_benchmark.py run
+    python benchmarks/crawl_benchmark.py run --sizes 100 1000 --output before.json
+    python benchmarks/crawl_benchmark.py run --compare before.json
+    python benchmarks/crawl_benchmark.py record
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+MANIFEST_FILE = os.path.join(FIXTURES_DIR, 'manifest.json')
+
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_OUTPUT = 'bench_results.json'
+PARSE_REPEAT = 20  # parse_jobs calls per fixture when timing parsing
+CRAWL_SAMPLE = 200  # Max sites fetched by the bare crawler.crawl run per size
+
+def load_fixtures():
+    """[(name, html, selector)] in manifest order"""
+    with open(MANIFEST_FILE, 'r') as f:
+        manifest = json.load(f)
+    fixtures = []
+    for name, selector in manifest.items():
+        with open(os.path.join(FIXTURES_DIR, name), 'rb') as f:
+            fixtures.append((name, f.read(), selector))
+    return fixtures
+
+def fixture_sites(base_url, size, fixtures):
+    """WEBSITES-style entries cycling through the fixtures"""
+    return [{'url': f"{base_url}/site/{i}", 'selector': fixtures[i % len(fixtures)][2]} for i in range(size)]
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like real career sites
+
+    def do_GET(self):
+        match = re.match(r'^/site/(\d+)$', self.path)
+        if not match:
+            self.send_error(404)
+            return
+        pages = self.server.pages
+        body, etag = pages[int(match.group(1)) % len(pages)]
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_fixture_server(fixtures):
+    """Serve /site/<n> from the fixtures on a free local port; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+    server.daemon_threads = True
+    server.pages = [(html, '"' + hashlib.sha1(html).hexdigest()[:16] + '"') for _, html, _ in fixtures]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def measure(size, base_url):
+    """Run in a fresh process from a scratch directory; returns one result dict"""
+    sys.path.insert(0, BACKEND_DIR)
+    import main
+    from crawler import crawl_websites
+    from rate_limiter import DomainRateLimiter
+
+    main.SEND_EMAILS = False
+    main.CRAWL_PER_HOST_LIMIT = main.CRAWL_CONCURRENCY
+    main.rate_limiter = DomainRateLimiter(rate=1e9, burst=1e9)
+
+    fixtures = load_fixtures()
+    websites = fixture_sites(base_url, size, fixtures)
+    result = {'sites': size, 'parse': {}}
+
+    for name, html, selector in fixtures:
+        text = html.decode('utf-8')
+        start = time.perf_counter()
+        for _ in range(PARSE_REPEAT):
+            jobs = main.parse_jobs(text, base_url, selector)
+        result['parse'][name] = {
+            'bytes': len(html),
+            'jobs': len(jobs),
+            'ms_per_page': round((time.perf_counter() - start) * 1000 / PARSE_REPEAT, 3)
+        }
+
+    with open(os.devnull, 'w') as devnull:
+        stdout = sys.stdout
+        sys.stdout = devnull  # check_websites prints a line per site
+        try:
+            sample = websites[:CRAWL_SAMPLE]
+            start = time.perf_counter()
+            crawl_websites(sample, main.parse_jobs, concurrency=main.CRAWL_CONCURRENCY,
+                           per_host=main.CRAWL_PER_HOST_LIMIT, limiter=main.rate_limiter,
+                           listing_filter=main.filter_listings, stream=main.CRAWL_STREAMING,
+                           max_bytes=main.CRAWL_MAX_PAGE_BYTES)
+            elapsed = time.perf_counter() - start
+            result['crawl'] = {
+                'pages': len(sample),
+                'seconds': round(elapsed, 3),
+                'pages_per_sec': round(len(sample) / elapsed, 1)
+            }
+
+            for phase in ('cold', 'warm'):
+                start = time.perf_counter()
+                main.check_websites(websites=websites)
+                elapsed = time.perf_counter() - start
+                result[f'check_websites_{phase}'] = {
+                    'seconds': round(elapsed, 3),
+                    'pages_per_sec': round(size / elapsed, 1)
+                }
+        finally:
+            sys.stdout = stdout
+
+    result['max_rss_mb'] = max_rss_mb()
+    return result
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_size(size, base_url):
+    with tempfile.TemporaryDirectory() as workdir:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), 'measure', str(size), base_url],
+            cwd=workdir, capture_output=True, text=True
+        )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark at {size} sites failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def headline(result):
+    """Flat metrics used for comparisons; higher_is_better per metric"""
+    return {
+        'crawl pages/sec': (result['crawl']['pages_per_sec'] if 'crawl' in result else None, True),
+        'cold cycle seconds': (result['check_websites_cold']['seconds'], False),
+        'warm cycle seconds': (result['check_websites_warm']['seconds'], False),
+        'cold pages/sec': (result['check_websites_cold']['pages_per_sec'], True),
+        'max RSS MB': (result['max_rss_mb'], False),
+        'parse ms/page (total)': (round(sum(p['ms_per_page'] for p in result['parse'].values()), 3), False)
+    }
+
+def print_result(result):
+    print(f"\n{result['sites']} sites")
+    for name, (value, _) in headline(result).items():
+        print(f"  {name:<28} {value}")
+
+def compare(previous, current):
+    """Print each headline metric against a previous results file"""
+    previous_by_size = {result['sites']: result for result in previous['results']}
+    print(f"\nCompared with {previous.get('commit') or 'previous run'}:")
+    for result in current['results']:
+        before = previous_by_size.get(result['sites'])
+        if before is None:
+            continue
+        print(f"\n{result['sites']} sites")
+        old_metrics = headline(before)
+        for name, (value, higher_is_better) in headline(result).items():
+            old_value = old_metrics[name][0]  # None for metrics the older run did not have
+            if not old_value or value is None:
+                continue
+            change = (value - old_value) / old_value * 100
+            worse = change < 0 if higher_is_better else change > 0
+            flag = '  REGRESSION' if worse and abs(change) >= 10 else ''
+            print(f"  {name:<28} {old_value} -> {value} ({change:+.1f}%){flag}")
+
+def run(args):
+    fixtures = load_fixtures()
+    server, base_url = start_fixture_server(fixtures)
+    print(f"Serving {len(fixtures)} fixtures from {base_url}")
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': []
+    }
+    try:
+        for size in args.sizes:
+            print(f"Benchmarking {size} sites...")
+            result = run_size(size, base_url)
+            report['results'].append(result)
+            print_result(result)
+    finally:
+        server.shutdown()
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare(json.load(f), report)
+
+def record(args):
+    """Save the live WEBSITES pages as fixtures and add them to the manifest"""
+    sys.path.insert(0, BACKEND_DIR)
+    import httpx
+    from http_pool import HEADERS, REQUEST_TIMEOUT
+    from main import WEBSITES
+
+    with open(MANIFEST_FILE, 'r') as f:
+        manifest = json.load(f)
+    with httpx.Client(headers=HEADERS, timeout=REQUEST_TIMEOUT, follow_redirects=True) as client:
+        for site in WEBSITES[:args.limit]:
+            name = re.sub(r'[^a-z0-9]+', '_', site['url'].split('://', 1)[-1].lower()).strip('_')[:80] + '.html'
+            try:
+                response = client.get(site['url'])
+                response.raise_for_status()
+            except Exception as e:
+                print(f"Skipping {site['url']}: {e}")
+                continue
+            with open(os.path.join(FIXTURES_DIR, name), 'wb') as f:
+                f.write(response.content)
+            manifest[name] = site['selector']
+            print(f"Recorded {site['url']} -> {name} ({len(response.content)} bytes)")
+    with open(MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark crawl throughput against recorded fixtures")
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='Run the benchmark and write a results file')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    run_parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    run_parser.add_argument('--compare', help='Previous results file to compare against')
+    record_parser = commands.add_parser('record', help='Record live WEBSITES pages as fixtures')
+    record_parser.add_argument('--limit', type=int, default=None)
+    measure_parser = commands.add_parser('measure')  # Internal: one size in a fresh process
+    measure_parser.add_argument('size', type=int)
+    measure_parser.add_argument('base_url')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run(args)
+    elif args.command == 'record':
+        record(args)
+    elif args.command == 'measure':
+        print(json.dumps(measure(args.size, args.base_url)))
+
+if __name__ == '__main__':
+    main()
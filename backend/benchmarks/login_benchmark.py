@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Password verification throughput benchmark
+
+Measures logins/sec through PasswordHasher for 1, 2, 4 ... up to
+--max-workers worker processes and reports throughput per core, which is
+what sizes HASH_WORKERS for a given login rate. A burst phase then fires
+--burst concurrent logins at a pool with the configured queue limit and
+reports how many were rejected with HasherBusy and the latency of the
+ones admitted.
+
+Usage:
+    python benchmarks/login_benchmark.py
+    python benchmarks/login_benchmark.py --method pbkdf2:sha256:600000 --logins 200
+    python benchmarks/login_benchmark.py --output login_bench.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from password_hashing import HASH_QUEUE_LIMIT, PASSWORD_HASH_METHOD, HasherBusy, PasswordHasher
+
+PASSWORD = 'correct horse battery staple'
+DEFAULT_LOGINS = 100  # Verifications timed per worker count
+
+def worker_counts(max_workers):
+    counts = []
+    count = 1
+    while count < max_workers:
+        counts.append(count)
+        count *= 2
+    return counts + [max_workers]
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else None
+
+def measure_throughput(method, workers, logins):
+    hasher = PasswordHasher(method=method, workers=workers, queue_limit=logins)
+    try:
+        password_hash = hasher.hash_password(PASSWORD)  # Also starts the pool before timing
+        with ThreadPoolExecutor(max_workers=workers * 2) as threads:
+            started = time.perf_counter()
+            results = list(threads.map(lambda _: hasher.verify_password(password_hash, PASSWORD)[0],
+                                       range(logins)))
+            seconds = time.perf_counter() - started
+    finally:
+        hasher.shutdown()
+    assert all(results)
+    return {
+        'workers': workers,
+        'logins_per_sec': round(logins / seconds, 1),
+        'logins_per_sec_per_core': round(logins / seconds / workers, 1)
+    }
+
+def measure_burst(method, workers, queue_limit, burst):
+    hasher = PasswordHasher(method=method, workers=workers, queue_limit=queue_limit)
+    try:
+        password_hash = hasher.hash_password(PASSWORD)
+
+        def attempt(_):
+            started = time.perf_counter()
+            try:
+                hasher.verify_password(password_hash, PASSWORD)
+            except HasherBusy:
+                return None
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=burst) as threads:
+            latencies = list(threads.map(attempt, range(burst)))
+    finally:
+        hasher.shutdown()
+    admitted = [latency for latency in latencies if latency is not None]
+    return {
+        'burst': burst,
+        'workers': workers,
+        'queue_limit': queue_limit,
+        'admitted': len(admitted),
+        'rejected': burst - len(admitted),
+        'p50_seconds': round(percentile(admitted, 0.5), 4) if admitted else None,
+        'p99_seconds': round(percentile(admitted, 0.99), 4) if admitted else None
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark password verification throughput")
+    parser.add_argument('--method', default=PASSWORD_HASH_METHOD, help="werkzeug hash method string")
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--logins', type=int, default=DEFAULT_LOGINS)
+    parser.add_argument('--queue-limit', type=int, default=HASH_QUEUE_LIMIT)
+    parser.add_argument('--burst', type=int, help="Concurrent logins in the burst phase (default 4x capacity)")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    print(f"Method {args.method}, {args.logins} logins per run")
+    throughput = []
+    for workers in worker_counts(args.max_workers):
+        result = measure_throughput(args.method, workers, args.logins)
+        throughput.append(result)
+        print(f"{workers:>3} workers: {result['logins_per_sec']} logins/s, "
+              f"{result['logins_per_sec_per_core']} logins/s per core")
+
+    burst_size = args.burst or 4 * (args.max_workers + args.queue_limit)
+    burst = measure_burst(args.method, args.max_workers, args.queue_limit, burst_size)
+    print(f"Burst of {burst['burst']}: {burst['admitted']} admitted, {burst['rejected']} rejected, "
+          f"p50 {burst['p50_seconds']}s, p99 {burst['p99_seconds']}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'method': args.method,
+                'at': datetime.now().isoformat(),
+                'cpu_count': os.cpu_count(),
+                'throughput': throughput,
+                'burst': burst
+            }, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
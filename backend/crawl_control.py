@@ -0,0 +1,155 @@
+"""
+Coordination between the crawler daemon and read-only API processes
+
+Exactly one process per deployment may run the scheduler: it holds an
+exclusive lock on SchedulerLock's file for as long as it lives, and
+standbys retry until the leader exits. API processes that are not the
+leader hand refresh requests to it through a request file and read its
+progress from a status file.
+"""
+
+import json
+import os
+import secrets
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+class SchedulerLock:
+    """Non-blocking exclusive file lock; released automatically if the process dies"""
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+
+    @property
+    def held(self):
+        return self.handle is not None
+
+    def acquire(self):
+        if self.handle is not None:
+            return True
+        handle = open(self.path, 'a+')
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            handle.close()
+            return False
+        handle.seek(0)
+        handle.truncate()
+        handle.write(f"{os.getpid()}\n")
+        handle.flush()
+        self.handle = handle
+        return True
+
+    def release(self):
+        if self.handle is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+        else:
+            self.handle.seek(0)
+            msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+        self.handle.close()
+        self.handle = None
+
+def _write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _read_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def request_refresh(request_path, status_path):
+    """Ask the leader for a full crawl; returns (status, coalesced)
+
+    Joins a full crawl the leader is running or has queued, or a request
+    that is still waiting to be picked up, instead of queueing another one.
+    A partial run of only the due sites is not joined.
+    """
+    status = _read_json(status_path) or {}
+    runs = status.get('runs', {})
+    for run_id in (status.get('current_id'), status.get('queued_id')):
+        if run_id in runs and runs[run_id].get('full', True):
+            return runs[run_id], True
+
+    request = {
+        'job_id': secrets.token_urlsafe(8),
+        'status': 'queued',
+        'full': True,
+        'sites_total': None,
+        'sites_done': 0,
+        'sites_pending': None,
+        'requested_at': datetime.now().isoformat(),
+        'started_at': None,
+        'finished_at': None,
+        'error': None
+    }
+    tmp_path = f"{request_path}.{request['job_id']}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(request, f, indent=2)
+    try:
+        while True:
+            # Exclusive create, like O_CREAT | O_EXCL, but the file only
+            # appears once it is complete, so readers never see half of it
+            try:
+                os.link(tmp_path, request_path)
+                return request, False
+            except FileExistsError:
+                pending = _read_json(request_path)
+                if pending:
+                    return pending, True
+                # Claimed by the leader between the two calls; try again
+    finally:
+        os.remove(tmp_path)
+
+def take_refresh_request(request_path):
+    """Pop the pending refresh request, if any (leader side)
+
+    The file is first renamed to a name of our own, so a request written
+    between reading and removing it is never deleted unread, and two
+    leaders can never both claim the same one.
+    """
+    claimed_path = f"{request_path}.{os.getpid()}.claimed"
+    try:
+        os.replace(request_path, claimed_path)
+    except FileNotFoundError:
+        return None
+    try:
+        return _read_json(claimed_path)
+    finally:
+        os.remove(claimed_path)
+
+def write_status(status_path, runs, current_id, queued_id=None):
+    """Publish the leader's crawl runs for other processes to poll"""
+    _write_json(status_path, {
+        'current_id': current_id,
+        'queued_id': queued_id,
+        'runs': runs,
+        'updated_at': datetime.now().isoformat()
+    })
+
+def read_run(request_path, status_path, job_id):
+    """Status of a crawl run published by the leader, or a still-queued request"""
+    status = _read_json(status_path) or {}
+    run = status.get('runs', {}).get(job_id)
+    if run is not None:
+        return run
+    pending = _read_json(request_path)
+    if pending and pending.get('job_id') == job_id:
+        return pending
+    return None
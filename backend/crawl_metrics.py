@@ -0,0 +1,192 @@
+"""
+Per-site crawl metrics and their Prometheus text exposition
+
+Each fetch produces one sample: phase durations taken from httpx's trace
+extension, response size and status, and how many listings the selector
+matched versus how many passed the keyword filters. CrawlMetrics keeps a
+rolling window of samples per site for the slowest / most error-prone
+summary and is saved to JSON so API processes that do not crawl can
+still serve it.
+"""
+
+import json
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+PHASES = ('connect', 'tls', 'ttfb', 'download', 'parse')
+WINDOW = 20  # Samples kept per site for the rolling summary
+
+class ParsedJobs(list):
+    """Filtered jobs that also remember how many listings the selector matched"""
+
+    def __init__(self, jobs=(), listings=0):
+        super().__init__(jobs)
+        self.listings = listings
+
+class RequestTrace:
+    """httpx trace extension hook recording when each request phase starts and ends
+
+    httpcore resolves DNS inside connect_tcp, so 'connect' covers DNS plus
+    the TCP handshake. Reused keep-alive connections have no connect or TLS
+    phase.
+    """
+
+    def __init__(self):
+        self.events = {}
+
+    async def __call__(self, event_name, info):
+        # http11.* and http2.* events are stored under the same names
+        if event_name.startswith(('http11.', 'http2.')):
+            event_name = event_name.split('.', 1)[1]
+        self.events[event_name] = time.perf_counter()
+
+    def span(self, started, completed):
+        if started in self.events and completed in self.events:
+            return self.events[completed] - self.events[started]
+        return 0.0
+
+    def timings(self):
+        return {
+            'connect': self.span('connection.connect_tcp.started', 'connection.connect_tcp.complete'),
+            'tls': self.span('connection.start_tls.started', 'connection.start_tls.complete'),
+            'ttfb': self.span('send_request_headers.started', 'receive_response_headers.complete'),
+            'download': self.span('receive_response_headers.complete', 'receive_response_body.complete')
+        }
+
+def new_sample(url):
+    return {
+        'url': url,
+        'source': 'html',  # or the ATS adapter whose feed was read
+        'at': datetime.now().isoformat(),
+        'status': None,
+        'bytes': 0,
+        'attempts': 0,
+        'timings': dict.fromkeys(PHASES, 0.0),
+        'seconds': 0.0,
+        'listings': None,
+        'jobs': None,
+        'error': None
+    }
+
+def _mean(values):
+    values = list(values)
+    return sum(values) / len(values) if values else 0.0
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class CrawlMetrics:
+    """Rolling per-site samples plus per-site counters"""
+
+    def __init__(self, path, window=WINDOW):
+        self.path = path
+        self.window = window
+        self.samples = {}  # url -> deque of recent samples
+        self.counters = {}  # url -> {'fetches', 'errors', 'not_modified', 'bytes'}
+        self.last_cycle = None
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self
+        self.samples = {url: deque(samples, maxlen=self.window) for url, samples in data.get('samples', {}).items()}
+        self.counters = data.get('counters', {})
+        self.last_cycle = data.get('last_cycle')
+        return self
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'samples': {url: list(samples) for url, samples in self.samples.items()},
+                'counters': self.counters,
+                'last_cycle': self.last_cycle
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def record(self, sample, not_modified=False):
+        url = sample['url']
+        self.samples.setdefault(url, deque(maxlen=self.window)).append(sample)
+        counters = self.counters.setdefault(url, {'fetches': 0, 'errors': 0, 'not_modified': 0, 'bytes': 0})
+        counters['fetches'] += 1
+        counters['errors'] += sample['error'] is not None
+        counters['not_modified'] += not_modified
+        counters['bytes'] += sample['bytes']
+
+    def record_cycle(self, sites, seconds):
+        self.last_cycle = {'at': datetime.now().isoformat(), 'sites': sites, 'seconds': round(seconds, 3)}
+
+    def summary(self, limit=10):
+        """Slowest and most error-prone sites over the rolling window"""
+        sites = []
+        for url, samples in self.samples.items():
+            ok = [sample for sample in samples if sample['error'] is None]
+            sites.append({
+                'url': url,
+                'samples': len(samples),
+                'mean_seconds': round(_mean(sample['seconds'] for sample in ok), 3),
+                'error_rate': round(1 - len(ok) / len(samples), 3),
+                'last_error': next((sample['error'] for sample in reversed(samples) if sample['error']), None),
+                'last_status': samples[-1]['status']
+            })
+        slowest = sorted((site for site in sites if site['mean_seconds']), key=lambda site: -site['mean_seconds'])
+        error_prone = sorted((site for site in sites if site['error_rate']), key=lambda site: -site['error_rate'])
+        return {
+            'window': self.window,
+            'last_cycle': self.last_cycle,
+            'slowest': slowest[:limit],
+            'most_errors': error_prone[:limit],
+            'zero_listings': [site['url'] for site in sites
+                              if self.samples[site['url']][-1]['listings'] == 0][:limit]
+        }
+
+    def prometheus(self):
+        """Latest sample per site and cumulative counters in Prometheus text format"""
+        lines = []
+
+        def metric(name, kind, help_text, rows):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in rows:
+                label_text = ','.join(f'{key}="{_label(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}")
+
+        latest = {url: samples[-1] for url, samples in self.samples.items() if samples}
+        metric('jobmonitor_site_phase_seconds', 'gauge',
+               'Duration of each fetch phase in the latest crawl of a site',
+               [({'site': url, 'phase': phase}, round(sample['timings'][phase], 6))
+                for url, sample in latest.items() for phase in PHASES])
+        metric('jobmonitor_site_fetch_seconds', 'gauge', 'Total fetch and parse time in the latest crawl',
+               [({'site': url}, round(sample['seconds'], 6)) for url, sample in latest.items()])
+        metric('jobmonitor_site_response_bytes', 'gauge', 'Body size of the latest response',
+               [({'site': url}, sample['bytes']) for url, sample in latest.items()])
+        metric('jobmonitor_site_status_code', 'gauge', 'HTTP status of the latest response, 0 if none',
+               [({'site': url}, sample['status'] or 0) for url, sample in latest.items()])
+        metric('jobmonitor_site_listings', 'gauge', 'Listings matched by the site selector',
+               [({'site': url}, sample['listings']) for url, sample in latest.items()
+                if sample['listings'] is not None])
+        metric('jobmonitor_site_jobs', 'gauge', 'Listings that passed the keyword filters',
+               [({'site': url}, sample['jobs']) for url, sample in latest.items() if sample['jobs'] is not None])
+        metric('jobmonitor_site_filter_hit_ratio', 'gauge', 'Share of matched listings that passed the filters',
+               [({'site': url}, round(sample['jobs'] / sample['listings'], 4)) for url, sample in latest.items()
+                if sample['listings']])
+        metric('jobmonitor_site_fetches_total', 'counter', 'Fetches per site',
+               [({'site': url}, counters['fetches']) for url, counters in self.counters.items()])
+        metric('jobmonitor_site_errors_total', 'counter', 'Failed fetches per site',
+               [({'site': url}, counters['errors']) for url, counters in self.counters.items()])
+        metric('jobmonitor_site_not_modified_total', 'counter', 'Fetches answered from the HTTP validator cache',
+               [({'site': url}, counters['not_modified']) for url, counters in self.counters.items()])
+        metric('jobmonitor_site_bytes_total', 'counter', 'Response bytes downloaded per site',
+               [({'site': url}, counters['bytes']) for url, counters in self.counters.items()])
+        if self.last_cycle:
+            lines.append('# HELP jobmonitor_crawl_cycle_seconds Duration of the latest crawl cycle')
+            lines.append('# TYPE jobmonitor_crawl_cycle_seconds gauge')
+            lines.append(f"jobmonitor_crawl_cycle_seconds {self.last_cycle['seconds']}")
+            lines.append('# HELP jobmonitor_crawl_cycle_sites Sites in the latest crawl cycle')
+            lines.append('# TYPE jobmonitor_crawl_cycle_sites gauge')
+            lines.append(f"jobmonitor_crawl_cycle_sites {self.last_cycle['sites']}")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,200 @@
+"""
+Multi-process crawl mode: a coordinator feeding a pool of worker processes
+
+Sites are grouped by host, the groups are dealt into batches, and the
+batches are put on one shared multiprocessing queue. Each worker pulls a
+batch and crawls all of its host groups concurrently on its own event
+loop, then sends the jobs back on a result queue. Keeping a host's pages
+on one worker preserves per-host politeness while idle workers pick up
+whatever batch is next, so parsing spreads across all cores and the API
+process only merges results.
+
+Workers are spawned rather than forked, so they do not inherit the
+parent's threads, locks or open connections. The pool stays up between
+crawl cycles, so the workers import the app once rather than every
+cycle. Each batch carries the validator cache entries and rate limiter
+state of its hosts, and the worker sends both back with the jobs.
+"""
+
+import asyncio
+import atexit
+import multiprocessing
+import queue
+from collections import OrderedDict
+
+from crawler import DEFAULT_CONCURRENCY, DEFAULT_MAX_PAGE_BYTES, DEFAULT_PER_HOST, crawl, host_of
+from http_cache import ValidatorCache
+from rate_limiter import DomainRateLimiter
+
+RESULT_POLL_SECONDS = 5  # How often the coordinator checks for dead workers
+START_METHOD = 'spawn'  # Fresh interpreters; a forked child would copy the API process's threads and locks
+
+def group_by_host(websites):
+    """WEBSITES entries grouped by host, first occurrence of a URL wins"""
+    groups = OrderedDict()
+    seen = set()
+    for site in websites:
+        if site['url'] in seen:
+            continue
+        seen.add(site['url'])
+        groups.setdefault(host_of(site['url']), []).append(site)
+    return list(groups.values())
+
+BATCHES_PER_WORKER = 4  # More batches than workers so one slow batch does not hold up the rest
+
+def crawl_batch(loop, task):
+    """Fetch and parse one batch of host groups on the worker's event loop"""
+    cycle, batch_id, sites, cache_entries, limiter_state, parse, options = task
+    cache = ValidatorCache(None)
+    cache.entries = cache_entries
+    limiter = DomainRateLimiter(**options['limiter'])
+    limiter.merge(limiter_state)
+    samples = {}
+    try:
+        jobs_by_url = loop.run_until_complete(crawl(
+            sites, parse,
+            concurrency=options.get('concurrency', DEFAULT_CONCURRENCY),
+            per_host=options.get('per_host', DEFAULT_PER_HOST),
+            cache=cache,
+            limiter=limiter,
+            retries=options.get('retries', 3),
+            samples=samples,
+            listing_filter=options.get('listing_filter'),
+            stream=options.get('stream', False),
+            max_bytes=options.get('max_bytes', DEFAULT_MAX_PAGE_BYTES)
+        ))
+    except Exception as e:
+        print(f"Worker failed on batch {batch_id}: {e}")
+        jobs_by_url = {site['url']: None for site in sites}
+    return cycle, batch_id, jobs_by_url, cache.entries, limiter.export(), samples
+
+def worker_main(tasks, results):
+    """Worker loop: crawl batches on one event loop until the None sentinel arrives"""
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            results.put(crawl_batch(loop, task))
+    finally:
+        loop.close()
+
+class WorkerPool:
+    """Worker processes and their queues, kept alive across crawl cycles"""
+
+    def __init__(self, workers):
+        context = multiprocessing.get_context(START_METHOD)
+        self.tasks = context.Queue()
+        self.results = context.Queue()
+        self.cycle = 0
+        self.processes = [context.Process(target=worker_main, args=(self.tasks, self.results), daemon=True)
+                          for _ in range(workers)]
+        for process in self.processes:
+            process.start()
+
+    def healthy(self, workers):
+        return len(self.processes) == workers and all(process.is_alive() for process in self.processes)
+
+    def close(self):
+        for process in self.processes:
+            if process.is_alive():
+                self.tasks.put(None)
+        for process in self.processes:
+            process.join(timeout=RESULT_POLL_SECONDS)
+            if process.is_alive():
+                process.terminate()
+
+_pool = None
+
+def get_pool(workers):
+    """The shared worker pool, restarted if its size changed or a worker died"""
+    global _pool
+    if _pool is None or not _pool.healthy(workers):
+        if _pool is not None:
+            _pool.close()
+        else:
+            atexit.register(close_pool)
+        _pool = WorkerPool(workers)
+    return _pool
+
+def close_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+def crawl_in_processes(websites, parse, workers, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                       cache=None, on_progress=None, limiter=None, retries=3, samples=None,
+                       listing_filter=None, stream=False, max_bytes=DEFAULT_MAX_PAGE_BYTES):
+    """Crawl websites with the worker pool; same result shape and samples as crawler.crawl
+
+    parse and listing_filter must be module-level functions of an
+    importable module so the spawned workers can load them. limiter, a
+    rate_limiter.DomainRateLimiter, is updated with what the workers
+    learned about each host; pass the same one every cycle.
+    """
+    limiter = limiter or DomainRateLimiter()
+    groups = group_by_host(websites)
+    total = sum(len(group) for group in groups)
+    done = 0
+    if on_progress:
+        on_progress(done, total)
+
+    pool = get_pool(workers)
+    pool.cycle += 1
+    options = {
+        # Split the global cap between workers so the total stays the same
+        'concurrency': max(1, concurrency // workers),
+        'per_host': per_host,
+        'limiter': limiter.options(),
+        'retries': retries,
+        'listing_filter': listing_filter,
+        'stream': stream,
+        'max_bytes': max_bytes
+    }
+    # Deal the groups round-robin so every batch mixes large and small hosts
+    batch_count = min(len(groups), workers * BATCHES_PER_WORKER)
+    batches = [[site for group in groups[index::batch_count] for site in group] for index in range(batch_count)]
+    for batch_id, sites in enumerate(batches):
+        entries = {}
+        if cache is not None:
+            entries = {site['url']: cache.entries[site['url']] for site in sites if site['url'] in cache.entries}
+        pool.tasks.put((pool.cycle, batch_id, sites, entries,
+                        limiter.export({host_of(site['url']) for site in sites}), parse, options))
+
+    jobs_by_url = {}
+    pending = set(range(len(batches)))
+    while pending:
+        try:
+            cycle, batch_id, batch_jobs, cache_entries, limiter_state, batch_samples = pool.results.get(
+                timeout=RESULT_POLL_SECONDS)
+        except queue.Empty:
+            if not any(process.is_alive() for process in pool.processes):
+                print(f"All crawl workers exited with {len(pending)} batches unfinished")
+                break
+            continue
+        if cycle != pool.cycle:
+            continue  # Left over from a cycle that gave up on it
+        pending.discard(batch_id)
+        jobs_by_url.update(batch_jobs)
+        limiter.merge(limiter_state)
+        if samples is not None:
+            samples.update(batch_samples)
+        if cache is not None:
+            for url, entry in cache_entries.items():
+                if cache.entries.get(url) != entry:
+                    cache.entries[url] = entry
+                    cache.dirty = True
+            # A worker forgets a page whose parse failed; drop it here too
+            for site in batches[batch_id]:
+                if site['url'] not in cache_entries:
+                    cache.forget(site['url'])
+        done += len(batch_jobs)
+        if on_progress:
+            on_progress(done, total)
+
+    for batch_id in pending:
+        for site in batches[batch_id]:
+            jobs_by_url[site['url']] = None
+    return jobs_by_url
@@ -0,0 +1,317 @@
+"""
+Asyncio crawl engine for the job monitor
+"""
+
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import httpx
+
+from ats_sources import find_source
+from crawl_metrics import RequestTrace, new_sample
+from html_parsers import LXML_AVAILABLE, StreamingExtractor
+from http_cache import NOT_MODIFIED
+from http_pool import create_async_client
+from rate_limiter import RETRY_STATUSES, THROTTLE_STATUSES, backoff_delay, parse_retry_after
+
+DEFAULT_CONCURRENCY = 32  # Max requests in flight across all sites
+DEFAULT_PER_HOST = 4  # Max requests in flight against a single host
+DEFAULT_RETRIES = 3  # Retries for 429/5xx and connection errors
+DEFAULT_MAX_PAGE_BYTES = 5 * 1024 * 1024  # Streamed bodies are cut off after this many bytes
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def host_of(url):
+    """Return the lower-cased host of a URL"""
+    return (urlsplit(url).hostname or "").lower()
+
+def unique_sites(websites):
+    """Drop duplicate WEBSITES entries, keeping the first selector seen per URL"""
+    seen = {}
+    for site in websites:
+        seen.setdefault(site['url'], site)
+    return list(seen.values())
+
+class HostLimits(dict):
+    """Lazily created per-host semaphores"""
+
+    def __init__(self, per_host):
+        super().__init__()
+        self.per_host = per_host
+
+class CrawlContext:
+    """Shared state of one crawl run"""
+
+    def __init__(self, client, parse, concurrency, per_host, cache=None, limiter=None,
+                 retries=DEFAULT_RETRIES, samples=None, listing_filter=None, stream=False,
+                 max_bytes=DEFAULT_MAX_PAGE_BYTES):
+        self.client = client
+        self.parse = parse
+        self.global_limit = asyncio.Semaphore(concurrency)
+        self.host_limits = HostLimits(per_host)
+        self.cache = cache
+        self.limiter = limiter
+        self.retries = retries
+        self.samples = samples  # url -> crawl_metrics sample, filled in when given
+        self.listing_filter = listing_filter  # filter(listings, url) -> jobs, for ATS feeds and streamed pages
+        # Extract pages while downloading them; without lxml they are parsed after download
+        self.stream = stream and listing_filter is not None and LXML_AVAILABLE
+        self.max_bytes = max_bytes
+        # lxml parsers must stay on the thread that created them, so all
+        # streamed pages are extracted on one dedicated thread
+        self.stream_executor = ThreadPoolExecutor(max_workers=1) if self.stream else None
+
+def timed_call(func, *args):
+    """Call func and also return how long it took"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+async def fetch_with_retries(ctx, url, host, sample=None, consume=None):
+    """GET a URL politely, retrying 429/5xx and transport errors with backoff
+
+    Returns the final response, or None if the host had to be skipped.
+    Raises httpx.HTTPError once retries are exhausted. sample, if given,
+    gets the attempt count and the phase timings of the last attempt.
+    consume, if given, is awaited with the open streamed response while
+    the connection slot is still held; the body is never buffered.
+    """
+    host_limit = ctx.host_limits.setdefault(host, asyncio.Semaphore(ctx.host_limits.per_host))
+    for attempt in range(ctx.retries + 1):
+        if ctx.limiter is not None:
+            wait = ctx.limiter.reserve(host)
+            if wait is None:
+                print(f"Skipping {url}: {host} is rate limited")
+                return None
+            if wait:
+                await asyncio.sleep(wait)
+
+        response, error = None, None
+        trace = RequestTrace()
+        # Wait for the host first, so a busy host does not hold global slots
+        async with host_limit, ctx.global_limit:
+            try:
+                headers = ctx.cache.request_headers(url) if ctx.cache is not None else {}
+                if consume is None:
+                    response = await ctx.client.get(url, headers=headers, extensions={'trace': trace})
+                else:
+                    request = ctx.client.build_request('GET', url, headers=headers, extensions={'trace': trace})
+                    response = await ctx.client.send(request, stream=True)
+                    try:
+                        if response.status_code not in RETRY_STATUSES:
+                            await consume(response)
+                    finally:
+                        await response.aclose()
+            except httpx.TransportError as e:
+                error = e
+        if sample is not None:
+            sample['attempts'] = attempt + 1
+            sample['timings'].update(trace.timings())
+
+        if response is not None and response.status_code not in RETRY_STATUSES:
+            if ctx.limiter is not None:
+                ctx.limiter.succeeded(host)
+            return response
+
+        retry_after = None
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if ctx.limiter is not None and response.status_code in THROTTLE_STATUSES:
+                ctx.limiter.throttled(host, retry_after)
+        if attempt == ctx.retries:
+            if error is not None:
+                raise error
+            return response
+
+        delay = backoff_delay(attempt)
+        if retry_after is not None and ctx.limiter is None:
+            # Without a limiter the Retry-After wait has to happen here
+            delay = max(delay, retry_after)
+        await asyncio.sleep(delay)
+
+async def stream_listings(ctx, response, selector, state):
+    """Feed a streamed body to a StreamingExtractor, collecting raw listings
+
+    Reading stops at ctx.max_bytes; the listings found up to there are kept.
+    """
+    if not response.is_success:
+        return
+    loop = asyncio.get_running_loop()
+    extractor = await loop.run_in_executor(ctx.stream_executor, StreamingExtractor, selector,
+                                           response.charset_encoding or 'utf-8')
+    digest = hashlib.sha256()
+    async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+        if state['bytes'] + len(chunk) > ctx.max_bytes:
+            state['truncated'] = True
+            break
+        state['bytes'] += len(chunk)
+        digest.update(chunk)
+        listings, seconds = await loop.run_in_executor(ctx.stream_executor, timed_call, extractor.feed, chunk)
+        state['listings'].extend(listings)
+        state['parse_seconds'] += seconds
+    listings, seconds = await loop.run_in_executor(ctx.stream_executor, timed_call, extractor.close)
+    state['listings'].extend(listings)
+    state['parse_seconds'] += seconds
+    state['digest'] = digest.hexdigest()
+
+async def fetch_feed(ctx, site, sample, adapter, feed_url):
+    """Fetch a site's ATS JSON feed instead of its page
+
+    Returns filtered jobs or NOT_MODIFIED, or None when the feed cannot be
+    used and the HTML page should be crawled instead.
+    """
+    url = site['url']
+    start = time.perf_counter()
+    try:
+        response = await fetch_with_retries(ctx, feed_url, host_of(feed_url), sample)
+        if response is None:
+            return None
+        if response.status_code != 304:
+            response.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"Could not read the {adapter.name} feed for {url} ({e!r}), crawling the page instead")
+        return None
+    if ctx.cache is not None and ctx.cache.is_unchanged(feed_url, response.status_code, response.headers,
+                                                         response.content):
+        jobs = NOT_MODIFIED
+    else:
+        try:
+            # No DOM to build, so filtering the feed is cheap enough for the event loop
+            jobs, parse_seconds = timed_call(
+                lambda: ctx.listing_filter(adapter.listings(response.json()), url))
+        except (ValueError, AttributeError) as e:
+            print(f"Unexpected {adapter.name} feed for {url} ({e}), crawling the page instead")
+            if ctx.cache is not None:
+                ctx.cache.forget(feed_url)
+            return None
+        sample['timings']['parse'] = parse_seconds
+        sample['jobs'] = len(jobs)
+        sample['listings'] = getattr(jobs, 'listings', None)
+    sample.update(source=adapter.name, status=response.status_code, bytes=len(response.content),
+                  seconds=time.perf_counter() - start)
+    return jobs
+
+async def fetch_site(ctx, site):
+    """Fetch and parse a single site
+
+    Sites hosted by a known ATS are read from its JSON feed when a listing
+    filter is set. Returns filtered jobs, NOT_MODIFIED, or None if the
+    fetch failed.
+    """
+    url = site['url']
+    sample = new_sample(url)
+    if ctx.samples is not None:
+        ctx.samples[url] = sample
+    source = find_source(url) if ctx.listing_filter is not None else None
+    if source is not None:
+        jobs = await fetch_feed(ctx, site, sample, *source)
+        if jobs is not None:
+            return jobs
+    state = None
+    consume = None
+    if ctx.stream:
+        state = {'listings': [], 'bytes': 0, 'parse_seconds': 0.0, 'digest': None, 'truncated': False}
+
+        async def consume(response):
+            state.update(listings=[], bytes=0, parse_seconds=0.0, truncated=False)
+            await stream_listings(ctx, response, site['selector'], state)
+
+    start = time.perf_counter()
+    try:
+        response = await fetch_with_retries(ctx, url, host_of(url), sample, consume)
+        if response is None:
+            sample['error'] = 'rate limited'
+            return None
+        sample['status'] = response.status_code
+        sample['bytes'] = state['bytes'] if state is not None else len(response.content)
+        if response.status_code != 304:
+            response.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"Error fetching {url}: {e!r}")
+        sample['error'] = repr(e)
+        return None
+    finally:
+        sample['seconds'] = time.perf_counter() - start
+
+    loop = asyncio.get_running_loop()
+    # is_unchanged stores the new validators, so they must go again if parsing
+    # fails; otherwise the next cycle would skip the page as unchanged
+    try:
+        if state is not None:
+            if state['truncated']:
+                print(f"Stopped reading {url} after {ctx.max_bytes} bytes")
+            sample['timings']['parse'] = state['parse_seconds']
+            if ctx.cache is not None and ctx.cache.is_unchanged(url, response.status_code, response.headers,
+                                                                 digest=state['digest']):
+                return NOT_MODIFIED
+            jobs = ctx.listing_filter(state['listings'], url)
+        else:
+            if ctx.cache is not None and ctx.cache.is_unchanged(url, response.status_code, response.headers,
+                                                                 response.content):
+                return NOT_MODIFIED
+            # Parse outside the semaphores so a slow parse does not hold a connection slot
+            jobs, parse_seconds = await loop.run_in_executor(None, timed_call, ctx.parse, response.text, url,
+                                                             site['selector'])
+            sample['timings']['parse'] = parse_seconds
+    except Exception:
+        if ctx.cache is not None:
+            ctx.cache.forget(url)
+        raise
+    sample['seconds'] = time.perf_counter() - start
+    sample['jobs'] = len(jobs)
+    sample['listings'] = getattr(jobs, 'listings', None)
+    return jobs
+
+async def crawl(websites, parse, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                cache=None, on_progress=None, limiter=None, retries=DEFAULT_RETRIES, samples=None,
+                listing_filter=None, stream=False, max_bytes=DEFAULT_MAX_PAGE_BYTES):
+    """Crawl all websites concurrently and return {url: [jobs], NOT_MODIFIED or None}
+
+    on_progress(done, total) is called once up front and after every site.
+    limiter is a rate_limiter.DomainRateLimiter; pass the same one every
+    cycle so hosts that throttled us stay slowed down. samples, a dict, is
+    filled with one crawl_metrics sample per site. listing_filter, a
+    filter(listings, url) callable, turns raw listings into jobs; with it,
+    ATS-hosted boards are read from their JSON feeds, and with stream as
+    well, pages are extracted chunk by chunk as they download instead of
+    with parse, and cut off at max_bytes.
+    """
+    sites = unique_sites(websites)
+    done = 0
+    if on_progress:
+        on_progress(done, len(sites))
+
+    async def run(ctx, site):
+        nonlocal done
+        try:
+            return await fetch_site(ctx, site)
+        finally:
+            done += 1
+            if on_progress:
+                on_progress(done, len(sites))
+
+    async with create_async_client(concurrency, per_host) as client:
+        ctx = CrawlContext(client, parse, concurrency, per_host, cache, limiter, retries, samples,
+                           listing_filter, stream, max_bytes)
+        try:
+            results = await asyncio.gather(
+                *(run(ctx, site) for site in sites),
+                return_exceptions=True
+            )
+        finally:
+            if ctx.stream_executor is not None:
+                ctx.stream_executor.shutdown(wait=False)
+
+    jobs_by_url = {}
+    for site, result in zip(sites, results):
+        if isinstance(result, Exception):
+            print(f"Error scraping {site['url']}: {result}")
+            result = None
+        jobs_by_url[site['url']] = result
+    return jobs_by_url
+
+def crawl_websites(websites, parse, **options):
+    """Synchronous entry point used by the scheduler; options are passed to crawl()"""
+    return asyncio.run(crawl(websites, parse, **options))
@@ -0,0 +1,32 @@
+"""
+Standalone crawler daemon
+
+Runs the scheduler and all crawls outside the API process. Start one or
+more of these per deployment next to any number of API processes started
+with JOBS_API_MODE=read-only (e.g. under gunicorn); the scheduler file
+lock makes exactly one daemon the leader and the others wait on standby
+to take over if it exits.
+
+Usage:
+    python crawler_daemon.py
+"""
+
+import time
+
+import main as scraper
+
+LOCK_RETRY_SECONDS = 10  # How often a standby daemon tries to take over
+
+def run():
+    announced = False
+    while not scraper.start_scheduler():
+        if not announced:
+            print(f"Another process holds {scraper.CRAWL_LOCK_FILE}; waiting on standby")
+            announced = True
+        time.sleep(LOCK_RETRY_SECONDS)
+    print("Crawler daemon is the scheduler leader")
+    while True:
+        time.sleep(60)
+
+if __name__ == '__main__':
+    run()
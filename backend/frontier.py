@@ -0,0 +1,207 @@
+"""
+Crawl frontier: the deduplicated set of career pages to crawl
+
+URLs are ingested from companies.md-style lists and from WEBSITES,
+deduplicated on their normalized form and stored with their crawl state
+in SQLite. The frontier is split into shards with a consistent-hash ring
+keyed by host, so every host belongs to exactly one worker and adding a
+worker only moves ~1/N of the hosts.
+
+Usage:
+    python frontier.py ingest companies.md
+    python frontier.py shards 4
+"""
+
+import argparse
+import bisect
+import hashlib
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_SELECTOR = "div.job-listing, .job-card, .career-item"
+
+URL_PATTERN = re.compile(r'https?://[^\s<>()"\']+', re.IGNORECASE)
+BARE_URL_PATTERN = re.compile(r'^(?:www\.)?[a-z0-9-]+(?:\.[a-z0-9-]+)+(?:/\S*)?$', re.IGNORECASE)
+TRACKING_PARAMS = ('utm_', 'gh_src')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    url_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    host TEXT NOT NULL,
+    selector TEXT NOT NULL,
+    source TEXT,
+    added_at TEXT NOT NULL,
+    last_crawled TEXT,
+    last_status TEXT,
+    crawl_count INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_frontier_host ON frontier (host);
+"""
+
+def with_scheme(url):
+    """URL as it will be fetched; bare domains default to https"""
+    url = url.strip().rstrip('.,;')
+    if not re.match(r'^https?://', url, re.IGNORECASE):
+        url = 'https://' + url
+    return url
+
+def normalize_url(url):
+    """Canonical URL: lower-case scheme and host, no fragment, tracking params or trailing slash"""
+    parts = urlsplit(with_scheme(url))
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode([(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                       if not key.lower().startswith(TRACKING_PARAMS)])
+    return urlunsplit((parts.scheme.lower(), host, parts.path.rstrip('/'), query, ''))
+
+def url_key(url):
+    """Deduplication key: normalized URL ignoring the scheme and a leading www."""
+    parts = urlsplit(normalize_url(url))
+    host = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+    return urlunsplit(('', host, parts.path, parts.query, '')).lstrip('/')
+
+def host_key(url):
+    """Host used for sharding, without a leading www."""
+    return url_key(url).split('/', 1)[0]
+
+def parse_url_list(text):
+    """Career URLs from a companies.md-style list, in file order
+
+    Lines may hold full URLs anywhere in the text or a bare domain/path
+    such as "glean.com/careers"; headings and placeholders like "NA" are
+    ignored.
+    """
+    urls = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        found = URL_PATTERN.findall(line)
+        if found:
+            urls.extend(found)
+        elif BARE_URL_PATTERN.match(line):
+            urls.append(line)
+    return urls
+
+class HashRing:
+    """Consistent-hash ring mapping keys to shard indexes"""
+
+    def __init__(self, shard_count, replicas=100):
+        self.shard_count = shard_count
+        self.ring = []
+        for shard in range(shard_count):
+            for replica in range(replicas):
+                self.ring.append((self._hash(f"{shard}:{replica}"), shard))
+        self.ring.sort()
+        self.points = [point for point, _ in self.ring]
+
+    @staticmethod
+    def _hash(key):
+        return int(hashlib.md5(key.encode('utf-8')).hexdigest()[:16], 16)
+
+    def shard_for(self, key):
+        index = bisect.bisect(self.points, self._hash(key)) % len(self.ring)
+        return self.ring[index][1]
+
+class Frontier:
+    """Deduplicated crawl targets and their crawl state"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def add(self, urls, selector=DEFAULT_SELECTOR, source=None):
+        """Insert URLs that are not already known; returns how many were new"""
+        now = datetime.now().isoformat()
+        rows = {}
+        for url in urls:
+            key = url_key(url)
+            if key not in rows:
+                # The first spelling seen is kept as the URL to fetch
+                rows[key] = (key, with_scheme(url), host_key(url), selector, source, now)
+        conn = self.connection()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                """INSERT OR IGNORE INTO frontier (url_key, url, host, selector, source, added_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                list(rows.values())
+            )
+            return conn.total_changes - before
+
+    def add_websites(self, websites, source='WEBSITES'):
+        """Add WEBSITES entries, keeping their own selectors"""
+        added = 0
+        for site in websites:
+            added += self.add([site['url']], site['selector'], source)
+        return added
+
+    def ingest_file(self, path, selector=DEFAULT_SELECTOR):
+        with open(path, 'r', encoding='utf-8') as f:
+            return self.add(parse_url_list(f.read()), selector, source=path)
+
+    def sites(self, shard_index=None, shard_count=1):
+        """Frontier entries as WEBSITES-style dicts, optionally only one shard"""
+        ring = HashRing(shard_count) if shard_count > 1 else None
+        sites = []
+        for row in self.connection().execute("SELECT url, host, selector FROM frontier ORDER BY added_at, url"):
+            if ring is not None and shard_index is not None and ring.shard_for(row['host']) != shard_index:
+                continue
+            sites.append({'url': row['url'], 'selector': row['selector']})
+        return sites
+
+    def record_results(self, outcomes):
+        """Store {url: outcome} from a crawl, outcome being 'changed', 'unchanged' or 'error'"""
+        now = datetime.now().isoformat()
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                """UPDATE frontier SET last_crawled = ?, last_status = ?,
+                       crawl_count = crawl_count + 1,
+                       error_count = error_count + (? = 'error')
+                   WHERE url_key = ?""",
+                [(now, outcome, outcome, url_key(url)) for url, outcome in outcomes.items()]
+            )
+
+    def count(self):
+        return self.connection().execute("SELECT COUNT(*) FROM frontier").fetchone()[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the crawl frontier")
+    parser.add_argument('--db', default='frontier.db')
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help='Add URLs from one or more URL list files')
+    ingest.add_argument('files', nargs='+')
+    ingest.add_argument('--selector', default=DEFAULT_SELECTOR)
+    shards = commands.add_parser('shards', help='Show how the frontier splits across N shards')
+    shards.add_argument('count', type=int)
+    args = parser.parse_args()
+
+    frontier = Frontier(args.db)
+    if args.command == 'ingest':
+        for path in args.files:
+            added = frontier.ingest_file(path, args.selector)
+            print(f"{path}: {added} new URLs")
+        print(f"Frontier now holds {frontier.count()} URLs")
+    elif args.command == 'shards':
+        for shard in range(args.count):
+            print(f"Shard {shard}: {len(frontier.sites(shard, args.count))} URLs")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+Pluggable HTML parsing backends for career pages
+
+Each backend turns a page into raw listings - (title, link, description)
+tuples - for the elements matching a WEBSITES selector. Selectors are
+compiled once per backend and reused across pages and crawl cycles.
+
+Backends, fastest first (install the optional packages to enable them):
+    selectolax - pip install selectolax
+    lxml       - pip install lxml cssselect
+    bs4        - BeautifulSoup, always available
+
+StreamingExtractor (lxml) extracts the same listings from a page fed in
+chunks, without ever holding the whole document.
+"""
+
+from functools import lru_cache
+
+from bs4 import BeautifulSoup
+import soupsieve
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    import cssselect
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+TITLE_TAGS = ('h2', 'h3', 'h4')
+HIDDEN_TAGS = ('script', 'style', 'noscript')  # Never part of a listing's text
+
+def _joined_text(strings):
+    """Concatenate stripped text nodes, matching BeautifulSoup's get_text(strip=True)"""
+    return ''.join(text.strip() for text in strings if text and text.strip())
+
+def _href(href):
+    """A link target, or '' for a missing or blank href; every backend skips those links"""
+    return (href or '').strip()
+
+class SelectolaxBackend:
+    name = 'selectolax'
+
+    def compile(self, selector):
+        # lexbor compiles selectors internally; nothing to precompute
+        return selector
+
+    def listings(self, html, compiled):
+        tree = SelectolaxParser(html)
+        tree.strip_tags(list(HIDDEN_TAGS))
+        for job in tree.css(compiled):
+            title_elem = None
+            for tag in TITLE_TAGS:
+                title_elem = job.css_first(tag)
+                if title_elem is not None:
+                    break
+            title_elem = title_elem or job
+            link = next((href for href in (_href(a.attributes.get('href')) for a in job.css('a[href]')) if href), '')
+            description_elem = job.css_first('p') or job.css_first('div.description') or job
+            yield (
+                title_elem.text(deep=True, separator='', strip=True),
+                link,
+                description_elem.text(deep=True, separator='', strip=True)
+            )
+
+class LxmlBackend:
+    name = 'lxml'
+
+    def compile(self, selector):
+        return CSSSelector(selector)
+
+    # Text nodes only, without the contents of HIDDEN_TAGS; streamed pages are
+    # not stripped beforehand, so the text itself has to skip them
+    text_nodes = etree.XPath('.//text()[not(ancestor::script or ancestor::style or ancestor::noscript)]') \
+        if LXML_AVAILABLE else None
+
+    @classmethod
+    def _text(cls, elem):
+        return _joined_text(cls.text_nodes(elem))
+
+    @staticmethod
+    def _visible(elems):
+        """Elements outside HIDDEN_TAGS, which streamed pages still contain"""
+        return (elem for elem in elems if not any(parent.tag in HIDDEN_TAGS for parent in elem.iterancestors()))
+
+    @classmethod
+    def listing(cls, job):
+        """(title, link, description) of one matched element"""
+        title_elem = None
+        for tag in TITLE_TAGS:
+            title_elem = next(cls._visible(job.iterdescendants(tag)), None)
+            if title_elem is not None:
+                break
+        title_elem = title_elem if title_elem is not None else job
+        link = next((href for href in (_href(a.get('href')) for a in cls._visible(job.iterdescendants('a')))
+                     if href), '')
+        description_elem = next(cls._visible(job.iterdescendants('p')), None)
+        if description_elem is None:
+            description_elem = next(
+                (div for div in cls._visible(job.iterdescendants('div'))
+                 if 'description' in (div.get('class') or '').split()),
+                job
+            )
+        return (
+            cls._text(title_elem),
+            link,
+            cls._text(description_elem)
+        )
+
+    def listings(self, html, compiled):
+        if not html.strip():
+            return
+        root = lxml.html.fromstring(html)
+        etree.strip_elements(root, *HIDDEN_TAGS, with_tail=False)
+        for job in compiled(root):
+            yield self.listing(job)
+
+class SoupBackend:
+    name = 'bs4'
+
+    def compile(self, selector):
+        return soupsieve.compile(selector)
+
+    def listings(self, html, compiled):
+        soup = BeautifulSoup(html, 'html.parser')
+        for hidden in soup.find_all(HIDDEN_TAGS):
+            hidden.decompose()
+        for job in compiled.select(soup):
+            title_elem = job.find('h2') or job.find('h3') or job.find('h4') or job
+            link_elem = job.find('a', href=_href)
+            description_elem = job.find('p') or job.find('div', class_='description') or job
+            yield (
+                title_elem.get_text(strip=True),
+                _href(link_elem['href']) if link_elem else '',
+                description_elem.get_text(strip=True)
+            )
+
+BACKENDS = {
+    'selectolax': (SelectolaxBackend, SELECTOLAX_AVAILABLE),
+    'lxml': (LxmlBackend, LXML_AVAILABLE),
+    'bs4': (SoupBackend, True),
+}
+
+class StreamingSelector:
+    """A CSS selector tested against one element at a time
+
+    Selectors without combinators compile to a self:: XPath test on the
+    element alone. Groups with combinators are evaluated against the
+    partial document, which only holds the element's ancestors and the
+    listings still being read.
+    """
+
+    def __init__(self, selector):
+        translator = cssselect.GenericTranslator()
+        simple, combined = [], []
+        for parsed in cssselect.parse(selector):
+            if isinstance(parsed.parsed_tree, cssselect.parser.CombinedSelector):
+                combined.append(translator.selector_to_xpath(parsed))
+            else:
+                simple.append(translator.selector_to_xpath(parsed, prefix='self::'))
+        self.simple = etree.XPath(' | '.join(simple)) if simple else None
+        self.combined = etree.XPath(' | '.join(combined)) if combined else None
+
+    def matches(self, elem):
+        if self.simple is not None and self.simple(elem):
+            return True
+        if self.combined is None:
+            return False
+        return any(found is elem for found in self.combined(elem.getroottree().getroot()))
+
+@lru_cache(maxsize=1024)
+def compile_streaming_selector(selector):
+    return StreamingSelector(selector)
+
+class StreamingExtractor:
+    """Extract listings from a page fed in chunks; requires lxml
+
+    Elements are matched when they open and discarded as soon as they close
+    unless they belong to a listing that is still open, so memory stays
+    proportional to the nesting depth plus one listing. Selectors can
+    therefore look at ancestors but not at earlier siblings.
+    """
+
+    def __init__(self, selector, encoding=None):
+        if not LXML_AVAILABLE:
+            raise ValueError("Streaming extraction needs lxml and cssselect")
+        self.selector = compile_streaming_selector(selector)
+        self.parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+        self.open_listings = []
+
+    def feed(self, data):
+        """Parse another chunk; returns the listings completed by it"""
+        self.parser.feed(data)
+        return self._drain()
+
+    def close(self):
+        """Finish the document; returns the remaining listings"""
+        try:
+            self.parser.close()
+        except etree.XMLSyntaxError:
+            pass  # Empty or truncated document
+        return self._drain()
+
+    def _drain(self):
+        found = []
+        for event, elem in self.parser.read_events():
+            if event == 'start':
+                if self.selector.matches(elem):
+                    self.open_listings.append(elem)
+                continue
+            if self.open_listings and self.open_listings[-1] is elem:
+                self.open_listings.pop()
+                found.append(LxmlBackend.listing(elem))
+            if not self.open_listings:
+                elem.clear()
+                parent = elem.getparent()
+                if parent is not None:
+                    while elem.getprevious() is not None:
+                        del parent[0]
+        return found
+
+@lru_cache(maxsize=None)
+def get_backend(name='auto'):
+    """Backend instance by name; 'auto' picks the fastest one installed"""
+    if name == 'auto':
+        for candidate in ('selectolax', 'lxml', 'bs4'):
+            if BACKENDS[candidate][1]:
+                return BACKENDS[candidate][0]()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name}")
+    backend_class, available = BACKENDS[name]
+    if not available:
+        raise ValueError(f"Parser backend {name} is not installed")
+    return backend_class()
+
+@lru_cache(maxsize=1024)
+def compile_selector(backend_name, selector):
+    """Compiled selector, cached so each WEBSITES selector is compiled once"""
+    return get_backend(backend_name).compile(selector)
+
+def extract_listings(html, selector, backend_name='auto'):
+    """Yield (title, link, description) for every element matching selector"""
+    backend = get_backend(backend_name)
+    return backend.listings(html, compile_selector(backend_name, selector))
@@ -0,0 +1,86 @@
+"""
+Persistent HTTP validator cache for conditional career page fetches
+"""
+
+import hashlib
+import json
+import os
+
+class _NotModified:
+    """Singleton marker that survives pickling, e.g. from crawl worker processes"""
+
+    def __repr__(self):
+        return 'NOT_MODIFIED'
+
+    def __reduce__(self):
+        return 'NOT_MODIFIED'
+
+NOT_MODIFIED = _NotModified()  # Returned instead of a job list when a page is unchanged
+
+def body_digest(content):
+    """Digest of a raw response body"""
+    return hashlib.sha256(content).hexdigest()
+
+class ValidatorCache:
+    """ETag / Last-Modified / body digest per URL, stored as JSON"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+        return self
+
+    def save(self):
+        if not self.dirty or self.path is None:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def request_headers(self, url):
+        """Conditional request headers for a URL we have seen before"""
+        entry = self.entries.get(url, {})
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def is_unchanged(self, url, status_code, headers, content=b'', digest=None):
+        """Record a response and report whether the page can be skipped
+
+        A 304, or a 200 whose body digest matches the previous one, counts
+        as unchanged. Otherwise the new validators are stored, so a caller
+        whose parse of the new body fails must forget(url). Streamed bodies
+        pass their precomputed digest instead of the content.
+        """
+        entry = self.entries.get(url)
+        if status_code == 304:
+            return entry is not None
+
+        digest = digest or body_digest(content)
+        unchanged = entry is not None and entry.get('digest') == digest
+        new_entry = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'digest': digest
+        }
+        if new_entry != entry:
+            self.entries[url] = new_entry
+            self.dirty = True
+        return unchanged
+
+    def forget(self, url):
+        """Drop a URL so the next fetch is unconditional"""
+        if self.entries.pop(url, None) is not None:
+            self.dirty = True
@@ -0,0 +1,44 @@
+"""
+Shared, pooled HTTP transport for the crawler
+
+Connections are kept alive and reused across requests to the same host.
+HTTP/2 is used when the optional `h2` package is installed
+(pip install "httpx[http2]").
+"""
+
+import httpx
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+}
+REQUEST_TIMEOUT = 15
+POOL_PER_HOST = 4  # Keep-alive connections per host
+KEEPALIVE_EXPIRY = 60  # Seconds an idle connection is kept open
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+def create_async_client(max_connections, per_host=POOL_PER_HOST, http2=None):
+    """Pooled httpx.AsyncClient; must be created inside the running event loop
+
+    httpx only limits connections globally, so callers enforce per-host
+    limits themselves (see crawler.HostLimits). `per_host` sizes the
+    keep-alive pool so every host can keep its slots warm.
+    """
+    if http2 is None:
+        http2 = HTTP2_AVAILABLE
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max(max_connections, per_host),
+        keepalive_expiry=KEEPALIVE_EXPIRY
+    )
+    return httpx.AsyncClient(
+        headers=HEADERS,
+        timeout=REQUEST_TIMEOUT,
+        follow_redirects=True,
+        limits=limits,
+        http2=http2
+    )
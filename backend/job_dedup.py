@@ -0,0 +1,218 @@
+"""
+Cross-site deduplication of job postings with MinHash / LSH
+
+The same role is often listed on the company's own careers page and on
+one or more aggregators. Each job is reduced to character shingles of its
+normalized title, company and location; a MinHash signature of those
+shingles is split into LSH bands so near-duplicates are found with a few
+bucket lookups instead of comparing against every stored job. Matches are
+unioned into clusters, and the job store marks one canonical job per
+cluster for the API and notifications.
+
+Only jobs whose company is known are clustered, and only with jobs of
+the same company: a generic title such as "Full Stack Engineer" on an
+aggregator says nothing about who is hiring. Aggregator listings get a
+company from a "<role> at <Company>" title when they have one.
+"""
+
+import hashlib
+import random
+import re
+from collections import Counter
+from urllib.parse import urlsplit
+
+from ats_sources import find_source
+from job_diff import normalize_title
+
+NUM_HASHES = 64  # MinHash signature length
+BANDS = 16  # LSH bands of NUM_HASHES // BANDS rows; candidates share at least one band
+SHINGLE_SIZE = 4  # Characters per shingle
+SIMILARITY_THRESHOLD = 0.6  # Estimated Jaccard similarity needed to merge two jobs
+MIN_SHARED_BANDS = 2  # LSH bands a candidate must share before its similarity is computed
+
+# Hosts that list other companies' jobs; their copies are never canonical when a direct one exists
+AGGREGATOR_HOSTS = ('linkedin.com', 'remote.co', 'weworkremotely.com', 'indeed.com', 'glassdoor.com',
+                    'wellfound.com', 'builtin.com', 'remoteok.com')
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+_TITLE_COMPANY = re.compile(r'^(.*\S)\s+(?:at|@)\s+([a-z0-9][\w&.\'-]*)', re.IGNORECASE)
+_MASKS = [random.Random(seed).getrandbits(64) for seed in range(NUM_HASHES)]
+
+def _host(url):
+    host = (urlsplit(url or '').hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+def is_aggregator(url):
+    host = _host(url)
+    return any(host == aggregator or host.endswith('.' + aggregator) for aggregator in AGGREGATOR_HOSTS)
+
+def company_of(site, link=None):
+    """Best-effort company name for a job: the ATS board or the employer's domain, '' if unknown"""
+    for url in (site, link):
+        source = find_source(url or '')
+        if source is not None:
+            return source[0].board_token(url).lower()
+    for url in (link, site):
+        if url and not is_aggregator(url):
+            labels = _host(url).split('.')
+            if len(labels) >= 2:
+                return labels[-2]
+    return ''
+
+def split_title_company(title):
+    """(role, company) of a "<role> at <Company>" title; company is '' if the title names none"""
+    match = _TITLE_COMPANY.match((title or '').strip())
+    if match is None:
+        return title, ''
+    return match.group(1), _NON_WORD.sub('', match.group(2).lower())
+
+def job_identity(site, link, title):
+    """(company, title) to index a job under
+
+    The company comes from the site or link, or, for aggregator listings,
+    from the title, which is then matched without its "at <Company>" part.
+    """
+    company = company_of(site, link)
+    if company:
+        return company, title
+    role, company = split_title_company(title)
+    return company, role if company else title
+
+def shingles(text):
+    """64-bit hashes of the character shingles of normalized text"""
+    text = _NON_WORD.sub(' ', normalize_title(text)).strip()
+    if len(text) <= SHINGLE_SIZE:
+        pieces = {text}
+    else:
+        pieces = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    return [int.from_bytes(hashlib.blake2b(piece.encode('utf-8'), digest_size=8).digest(), 'big')
+            for piece in pieces]
+
+def minhash(hashes):
+    """MinHash signature, one XOR-masked minimum per hash function"""
+    if not hashes:
+        return (0,) * NUM_HASHES
+    return tuple(min(map(mask.__xor__, hashes)) for mask in _MASKS)
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(a == b for a, b in zip(signature, other)) / NUM_HASHES
+
+class DedupIndex:
+    """LSH index of job signatures with union-find clusters
+
+    Keys are (site, job id). A job is only compared with live jobs of its
+    own company, and jobs from the same site are never merged. Jobs whose
+    company is unknown stay in clusters of their own.
+
+    Buckets hold signatures rather than single jobs, so a posting copied
+    to many sites is counted and compared once. Retired jobs leave their
+    group so they no longer match new postings; their union-find entries
+    stay so a job that comes back keeps its cluster id. The index is
+    rebuilt from the active jobs on start, which bounds that history.
+    """
+
+    def __init__(self):
+        self.rows = NUM_HASHES // BANDS
+        self.buckets = {}  # (company, band, band values) -> {signature: None}
+        self.groups = {}  # (company, signature) -> {live key: None}
+        self.signatures = {}  # Live keys only
+        self.companies = {}
+        self.parent = {}
+        self.clusters = {}  # root -> keys in its cluster, so members() never scans the whole index
+
+    def find(self, key):
+        root = key
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[key] != root:
+            self.parent[key], key = root, self.parent[key]
+        return root
+
+    def cluster_of(self, key):
+        return self.find(key) if key in self.parent else None
+
+    def union(self, key, other):
+        """Join the clusters of two keys, the smaller into the larger"""
+        root, other_root = self.find(key), self.find(other)
+        if root == other_root:
+            return
+        if len(self.clusters[root]) > len(self.clusters[other_root]):
+            root, other_root = other_root, root
+        self.parent[root] = other_root
+        self.clusters[other_root].extend(self.clusters.pop(root))
+
+    def _band_keys(self, company, signature):
+        for band in range(BANDS):
+            yield company, band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def _candidates(self, company, signature):
+        """Signatures of the company's jobs sharing at least MIN_SHARED_BANDS bands"""
+        shared = Counter()
+        for bucket in self._band_keys(company, signature):
+            members = self.buckets.get(bucket)
+            if members:
+                shared.update(members.keys())
+        return [other for other, bands in shared.items() if bands >= MIN_SHARED_BANDS]
+
+    def add(self, key, title, company='', location=''):
+        """Index a job; returns the keys of live jobs it duplicates"""
+        if key in self.signatures:
+            return []
+        if key not in self.parent:  # A job that comes back keeps its old cluster
+            self.parent[key] = key
+            self.clusters[key] = [key]
+        if not company:
+            return []
+        signature = minhash(shingles(' '.join(filter(None, [title, company, location]))))
+
+        merged = []
+        for other_signature in self._candidates(company, signature):
+            if similarity(signature, other_signature) < SIMILARITY_THRESHOLD:
+                continue
+            for other in self.groups[(company, other_signature)]:
+                if other[0] != key[0]:
+                    self.union(key, other)
+                    merged.append(other)
+
+        self.signatures[key] = signature
+        self.companies[key] = company
+        group = (company, signature)
+        if group not in self.groups:
+            self.groups[group] = {}
+            for bucket in self._band_keys(company, signature):
+                self.buckets.setdefault(bucket, {})[signature] = None
+        self.groups[group][key] = None
+        return merged
+
+    def remove(self, key):
+        """Retire a job: it stops matching new postings but keeps its cluster id"""
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        company = self.companies.pop(key)
+        group = (company, signature)
+        members = self.groups[group]
+        del members[key]
+        if members:
+            return
+        del self.groups[group]
+        for bucket in self._band_keys(company, signature):
+            del self.buckets[bucket][signature]
+            if not self.buckets[bucket]:
+                del self.buckets[bucket]
+
+    def cluster_ids(self, keys):
+        """{key: cluster id} for the given keys; the id is the root key as 'site|id'"""
+        return {key: '|'.join(self.find(key)) for key in keys if key in self.parent}
+
+    def members(self, cluster_keys):
+        """All keys in the same clusters as cluster_keys"""
+        roots = {self.find(key) for key in cluster_keys if key in self.parent}
+        return [key for root in roots for key in self.clusters[root]]
+
+def pick_canonical(rows):
+    """(site, id) of the job to show for a cluster: active, direct rather than aggregated, oldest"""
+    best = min(rows, key=lambda row: (not row['active'], is_aggregator(row['site']), row['first_seen'],
+                                      row['site'], row['id']))
+    return best['site'], best['id']
@@ -0,0 +1,62 @@
+"""
+Per-job identity and incremental diffing of scraped job lists
+"""
+
+import hashlib
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_title(title):
+    """Lower-case and collapse whitespace so cosmetic changes keep the same identity"""
+    return _WHITESPACE.sub(' ', (title or '').strip().lower())
+
+def normalize_link(link):
+    """Canonical form of a job link: lower-cased host, no fragment or trailing slash"""
+    if not link:
+        return ''
+    parts = urlsplit(link.strip())
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+def job_fingerprint(job):
+    """Stable identity of a job from its normalized title and link"""
+    key = f"{normalize_title(job.get('title'))}\n{normalize_link(job.get('link'))}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+def job_id(job):
+    """Fingerprint of a job, using the stored id when present"""
+    return job.get('id') or job_fingerprint(job)
+
+def fingerprint_jobs(jobs):
+    """Sorted fingerprints of a job list, as stored in the hash file"""
+    return sorted({job_id(job) for job in jobs})
+
+class JobDiff:
+    """Added, removed and unchanged jobs for one site"""
+
+    def __init__(self, added, removed, unchanged):
+        self.added = added  # New job dicts
+        self.removed = removed  # Fingerprints no longer listed
+        self.unchanged = unchanged  # Fingerprints still listed
+
+    @property
+    def changed(self):
+        return bool(self.added or self.removed)
+
+def diff_jobs(previous_fingerprints, jobs):
+    """Compare a fresh job list against the fingerprints seen last cycle"""
+    previous = set(previous_fingerprints or ())
+    added = []
+    seen = set()
+    for job in jobs:
+        fingerprint = job_id(job)
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        if fingerprint not in previous:
+            added.append(job)
+    removed = sorted(previous - seen)
+    unchanged = sorted(previous & seen)
+    return JobDiff(added, removed, unchanged)
@@ -0,0 +1,296 @@
+"""
+SQLite-backed job store (WAL mode) for scraped job postings
+
+The crawler is the single writer; API requests read through their own
+connections and never block on, or get blocked by, a crawl in progress.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+from job_diff import job_id
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    site TEXT NOT NULL,
+    id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT,
+    technologies TEXT NOT NULL DEFAULT '[]',
+    is_remote INTEGER NOT NULL DEFAULT 0,
+    scraped_at TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    active INTEGER NOT NULL DEFAULT 1,
+    location TEXT,
+    cluster_id TEXT,
+    canonical INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (site, id)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_first_seen ON jobs (first_seen, site, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_last_seen ON jobs (last_seen);
+CREATE INDEX IF NOT EXISTS idx_jobs_active_site ON jobs (active, site);
+CREATE TABLE IF NOT EXISTS job_technologies (
+    site TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    technology TEXT NOT NULL,
+    PRIMARY KEY (site, job_id, technology)
+);
+CREATE INDEX IF NOT EXISTS idx_job_technologies_technology ON job_technologies (technology);
+CREATE TABLE IF NOT EXISTS job_profiles (
+    site TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    PRIMARY KEY (site, job_id, profile)
+);
+CREATE INDEX IF NOT EXISTS idx_job_profiles_profile ON job_profiles (profile);
+"""
+
+# Columns added after the first release, with their definitions for ALTER TABLE
+MIGRATIONS = [
+    ("location", "TEXT"),
+    ("cluster_id", "TEXT"),
+    ("canonical", "INTEGER NOT NULL DEFAULT 1"),
+    ("profiles", "TEXT NOT NULL DEFAULT '[]'"),
+]
+POST_MIGRATION_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_jobs_cluster ON jobs (cluster_id);
+"""
+
+INSERT_COLUMNS = ("site, id, title, link, technologies, is_remote, scraped_at, first_seen, last_seen, location, "
+                  "profiles")
+JOB_COLUMNS = INSERT_COLUMNS + ", cluster_id"
+SQLITE_MAX_PARAMS = 900  # Stay under SQLite's bound-parameter limit in IN (...) lists
+
+def row_to_job(row, include_site=False):
+    """API representation of a jobs row"""
+    job = {
+        "id": row["id"],
+        "title": row["title"],
+        "link": row["link"],
+        "technologies": json.loads(row["technologies"]),
+        "is_remote": bool(row["is_remote"]),
+        "scraped_at": row["scraped_at"],
+        "first_seen": row["first_seen"],
+        "last_seen": row["last_seen"],
+        "location": row["location"],
+        "cluster_id": row["cluster_id"],
+        "profiles": json.loads(row["profiles"])
+    }
+    if include_site:
+        job["site"] = row["site"]
+    return job
+
+class JobStore:
+    """Job postings keyed by (site, fingerprint) with one connection per thread"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._migrate(conn)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _migrate(conn):
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        with conn:
+            for column, definition in MIGRATIONS:
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+        conn.executescript(POST_MIGRATION_SCHEMA)
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def is_empty(self):
+        return self.connection().execute("SELECT 1 FROM jobs LIMIT 1").fetchone() is None
+
+    def upsert_jobs(self, site, jobs, removed_ids=(), seen_at=None):
+        """Insert new jobs, refresh last_seen on listed ones and retire removed ones"""
+        seen_at = seen_at or datetime.now().isoformat()
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                f"""INSERT INTO jobs ({INSERT_COLUMNS}, active)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+                    ON CONFLICT (site, id) DO UPDATE SET
+                        last_seen = excluded.last_seen,
+                        technologies = excluded.technologies,
+                        profiles = excluded.profiles,
+                        active = 1""",
+                [(site, job["id"], job["title"], job.get("link", ""),
+                  json.dumps(job.get("technologies", [])), int(bool(job.get("is_remote"))),
+                  job.get("scraped_at") or seen_at, job.get("first_seen") or seen_at, seen_at,
+                  job.get("location"), json.dumps(job.get("profiles", [])))
+                 for job in jobs]
+            )
+            # Technologies and profiles follow the latest page and keyword_profiles.json,
+            # so they are replaced, not added to
+            conn.executemany("DELETE FROM job_technologies WHERE site = ? AND job_id = ?",
+                             [(site, job["id"]) for job in jobs])
+            conn.executemany(
+                "INSERT OR IGNORE INTO job_technologies (site, job_id, technology) VALUES (?, ?, ?)",
+                [(site, job["id"], tech) for job in jobs for tech in job.get("technologies", [])]
+            )
+            conn.executemany("DELETE FROM job_profiles WHERE site = ? AND job_id = ?",
+                             [(site, job["id"]) for job in jobs])
+            conn.executemany(
+                "INSERT OR IGNORE INTO job_profiles (site, job_id, profile) VALUES (?, ?, ?)",
+                [(site, job["id"], profile) for job in jobs for profile in job.get("profiles", [])]
+            )
+            if removed_ids:
+                conn.executemany(
+                    "UPDATE jobs SET active = 0 WHERE site = ? AND id = ?",
+                    [(site, fingerprint) for fingerprint in removed_ids]
+                )
+
+    def touch_site(self, site, seen_at=None):
+        """Mark every active job on a site as seen without rewriting the rows"""
+        conn = self.connection()
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET last_seen = ? WHERE site = ? AND active = 1",
+                (seen_at or datetime.now().isoformat(), site)
+            )
+
+    def assign_clusters(self, cluster_ids):
+        """Store {(site, id): cluster id} from the dedup index"""
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                "UPDATE jobs SET cluster_id = ? WHERE site = ? AND id = ?",
+                [(cluster_id, site, job_id) for (site, job_id), cluster_id in cluster_ids.items()]
+            )
+
+    def mark_canonical(self, cluster_ids, pick):
+        """Flag one job per cluster as canonical
+
+        pick(rows) gets a cluster's rows (site, id, link, active,
+        first_seen) and returns the (site, id) to keep.
+        """
+        cluster_ids = list(cluster_ids)
+        conn = self.connection()
+        with conn:
+            for start in range(0, len(cluster_ids), SQLITE_MAX_PARAMS):
+                chunk = cluster_ids[start:start + SQLITE_MAX_PARAMS]
+                rows = conn.execute(
+                    f"""SELECT site, id, link, active, first_seen, cluster_id FROM jobs
+                        WHERE cluster_id IN ({', '.join('?' * len(chunk))})""",
+                    chunk
+                ).fetchall()
+                clusters = {}
+                for row in rows:
+                    clusters.setdefault(row["cluster_id"], []).append(row)
+                conn.executemany(
+                    "UPDATE jobs SET canonical = (site = ? AND id = ?) WHERE cluster_id = ?",
+                    [pick(members) + (cluster_id,) for cluster_id, members in clusters.items()]
+                )
+
+    def load_dedup_rows(self):
+        """Active jobs as (site, id, title, link, location) for rebuilding the dedup index"""
+        return self.connection().execute(
+            "SELECT site, id, title, link, location FROM jobs WHERE active = 1 ORDER BY first_seen"
+        ).fetchall()
+
+    def load_all(self, canonical_only=False):
+        """All active jobs grouped as {site: [jobs]}, optionally one per duplicate cluster"""
+        jobs = {}
+        canonical = " AND canonical = 1" if canonical_only else ""
+        rows = self.connection().execute(
+            f"SELECT {JOB_COLUMNS} FROM jobs WHERE active = 1{canonical} ORDER BY site, first_seen"
+        )
+        for row in rows:
+            jobs.setdefault(row["site"], []).append(row_to_job(row))
+        return jobs
+
+    def query_jobs(self, site=None, technology=None, remote=None, since=None, until=None,
+                   after=None, limit=50, canonical_only=False, profile=None, search=None):
+        """Active jobs newest first, filtered and keyset-paginated
+
+        technology is one name or a list, any of which matches; search is
+        a case-insensitive substring of the title.
+
+        `after` is the (first_seen, site, id) key of the last row of the
+        previous page. Rows are yielded as they are read; the generator
+        returns the key to resume from, or None on the last page.
+        """
+        clauses = ["active = 1"]
+        params = []
+        if canonical_only:
+            clauses.append("canonical = 1")
+        if site:
+            clauses.append("site = ?")
+            params.append(site)
+        if search:
+            clauses.append("title LIKE ? ESCAPE '\\'")
+            params.append('%' + re.sub(r'([\\%_])', r'\\\1', search) + '%')
+        if technology:
+            technologies = [technology] if isinstance(technology, str) else list(technology)
+            clauses.append("EXISTS (SELECT 1 FROM job_technologies t"
+                           " WHERE t.site = jobs.site AND t.job_id = jobs.id"
+                           f" AND t.technology IN ({', '.join('?' * len(technologies))}))")
+            params.extend(technologies)
+        if profile:
+            clauses.append("EXISTS (SELECT 1 FROM job_profiles p"
+                           " WHERE p.site = jobs.site AND p.job_id = jobs.id AND p.profile = ?)")
+            params.append(profile)
+        if remote is not None:
+            clauses.append("is_remote = ?")
+            params.append(int(remote))
+        if since:
+            clauses.append("first_seen >= ?")
+            params.append(since)
+        if until:
+            clauses.append("first_seen < ?")
+            params.append(until)
+        if after:
+            clauses.append("(first_seen, site, id) < (?, ?, ?)")
+            params.extend(after)
+
+        rows = self.connection().execute(
+            f"""SELECT {JOB_COLUMNS} FROM jobs WHERE {' AND '.join(clauses)}
+                ORDER BY first_seen DESC, site DESC, id DESC LIMIT ?""",
+            params + [limit + 1]
+        )
+        last_key = None
+        for count, row in enumerate(rows):
+            if count == limit:
+                return last_key
+            last_key = (row["first_seen"], row["site"], row["id"])
+            yield row_to_job(row, include_site=True)
+        return None
+
+    def import_json(self, path):
+        """One-off import of a legacy filtered_job_postings.json file"""
+        try:
+            with open(path, 'r') as f:
+                legacy = json.load(f)
+        except FileNotFoundError:
+            return 0
+        count = 0
+        for site, jobs in legacy.items():
+            jobs = [dict(job, id=job_id(job), first_seen=job.get("scraped_at")) for job in jobs]
+            self.upsert_jobs(site, jobs)
+            count += len(jobs)
+        return count
@@ -0,0 +1,125 @@
+"""
+Compiled multi-pattern keyword matcher for job filtering
+
+All keywords of all profiles are compiled into one regex, so each title
+and description is scanned once no matter how many keyword sets or
+profiles are configured. Keywords match on word boundaries.
+"""
+
+import json
+import re
+
+def _alternation(keywords):
+    """Regex matching any keyword on word boundaries"""
+    return r'(?<!\w)(?:' + '|'.join(re.escape(keyword) for keyword in keywords) + r')(?!\w)'
+
+class KeywordProfile:
+    """One user's keyword sets"""
+
+    def __init__(self, name, remote, full_stack, technologies):
+        self.name = name
+        self.remote = [keyword.lower() for keyword in remote]
+        self.full_stack = [keyword.lower() for keyword in full_stack]
+        self.technologies = [keyword.lower() for keyword in technologies]
+
+    @classmethod
+    def from_dict(cls, name, data):
+        return cls(name, data.get('remote', []), data.get('full_stack', []), data.get('technologies', []))
+
+    def classify(self, title_hits, description_hits):
+        """Apply the job filters to the keywords found in a listing
+
+        Remote may appear in the title or description, the role must be in
+        the title, and technologies are taken from the description.
+        """
+        is_remote = any(keyword in title_hits or keyword in description_hits for keyword in self.remote)
+        is_full_stack = any(keyword in title_hits for keyword in self.full_stack)
+        techs = [tech for tech in self.technologies if tech in description_hits]
+        return {
+            'is_remote': is_remote,
+            'is_full_stack': is_full_stack,
+            'technologies': techs,
+            'matches': is_remote and is_full_stack
+        }
+
+class KeywordMatcher:
+    """Single compiled pattern covering every keyword of every profile"""
+
+    def __init__(self, profiles):
+        self.profiles = list(profiles)
+        keywords = set()
+        for profile in self.profiles:
+            keywords.update(profile.remote, profile.full_stack, profile.technologies)
+        # Longest first so the regex prefers e.g. "react native" over "react"
+        ordered = sorted(keywords, key=lambda keyword: (-len(keyword), keyword))
+        self.keywords = ordered
+        self.pattern = re.compile(_alternation(ordered)) if ordered else None
+        # A long match also counts for every keyword nested inside it
+        self.implied = {
+            keyword: {other for other in ordered if re.search(_alternation([other]), keyword)}
+            for keyword in ordered
+        }
+
+    @property
+    def profile_names(self):
+        return [profile.name for profile in self.profiles]
+
+    @property
+    def technologies(self):
+        """Every technology keyword across profiles, in profile order"""
+        techs = []
+        for profile in self.profiles:
+            techs.extend(tech for tech in profile.technologies if tech not in techs)
+        return techs
+
+    def find(self, text):
+        """Set of keywords present in already lower-cased text"""
+        if self.pattern is None or not text:
+            return set()
+        hits = set()
+        for keyword in set(self.pattern.findall(text)):
+            hits |= self.implied[keyword]
+        return hits
+
+    def classify(self, title, description):
+        """{profile name: classification} for a lower-cased title and description"""
+        title_hits = self.find(title)
+        description_hits = self.find(description)
+        return {profile.name: profile.classify(title_hits, description_hits) for profile in self.profiles}
+
+def load_keyword_profiles(path, default_profile):
+    """Default profile plus any extra profiles from a JSON file
+
+    The file maps profile names to {"remote": [...], "full_stack": [...],
+    "technologies": [...]}. A missing or malformed file leaves only the
+    default, so a typo in the file cannot stop the crawler from starting.
+    """
+    profiles = {default_profile.name: default_profile}
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return list(profiles.values())
+    except json.JSONDecodeError as e:
+        print(f"Ignoring {path}, it is not valid JSON ({e}); using the default keyword profile")
+        return list(profiles.values())
+    problem = profiles_problem(data)
+    if problem:
+        print(f"Ignoring {path}, {problem}; using the default keyword profile")
+        return list(profiles.values())
+    for name, keyword_sets in data.items():
+        profiles[name] = KeywordProfile.from_dict(name, keyword_sets)
+    return list(profiles.values())
+
+def profiles_problem(data):
+    """What is wrong with a parsed profiles file, or None if it is well formed"""
+    if not isinstance(data, dict):
+        return "it is not a JSON object of profiles"
+    for name, keyword_sets in data.items():
+        if not isinstance(keyword_sets, dict):
+            return f"profile {name!r} is not an object"
+        for field in ('remote', 'full_stack', 'technologies'):
+            keywords = keyword_sets.get(field, [])
+            if not (isinstance(keywords, list) and all(isinstance(keyword, str) for keyword in keywords)):
+                return f"{field} of profile {name!r} is not a list of strings"
+    return None
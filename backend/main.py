@@ -1,14 +1,26 @@
-import requests
-from bs4 import BeautifulSoup
+import os
 import schedule
 import time
-import hashlib
 import json
-import smtplib
-from email.mime.text import MIMEText
+import base64
 from datetime import datetime
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
+from crawl_control import SchedulerLock, read_run, request_refresh, take_refresh_request, write_status
+from crawl_metrics import CrawlMetrics, ParsedJobs
+from crawl_workers import crawl_in_processes
+from crawler import crawl_websites
+from html_parsers import LXML_AVAILABLE, extract_listings
+from job_dedup import DedupIndex, job_identity, pick_canonical
+from job_diff import diff_jobs, fingerprint_jobs, job_fingerprint
+from frontier import Frontier
+from job_store import JobStore
+from notifications import DigestNotifier
+from keyword_matcher import KeywordMatcher, KeywordProfile, load_keyword_profiles
+from http_cache import NOT_MODIFIED, ValidatorCache
+from rate_limiter import DomainRateLimiter
+from site_scheduler import CHANGED, ERROR, UNCHANGED, SiteScheduler
+from refresh_jobs import CrawlRunner
 
 # Configuration - Updated with companies from companies.md
 WEBSITES = [
@@ -127,77 +139,99 @@ WEBSITES = [
     {"url": "https://www.akeneo.com/careers", "selector": "div.job-listing, .job-card, .career-item"},
     {"url": "https://www.pimcore.com/careers", "selector": "div.job-listing, .job-card, .career-item"},
 ]
-OUTPUT_JSON = "filtered_job_postings.json"  # Output JSON file
-HASH_FILE = "website_hashes.json"  # File to store hashes
+CRAWL_SHARD_INDEX = int(os.getenv('CRAWL_SHARD_INDEX', '0'))  # This worker's shard of the frontier
+CRAWL_SHARD_COUNT = int(os.getenv('CRAWL_SHARD_COUNT', '1'))  # Number of workers sharing the frontier
+# Each shard keeps its own lock and crawl state files; jobs.db and frontier.db are shared
+SHARD_SUFFIX = f".shard{CRAWL_SHARD_INDEX}" if CRAWL_SHARD_COUNT > 1 else ""
+OUTPUT_JSON = "filtered_job_postings.json"  # Legacy output file, imported into JOBS_DB once
+JOBS_DB = "jobs.db"  # SQLite job store
+HASH_FILE = f"website_hashes{SHARD_SUFFIX}.json"  # File to store per-site job fingerprints
+HTTP_CACHE_FILE = f"http_cache{SHARD_SUFFIX}.json"  # ETag/Last-Modified/body digest per URL
+SCHEDULE_FILE = f"site_schedule{SHARD_SUFFIX}.json"  # Per-site crawl intervals and change/error history
+COMPANIES_FILE = "companies.md"  # Career page list ingested into the frontier
+FRONTIER_DB = "frontier.db"  # Deduplicated crawl targets and their crawl state
+CRAWL_FRONTIER = os.getenv('CRAWL_FRONTIER', 'false').lower() == 'true'  # Crawl WEBSITES + companies.md
 EMAIL_ADDRESS = "your_email@example.com"  # Your email for notifications
 EMAIL_PASSWORD = "your_password"  # Your email password or app-specific password
 RECIPIENT_EMAIL = "recipient@example.com"  # Email to receive notifications
+RECIPIENT_EMAILS = [RECIPIENT_EMAIL]  # Each gets one digest per crawl cycle
 SEND_EMAILS = True  # Set to False to disable emails
+SMTP_HOST = os.getenv('SMTP_HOST', 'smtp.gmail.com')
+SMTP_PORT = int(os.getenv('SMTP_PORT', '465'))
+SMTP_SSL = os.getenv('SMTP_SSL', 'true').lower() == 'true'  # false: plain SMTP, STARTTLS if offered
+JOBS_PAGE_SIZE = 50  # Default page size for /api/jobs
+JOBS_MAX_PAGE_SIZE = 200
+CRAWL_CONCURRENCY = 32  # Max requests in flight across all sites
+CRAWL_PER_HOST_LIMIT = 4  # Max requests in flight against a single host
+CRAWL_WORKERS = int(os.getenv('CRAWL_WORKERS', '0'))  # Worker processes for fetch+parse; 0 crawls in-process
+CRAWL_RATE_PER_HOST = 2.0  # Requests per second per host; halved for hosts that throttle us
+CRAWL_MAX_RETRIES = 3  # Retries with jittered exponential backoff for 429/5xx and network errors
+SCHEDULER_TICK_MINUTES = 5  # How often the adaptive scheduler looks for due sites
+SCHEDULER_BUDGET = 40  # Max sites crawled per scheduler tick
+PARSER_BACKEND = "auto"  # "selectolax", "lxml", "bs4" or "auto" for the fastest installed
+CRAWL_STREAMING = os.getenv('CRAWL_STREAMING', 'false').lower() == 'true'  # Extract while downloading (needs lxml)
+CRAWL_MAX_PAGE_BYTES = 5 * 1024 * 1024  # Streamed pages are cut off after this many bytes
+JOBS_API_MODE = os.getenv('JOBS_API_MODE', 'combined')  # "combined" may run the scheduler, "read-only" never does
+CRAWL_LOCK_FILE = f"crawler{SHARD_SUFFIX}.lock"  # Held by the one process running this shard's scheduler
+CRAWL_STATUS_FILE = f"crawl_status{SHARD_SUFFIX}.json"  # Crawl runs published by the scheduler process
+REFRESH_REQUEST_FILE = f"refresh_request{SHARD_SUFFIX}.json"  # Refresh queued by an API process for the scheduler process
+CRAWL_METRICS_FILE = f"crawl_metrics{SHARD_SUFFIX}.json"  # Per-site fetch samples behind /api/metrics
+CONTROL_POLL_SECONDS = 2  # How often the scheduler process checks for refresh requests
 
 # Filter keywords
 REMOTE_KEYWORDS = ["remote", "work from home", "wfh", "telecommute"]
 FULL_STACK_KEYWORDS = ["full stack", "full-stack", "software engineer", "web developer"]
 TECH_KEYWORDS = ["react", "node.js", "next.js", "fastapi", "express", "typescript", "javascript", "python"]  # Based on your skills
+KEYWORD_PROFILES_FILE = "keyword_profiles.json"  # Optional extra profiles: {name: {remote, full_stack, technologies}}
 
-def get_page_content(url, selector):
-    try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+if CRAWL_STREAMING and not LXML_AVAILABLE:
+    print("CRAWL_STREAMING needs lxml and cssselect, which are not installed; pages are parsed after download")
+    CRAWL_STREAMING = False
+
+# All profiles share one compiled matcher; a listing is kept if any profile accepts it
+keyword_matcher = KeywordMatcher(load_keyword_profiles(
+    KEYWORD_PROFILES_FILE,
+    KeywordProfile("default", REMOTE_KEYWORDS, FULL_STACK_KEYWORDS, TECH_KEYWORDS)
+))
+
+def filter_listings(listings, url):
+    """Keep the remote Full Stack listings out of raw (title, link, description[, location]) tuples"""
+    jobs = ParsedJobs()
+    for raw_title, link, raw_description, *details in listings:
+        jobs.listings += 1
+        title = raw_title.lower()
+        if link and not link.startswith('http'):
+            link = url.rstrip('/') + '/' + link.lstrip('/')
+        description = raw_description.lower()
+        
+        # Apply filters: one scan of title and description covers every profile
+        accepted = {name: result for name, result in keyword_matcher.classify(title, description).items()
+                    if result['matches']}
+        if not accepted:
+            continue
+        
+        # Technologies mentioned, across the profiles that accepted the listing
+        techs = []
+        for result in accepted.values():
+            techs.extend(tech for tech in result['technologies'] if tech not in techs)
+        
+        job = {
+            "title": raw_title,
+            "link": link,
+            "technologies": techs,
+            "is_remote": any(result['is_remote'] for result in accepted.values()),
+            "profiles": list(accepted),  # Names of the keyword profiles that matched, for per-profile lists
+            "scraped_at": datetime.now().isoformat()
         }
-        response = requests.get(url, timeout=15, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        job_listings = soup.select(selector)
-        jobs = []
-        for job in job_listings:
-            title_elem = job.find('h2') or job.find('h3') or job.find('h4') or job
-            title = title_elem.get_text(strip=True).lower() if title_elem else ""
-            link = job.find('a', href=True)
-            link = link['href'] if link else ""
-            if link and not link.startswith('http'):
-                link = url.rstrip('/') + '/' + link.lstrip('/')
-            description_elem = job.find('p') or job.find('div', class_='description') or job
-            description = description_elem.get_text(strip=True).lower() if description_elem else ""
-            
-            # Apply filters
-            is_remote = any(keyword in title or keyword in description for keyword in REMOTE_KEYWORDS)
-            is_full_stack = any(keyword in title for keyword in FULL_STACK_KEYWORDS)
-            if not (is_remote and is_full_stack):
-                continue
-            
-            # Extract technologies mentioned
-            techs = [tech for tech in TECH_KEYWORDS if tech in description]
-            
-            jobs.append({
-                "title": title_elem.get_text(strip=True) if title_elem else "No title",
-                "link": link,
-                "technologies": techs,
-                "is_remote": is_remote,
-                "scraped_at": datetime.now().isoformat()
-            })
-        return jobs
-    except requests.RequestException as e:
-        print(f"Error fetching {url}: {e}")
-        return []
-
-def hash_content(jobs):
-    content = json.dumps(jobs, sort_keys=True)
-    return hashlib.md5(content.encode('utf-8')).hexdigest()
-
-def send_email(subject, body):
-    if not SEND_EMAILS:
-        return
-    msg = MIMEText(body)
-    msg['Subject'] = subject
-    msg['From'] = EMAIL_ADDRESS
-    msg['To'] = RECIPIENT_EMAIL
-    try:
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as server:
-            server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-            server.sendmail(EMAIL_ADDRESS, RECIPIENT_EMAIL, msg.as_string())
-        print(f"Email sent for {subject}")
-    except Exception as e:
-        print(f"Error sending email: {e}")
+        if details and details[0]:
+            job["location"] = details[0]
+        job["id"] = job_fingerprint(job)
+        jobs.append(job)
+    return jobs
+
+def parse_jobs(html, url, selector):
+    """Extract remote Full Stack listings from a career page"""
+    return filter_listings(extract_listings(html, selector, PARSER_BACKEND), url)
 
 def load_hashes():
     try:
@@ -210,49 +244,182 @@ def save_hashes(hashes):
     with open(HASH_FILE, 'w') as f:
         json.dump(hashes, f, indent=2)
 
-def load_existing_jobs():
-    try:
-        with open(OUTPUT_JSON, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+job_store = JobStore(JOBS_DB)
+
+# New jobs are queued during a crawl and mailed as one digest at the end of it
+notifier = DigestNotifier(SMTP_HOST, SMTP_PORT, EMAIL_ADDRESS, EMAIL_PASSWORD, RECIPIENT_EMAILS, use_ssl=SMTP_SSL)
+
+# Kept across cycles so hosts that throttled us stay slowed down
+rate_limiter = DomainRateLimiter(rate=CRAWL_RATE_PER_HOST)
 
-def save_jobs(jobs):
-    with open(OUTPUT_JSON, 'w') as f:
-        json.dump(jobs, f, indent=2)
+site_scheduler = SiteScheduler(SCHEDULE_FILE).load()
 
-def check_websites():
-    print(f"Checking websites at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+crawl_metrics = CrawlMetrics(CRAWL_METRICS_FILE).load()
+
+frontier = Frontier(FRONTIER_DB)
+_frontier_seeded = False
+
+def crawl_targets():
+    """Sites this process crawls: WEBSITES, or its shard of the full frontier"""
+    global _frontier_seeded
+    if not CRAWL_FRONTIER:
+        return WEBSITES
+    if not _frontier_seeded:
+        # WEBSITES go first so their selectors win over the companies.md default
+        frontier.add_websites(WEBSITES)
+        if os.path.exists(COMPANIES_FILE):
+            frontier.ingest_file(COMPANIES_FILE)
+        _frontier_seeded = True
+    return frontier.sites(CRAWL_SHARD_INDEX, CRAWL_SHARD_COUNT)
+
+# Near-duplicate postings across sites; built from the store on the first crawl
+dedup_index = None
+
+def index_job(site, job):
+    """Add a job to the dedup index; returns the keys of known jobs it duplicates"""
+    company, title = job_identity(site, job.get('link'), job['title'])
+    return dedup_index.add((site, job['id']), title, company, job.get('location') or '')
+
+def load_dedup_index():
+    """Build the dedup index from the stored active jobs and store their clusters"""
+    global dedup_index
+    dedup_index = DedupIndex()
+    keys = []
+    for row in job_store.load_dedup_rows():
+        index_job(row['site'], dict(row))
+        keys.append((row['site'], row['id']))
+    update_clusters(keys)
+
+def update_clusters(keys):
+    """Store cluster ids and canonical jobs for the clusters the given jobs belong to"""
+    cluster_ids = dedup_index.cluster_ids(dedup_index.members(keys))
+    job_store.assign_clusters(cluster_ids)
+    job_store.mark_canonical(set(cluster_ids.values()), pick_canonical)
+
+def load_existing_jobs(duplicates=False):
+    return job_store.load_all(canonical_only=not duplicates)
+
+def check_websites(progress=None, websites=None):
+    """Crawl the given sites (every crawl target by default) and store changes"""
+    websites = crawl_targets() if websites is None else websites
+    print(f"Checking {len(websites)} websites at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     previous_hashes = load_hashes()
-    current_jobs = load_existing_jobs()
-    new_hashes = {}
-
-    for site in WEBSITES:
-        url = site['url']
-        selector = site['selector']
-        print(f"Scraping {url}...")
-        jobs = get_page_content(url, selector)
-        
-        if not jobs:
-            print(f"No filtered jobs found or error at {url}")
+    http_cache = ValidatorCache(HTTP_CACHE_FILE)
+    if job_store.is_empty() and job_store.import_json(OUTPUT_JSON) == 0:
+        # Nothing stored yet, so every site is a first fetch: send no
+        # validators, or unchanged pages would never be stored
+        previous_hashes = {}
+    else:
+        http_cache.load()
+    if dedup_index is None:
+        load_dedup_index()
+    # Sites outside this crawl keep their fingerprints
+    new_hashes = dict(previous_hashes)
+    samples = {}
+    started = time.perf_counter()
+
+    # Fetch every site concurrently; parsing happens as each response arrives
+    if CRAWL_WORKERS > 0:
+        # Parsing is CPU-bound, so spread it over worker processes
+        results = crawl_in_processes(
+            websites, parse_jobs, CRAWL_WORKERS,
+            concurrency=CRAWL_CONCURRENCY,
+            per_host=CRAWL_PER_HOST_LIMIT,
+            cache=http_cache,
+            on_progress=progress,
+            limiter=rate_limiter,
+            retries=CRAWL_MAX_RETRIES,
+            samples=samples,
+            listing_filter=filter_listings,
+            stream=CRAWL_STREAMING,
+            max_bytes=CRAWL_MAX_PAGE_BYTES
+        )
+    else:
+        results = crawl_websites(
+            websites, parse_jobs,
+            concurrency=CRAWL_CONCURRENCY,
+            per_host=CRAWL_PER_HOST_LIMIT,
+            cache=http_cache,
+            on_progress=progress,
+            limiter=rate_limiter,
+            retries=CRAWL_MAX_RETRIES,
+            samples=samples,
+            listing_filter=filter_listings,
+            stream=CRAWL_STREAMING,
+            max_bytes=CRAWL_MAX_PAGE_BYTES
+        )
+
+    outcomes = {}
+    clustered = []  # Jobs added or retired this cycle, whose clusters need a new canonical job
+    for url, jobs in results.items():
+        # Legacy hash files hold one MD5 per site; treat those as a first fetch
+        previous_fingerprints = previous_hashes.get(url)
+        if not isinstance(previous_fingerprints, list):
+            previous_fingerprints = None
+
+        if jobs is None:
+            print(f"Error fetching {url}, keeping stored jobs")
+            outcomes[url] = ERROR
             continue
 
-        current_hash = hash_content(jobs)
-        new_hashes[url] = current_hash
+        if jobs is NOT_MODIFIED:
+            if previous_fingerprints is not None:
+                job_store.touch_site(url)
+            outcomes[url] = UNCHANGED
+            continue
+
+        if not jobs:
+            if not getattr(jobs, 'listings', 0):
+                # The selector matched nothing: more likely a broken page than an
+                # empty board, so keep the stored jobs until it lists jobs again
+                print(f"No listings found at {url}, keeping stored jobs")
+                outcomes[url] = UNCHANGED
+                continue
+            # Listings were there but none passed the filters; retire the old jobs
+            print(f"No filtered jobs found at {url}")
+
+        diff = diff_jobs(previous_fingerprints, jobs)
+        new_hashes[url] = fingerprint_jobs(jobs)
+        # Jobs already listed on another site are stored but not announced again
+        unseen = [job for job in diff.added if not index_job(url, job)]
+        clustered.extend((url, job['id']) for job in diff.added)
+        for job_id in diff.removed:
+            # Retired jobs must not count as earlier copies of live postings
+            dedup_index.remove((url, job_id))
+            clustered.append((url, job_id))
 
-        # Check for changes
-        if url in previous_hashes and current_hash != previous_hashes[url]:
-            send_email(f"New Full Stack Jobs on {url}", f"New/updated remote Full Stack jobs:\n{json.dumps(jobs[:3], indent=2)}...")
-            print(f"Changes detected on {url}")
-        elif url not in previous_hashes:
+        if previous_fingerprints is None:
             print(f"Initial fetch for {url}")
+        elif diff.added:
+            if SEND_EMAILS:
+                notifier.notify(url, unseen)
+            print(f"Changes detected on {url}: {len(diff.added)} added, {len(diff.removed)} removed")
+        elif diff.removed:
+            print(f"Changes detected on {url}: {len(diff.removed)} removed")
 
-        # Update job postings
-        current_jobs[url] = jobs
+        # Rows are only rewritten for sites whose job set changed
+        if diff.changed or previous_fingerprints is None:
+            job_store.upsert_jobs(url, jobs, diff.removed)
+        else:
+            job_store.touch_site(url)
+        found_new = previous_fingerprints is not None and bool(diff.added)
+        outcomes[url] = CHANGED if found_new else UNCHANGED
 
-    # Save updated hashes and jobs
+    update_clusters(clustered)
     save_hashes(new_hashes)
-    save_jobs(current_jobs)
+    if SEND_EMAILS:
+        notifier.flush()
+    http_cache.save()
+    for url, outcome in outcomes.items():
+        site_scheduler.record(url, outcome)
+    site_scheduler.save()
+    if CRAWL_FRONTIER:
+        frontier.record_results(outcomes)
+    for url, sample in samples.items():
+        crawl_metrics.record(sample, not_modified=results.get(url) is NOT_MODIFIED)
+    crawl_metrics.record_cycle(len(results), time.perf_counter() - started)
+    crawl_metrics.save()
+
 
 # Flask app setup
 app = Flask(__name__)
@@ -264,48 +431,241 @@ CORS(app,
      allow_headers=['Content-Type', 'Authorization'],
      supports_credentials=False)  # Set to False when allowing any origin
 
+JOB_PAGE_PARAMS = ('limit', 'cursor', 'site', 'search', 'technology', 'profile', 'remote', 'since', 'until')
+JOBS_MAX_SEARCH_LENGTH = 100
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not (isinstance(key, list) and len(key) == 3 and all(isinstance(part, str) for part in key)):
+        raise ValueError("Invalid cursor")
+    return key
+
+def stored_timestamp(value):
+    """An ISO 8601 timestamp in the naive local-time format first_seen is stored in
+
+    Timestamps with a UTC offset are converted to this server's local time,
+    so they compare correctly with the stored text.
+    """
+    timestamp = datetime.fromisoformat(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return timestamp.isoformat()
+
+def parse_job_query(args):
+    """Validate /api/jobs query parameters into JobStore.query_jobs arguments"""
+    try:
+        limit = int(args.get('limit', JOBS_PAGE_SIZE))
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if not 1 <= limit <= JOBS_MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {JOBS_MAX_PAGE_SIZE}")
+
+    search = (args.get('search') or '').strip() or None
+    if search is not None and len(search) > JOBS_MAX_SEARCH_LENGTH:
+        raise ValueError(f"search must be at most {JOBS_MAX_SEARCH_LENGTH} characters")
+
+    # Comma-separated; a job matches if it has any of them
+    technology = args.get('technology')
+    if technology is not None:
+        technology = [tech.strip().lower() for tech in technology.split(',') if tech.strip()]
+        unknown = [tech for tech in technology if tech not in keyword_matcher.technologies]
+        if unknown or not technology:
+            raise ValueError(f"technology must be one of: {', '.join(keyword_matcher.technologies)}")
+
+    profile = args.get('profile')
+    if profile is not None and profile not in keyword_matcher.profile_names:
+        raise ValueError(f"profile must be one of: {', '.join(keyword_matcher.profile_names)}")
+
+    remote = args.get('remote')
+    if remote is not None:
+        if remote.lower() not in ('true', 'false', '1', '0'):
+            raise ValueError("remote must be true or false")
+        remote = remote.lower() in ('true', '1')
+
+    bounds = {}
+    for name in ('since', 'until'):
+        if args.get(name):
+            try:
+                bounds[name] = stored_timestamp(args[name])
+            except ValueError:
+                raise ValueError(f"{name} must be an ISO 8601 timestamp")
+
+    duplicates = args.get('duplicates', 'false').lower()
+    if duplicates not in ('true', 'false', '1', '0'):
+        raise ValueError("duplicates must be true or false")
+
+    cursor = args.get('cursor')
+    return {
+        'site': args.get('site'),
+        'search': search,
+        'technology': technology,
+        'profile': profile,
+        'remote': remote,
+        'since': bounds.get('since'),
+        'until': bounds.get('until'),
+        'after': decode_cursor(cursor) if cursor else None,
+        'limit': limit,
+        # A site's own listing shows all its jobs, even ones also posted elsewhere
+        'canonical_only': duplicates in ('false', '0') and not args.get('site')
+    }
+
+def stream_job_page(query):
+    """Emit {"jobs": [...], "next_cursor": ...} one job at a time"""
+    yield '{"jobs": ['
+    rows = job_store.query_jobs(**query)
+    first = True
+    while True:
+        try:
+            job = next(rows)
+        except StopIteration as done:
+            next_key = done.value
+            break
+        yield ('' if first else ',') + json.dumps(job)
+        first = False
+    next_cursor = encode_cursor(next_key) if next_key else None
+    yield '], "next_cursor": ' + json.dumps(next_cursor) + '}'
+
 @app.route('/api/jobs', methods=['GET'])
 def get_jobs():
-    """API endpoint to get all job postings"""
+    """API endpoint to get job postings
+
+    Without query parameters this returns every job grouped by site. With
+    any of limit, cursor, site, search, technology, profile, remote, since or
+    until it returns one page of jobs, newest first, plus the cursor of the
+    next page. search matches titles; technology takes a comma-separated
+    list. A job posted on several sites is returned once unless
+    duplicates=true.
+    """
     try:
-        jobs = load_existing_jobs()
-        return jsonify(jobs)
+        if not any(name in request.args for name in JOB_PAGE_PARAMS):
+            jobs = load_existing_jobs(request.args.get('duplicates', 'false').lower() in ('true', '1'))
+            return jsonify(jobs)
+        try:
+            query = parse_job_query(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return Response(stream_with_context(stream_job_page(query)), mimetype='application/json')
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/jobs/technologies', methods=['GET'])
+def get_technologies():
+    """API endpoint listing the technologies the technology filter accepts"""
+    return jsonify(keyword_matcher.technologies)
+
+# Manual refreshes and scheduled runs share one runner so crawls never overlap
+crawl_runner = CrawlRunner(check_websites)
+scheduler_lock = SchedulerLock(CRAWL_LOCK_FILE)
+
 @app.route('/api/jobs/refresh', methods=['POST'])
 def refresh_jobs():
-    """API endpoint to manually refresh job postings"""
+    """API endpoint to queue a refresh of job postings
+
+    Returns immediately with the crawl's job ID. If a crawl is already
+    running the request joins it instead of starting another. Processes
+    that do not run the scheduler hand the request to the one that does.
+    """
     try:
-        check_websites()
-        jobs = load_existing_jobs()
-        return jsonify(jobs)
+        if scheduler_lock.held:
+            status, coalesced = crawl_runner.start()
+        else:
+            status, coalesced = request_refresh(REFRESH_REQUEST_FILE, CRAWL_STATUS_FILE)
+        response = jsonify(dict(status, coalesced=coalesced))
+        response.headers['Location'] = f"/api/jobs/refresh/{status['job_id']}"
+        return response, 202
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/jobs/refresh/<job_id>', methods=['GET'])
+def refresh_status(job_id):
+    """API endpoint to poll the progress of a queued refresh"""
+    if scheduler_lock.held:
+        status = crawl_runner.get(job_id)
+    else:
+        status = read_run(REFRESH_REQUEST_FILE, CRAWL_STATUS_FILE, job_id)
+    if status is None:
+        return jsonify({"error": "Refresh job not found"}), 404
+    return jsonify(status)
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Per-site crawl metrics in Prometheus text format"""
+    # Read what the crawling process saved, which may not be this process
+    current = CrawlMetrics(CRAWL_METRICS_FILE).load()
+    return Response(current.prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/metrics/summary', methods=['GET'])
+def metrics_summary():
+    """Slowest and most error-prone sites over the recent crawls"""
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    return jsonify(CrawlMetrics(CRAWL_METRICS_FILE).load().summary(limit))
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
 
-# Schedule the task every 30 minutes
-schedule.every(30).minutes.do(check_websites)
+def start_due_crawl():
+    """Crawl only the sites the adaptive scheduler says are due, within the budget
+
+    Nothing is started, and no run is recorded, when a crawl is already
+    running or no site is due.
+    """
+    if crawl_runner.current() is not None:
+        return
+    due = site_scheduler.due(crawl_targets(), SCHEDULER_BUDGET)
+    if due:
+        crawl_runner.start(lambda progress=None: check_websites(progress, due))
+
+# Every tick, crawl the sites whose adaptive interval has elapsed
+schedule.every(SCHEDULER_TICK_MINUTES).minutes.do(start_due_crawl)
 
 def run_scheduler():
-    """Run the scheduler in a separate thread"""
+    """Scheduler loop for the process holding scheduler_lock
+
+    Besides the scheduled crawls this starts refreshes queued by read-only
+    API processes and publishes crawl progress for them to poll.
+    """
+    published = None
     while True:
         schedule.run_pending()
-        time.sleep(60)  # Check every minute for pending tasks
+        if not crawl_runner.full_pending():
+            # Starts now, or queues behind a partial run of the due sites
+            queued = take_refresh_request(REFRESH_REQUEST_FILE)
+            if queued:
+                crawl_runner.start(run_id=queued['job_id'], requested_at=queued['requested_at'])
+        snapshot = crawl_runner.snapshot()
+        if snapshot != published:
+            write_status(CRAWL_STATUS_FILE, *snapshot)
+            published = snapshot
+        time.sleep(CONTROL_POLL_SECONDS)
 
-if __name__ == "__main__":
-    print("Starting monitoring for remote Full Stack Engineer jobs...")
-    check_websites()  # Run once immediately
-    
-    # Start scheduler in a separate thread
+def start_scheduler():
+    """Take the scheduler lock and start crawling in the background; False if another process has it"""
+    if not scheduler_lock.acquire():
+        return False
+    crawl_runner.start()  # Run once immediately, in the background
     import threading
     scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
     scheduler_thread.start()
+    return True
+
+if __name__ == "__main__":
+    # Under a WSGI server this block never runs, so workers only serve the API
+    if JOBS_API_MODE != 'read-only' and start_scheduler():
+        print("Starting monitoring for remote Full Stack Engineer jobs...")
+    else:
+        print("Serving the API only; crawls run in the process holding the scheduler lock (crawler_daemon.py)")
     
     # Start Flask app
     print("Starting Flask API server on http://localhost:8000")
-    app.run(host='0.0.0.0', port=8000, debug=False)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=8000, debug=False)
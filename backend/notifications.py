@@ -0,0 +1,150 @@
+"""
+Batched email notifications for new job postings
+
+Crawls queue change events and return immediately. A background thread
+collects the events of a crawl cycle and, when the cycle is flushed,
+sends one digest per recipient over a single SMTP connection that is kept
+open between cycles and re-established when the server drops it.
+
+For local testing run a debugging SMTP server (pip install aiosmtpd; the
+old smtpd module was removed in Python 3.12) and point the notifier at it:
+    python -m aiosmtpd -n -l localhost:1025
+    SMTP_HOST=localhost SMTP_PORT=1025 SMTP_SSL=false python main.py
+"""
+
+import queue
+import smtplib
+import threading
+import time
+from datetime import datetime
+from email.mime.text import MIMEText
+
+MAX_JOBS_PER_SITE = 10  # Jobs listed per site in a digest; the rest are counted
+SMTP_IDLE_SECONDS = 300  # Close the pooled connection after this long without mail
+
+_FLUSH = object()
+
+class DigestNotifier:
+    """Queues new-job events and mails them as one digest per recipient per cycle"""
+
+    def __init__(self, host, port, sender, password, recipients, use_ssl=True, timeout=30):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.password = password
+        self.recipients = list(recipients)
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.events = queue.Queue()
+        self.smtp = None
+        self.last_used = 0.0
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+
+    def notify(self, site, jobs):
+        """Queue the new jobs found on a site; never blocks the crawl"""
+        if jobs:
+            self.start()
+            self.events.put((site, list(jobs)))
+
+    def flush(self):
+        """End of a crawl cycle: send the digest of everything queued so far"""
+        self.start()
+        self.events.put(_FLUSH)
+
+    def _run(self):
+        pending = []
+        while True:
+            try:
+                event = self.events.get(timeout=SMTP_IDLE_SECONDS)
+            except queue.Empty:
+                self._close_if_idle()
+                continue
+            if event is not _FLUSH:
+                pending.append(event)
+                continue
+            if pending:
+                try:
+                    self.send_digest(pending)
+                except Exception as e:
+                    print(f"Error sending job digest: {e}")
+                    self._disconnect()
+                pending = []
+
+    def _connect(self):
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            smtp.ehlo()
+            if smtp.has_extn('starttls'):
+                smtp.starttls()
+                smtp.ehlo()
+        if smtp.has_extn('auth'):
+            smtp.login(self.sender, self.password)
+        return smtp
+
+    def connection(self):
+        """The pooled SMTP connection, reconnecting if the server closed it"""
+        if self.smtp is not None:
+            try:
+                if self.smtp.noop()[0] == 250:
+                    return self.smtp
+            except (smtplib.SMTPException, OSError):
+                pass  # Dropped sockets raise OSError (e.g. ConnectionResetError), not an SMTP error
+            self._disconnect()
+        self.smtp = self._connect()
+        return self.smtp
+
+    def _disconnect(self):
+        if self.smtp is None:
+            return
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self.smtp = None
+
+    def _close_if_idle(self):
+        if self.smtp is not None and time.monotonic() - self.last_used > SMTP_IDLE_SECONDS:
+            self._disconnect()
+
+    def send_digest(self, events):
+        """Send one digest per recipient for [(site, jobs)] over one connection"""
+        by_site = {}
+        for site, jobs in events:
+            by_site.setdefault(site, []).extend(jobs)
+        total = sum(len(jobs) for jobs in by_site.values())
+        subject = f"{total} new Full Stack jobs on {len(by_site)} sites"
+        body = format_digest(by_site)
+
+        smtp = self.connection()
+        for recipient in self.recipients:
+            message = MIMEText(body)
+            message['Subject'] = subject
+            message['From'] = self.sender
+            message['To'] = recipient
+            smtp.sendmail(self.sender, [recipient], message.as_string())
+        self.last_used = time.monotonic()
+        print(f"Job digest sent to {len(self.recipients)} recipients: {subject}")
+
+def format_digest(by_site):
+    """Plain-text digest body for {site: [jobs]}"""
+    lines = [f"New remote Full Stack jobs, {datetime.now().strftime('%Y-%m-%d %H:%M')}", ""]
+    for site, jobs in by_site.items():
+        lines.append(f"{site} ({len(jobs)} new)")
+        for job in jobs[:MAX_JOBS_PER_SITE]:
+            techs = f" [{', '.join(job.get('technologies', []))}]" if job.get('technologies') else ""
+            lines.append(f"  - {job['title']}{techs}")
+            if job.get('link'):
+                lines.append(f"    {job['link']}")
+        if len(jobs) > MAX_JOBS_PER_SITE:
+            lines.append(f"  ... and {len(jobs) - MAX_JOBS_PER_SITE} more")
+        lines.append("")
+    return '\n'.join(lines)
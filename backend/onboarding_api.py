@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from werkzeug.utils import secure_filename
 import os
 import json
@@ -11,6 +11,7 @@ import io
 import base64
 from datetime import datetime
 from models import db, User, OnboardingData, CVMetadata
+from principal_cache import principals
 
 onboarding_bp = Blueprint('onboarding', __name__)
 
@@ -20,6 +21,11 @@ genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
 # Allowed file extensions for CV upload
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'txt', 'png', 'jpg', 'jpeg'}
 
+def current_user_id():
+    """users.id of the signed-in user via the principal cache, None if the account is gone"""
+    principal = principals.current()
+    return principal['id'] if principal else None
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -489,7 +495,9 @@ def get_onboarding_questions():
 def save_onboarding_data():
     """Save onboarding data"""
     try:
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
+        if user_id is None:
+            return jsonify({'success': False, 'error': 'User not found'}), 404
         data = request.get_json()
         
         # Check if onboarding data already exists
@@ -528,7 +536,9 @@ def save_onboarding_data():
 def get_onboarding_data():
     """Get onboarding data for current user"""
     try:
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
+        if user_id is None:
+            return jsonify({'success': False, 'error': 'User not found'}), 404
         onboarding_data = OnboardingData.query.filter_by(user_id=user_id).first()
         
         if not onboarding_data:
@@ -553,7 +563,9 @@ def get_onboarding_data():
 def upload_cv():
     """Upload and parse CV"""
     try:
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
+        if user_id is None:
+            return jsonify({'success': False, 'error': 'User not found'}), 404
         
         if 'cv_file' not in request.files:
             return jsonify({
@@ -688,7 +700,9 @@ def upload_cv():
 def get_cv_data():
     """Get CV data for current user"""
     try:
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
+        if user_id is None:
+            return jsonify({'success': False, 'error': 'User not found'}), 404
         cv_data = CVMetadata.query.filter_by(user_id=user_id).first()
         
         if not cv_data:
@@ -713,7 +727,9 @@ def get_cv_data():
 def generate_autofill_data():
     """Generate autofill data for forms using stored user data"""
     try:
-        user_id = get_jwt_identity()
+        user_id = current_user_id()
+        if user_id is None:
+            return jsonify({'success': False, 'error': 'User not found'}), 404
         form_data = request.get_json()
         
         # Get user's onboarding and CV data
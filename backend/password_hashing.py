@@ -0,0 +1,95 @@
+"""
+Password hashing off the request threads
+
+Hashing and verifying passwords is deliberately expensive (scrypt by
+default), so a burst of logins run on the request threads would starve
+every other endpoint. PasswordHasher runs them in a process pool of
+HASH_WORKERS processes and admits at most HASH_QUEUE_LIMIT waiting jobs on
+top of the ones running; beyond that it raises HasherBusy immediately and
+the endpoints answer 503 with Retry-After instead of queueing without bound.
+
+The hash method is werkzeug's method string from PASSWORD_HASH_METHOD,
+e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'. A successful login whose
+stored hash used other parameters is rehashed with the current ones in the
+same worker call, and the caller saves the new hash.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+HASH_WORKERS = int(os.getenv('HASH_WORKERS', str(os.cpu_count() or 1)))
+HASH_QUEUE_LIMIT = int(os.getenv('HASH_QUEUE_LIMIT', str(4 * HASH_WORKERS)))  # Waiting jobs before rejecting
+HASH_TIMEOUT = 30  # Seconds a request waits for its result
+RETRY_AFTER_SECONDS = 1
+
+class HasherBusy(Exception):
+    """Every worker is busy and the wait queue is full, or a job took longer than the timeout"""
+
+def method_prefix(password_hash):
+    """The method part of a werkzeug hash, e.g. 'scrypt:32768:8:1'"""
+    return password_hash.split('$', 1)[0]
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+def _verify(password_hash, password, method, current_prefix):
+    """(matches, new hash or None) - runs in a worker process"""
+    if not check_password_hash(password_hash, password):
+        return False, None
+    if method_prefix(password_hash) != current_prefix:
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+class PasswordHasher:
+    """Bounded process pool for password hashing and verification"""
+
+    def __init__(self, method=PASSWORD_HASH_METHOD, workers=HASH_WORKERS, queue_limit=HASH_QUEUE_LIMIT,
+                 timeout=HASH_TIMEOUT):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(workers + queue_limit)
+        self.pool = None
+        self.lock = threading.Lock()
+        # Hashes with default parameters filled in by werkzeug, e.g. pbkdf2 iterations
+        self.current_prefix = method_prefix(generate_password_hash('', method=method))
+
+    def executor(self):
+        with self.lock:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self.pool
+
+    def _run(self, func, *args):
+        if not self.slots.acquire(blocking=False):
+            raise HasherBusy()
+        try:
+            future = self.executor().submit(func, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # A job still waiting is dropped and frees its slot; a running one
+            # holds it until it finishes, so the backlog stays bounded
+            future.cancel()
+            raise HasherBusy()
+
+    def hash_password(self, password):
+        return self._run(_hash, password, self.method)
+
+    def verify_password(self, password_hash, password):
+        """(matches, new hash to store or None)"""
+        return self._run(_verify, password_hash, password, self.method, self.current_prefix)
+
+    def shutdown(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
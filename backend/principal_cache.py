@@ -0,0 +1,92 @@
+"""
+Cached resolution of the JWT identity to the signed-in user
+
+Every protected endpoint needs the user behind the token. principals.current()
+resolves it once per request (kept on flask.g) and keeps the result for
+PRINCIPAL_TTL_SECONDS in a per-process cache, so most authenticated calls
+skip the users lookup entirely.
+
+The cached principal is the public user dict (id, email, created_at,
+payment_completed, is_admin, role), never an ORM object, so it is safe to
+share between requests. Any ORM update or delete of a User invalidates its
+entry in this process; other processes see the change within the TTL.
+Bulk UPDATE statements bypass the ORM events and must call
+principals.invalidate() themselves.
+"""
+
+import os
+import threading
+import time
+
+from flask import g, has_app_context
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from auth_storage import SqlRepository, public_user
+from models import db, User
+
+PRINCIPAL_TTL_SECONDS = float(os.getenv('PRINCIPAL_TTL_SECONDS', '30'))
+MAX_PRINCIPALS = 10000  # Process cache entries before expired ones are swept
+
+class PrincipalCache:
+    """email -> public user dict, per request and for a short TTL per process"""
+
+    def __init__(self, load, ttl=PRINCIPAL_TTL_SECONDS):
+        self.load = load
+        self.ttl = ttl
+        self.entries = {}  # email -> (expires at, principal)
+        self.lock = threading.Lock()
+
+    def get(self, email):
+        """The user for an email, or None if there is no such user"""
+        request_cache = g.setdefault('principals', {})
+        if email in request_cache:
+            return request_cache[email]
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(email)
+        if entry is not None and entry[0] > now:
+            principal = entry[1]
+        else:
+            user = self.load(email)
+            principal = public_user(user) if user else None
+            if principal is not None:  # Unknown emails are not cached; they may register any moment
+                with self.lock:
+                    if len(self.entries) >= MAX_PRINCIPALS:
+                        self.entries = {key: value for key, value in self.entries.items() if value[0] > now}
+                    self.entries[email] = (now + self.ttl, principal)
+        request_cache[email] = principal
+        return principal
+
+    def current(self):
+        """The user behind the request's JWT, or None"""
+        return self.get(get_jwt_identity())
+
+    def invalidate(self, email):
+        with self.lock:
+            self.entries.pop(email, None)
+        if has_app_context():
+            g.get('principals', {}).pop(email, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries = {}
+
+principals = PrincipalCache(lambda email: SqlRepository(db).get_user(email))
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _user_changed(mapper, connection, user):
+    principals.invalidate(user.email)
+    # Again after commit, in case a concurrent request cached the old row in between
+    object_session(user).info.setdefault('changed_principals', set()).add(user.email)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    for email in session.info.pop('changed_principals', ()):
+        principals.invalidate(email)
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back(session):
+    session.info.pop('changed_principals', None)
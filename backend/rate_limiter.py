@@ -0,0 +1,122 @@
+"""
+Per-domain adaptive rate limiting and retry/backoff policy for the crawler
+
+Each host gets a token bucket. Hosts that answer 429/503 have their rate
+halved (and honour Retry-After); every success nudges the rate back up
+towards the configured base. State lives on the limiter object, so a
+module-level limiter remembers slow hosts across crawl cycles.
+
+Buckets hand out reservations instead of holding locks, so the limiter
+is safe to share between event loops as long as one thread drives it.
+"""
+
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+def backoff_delay(attempt, base=1.0, cap=60.0):
+    """Exponential backoff with full jitter for the given retry attempt (0-based)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+class TokenBucket:
+    """Token bucket whose tokens may go negative to queue reservations"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self, now):
+        """Take a token and return how long the caller must wait to use it"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+    def refund(self):
+        self.tokens += 1
+
+class DomainRateLimiter:
+    """Token bucket per host with multiplicative decrease on throttling"""
+
+    def __init__(self, rate=2.0, burst=2, min_rate=0.05, recovery=0.1, max_wait=120.0):
+        self.base_rate = rate  # Requests per second per host when healthy
+        self.burst = burst
+        self.min_rate = min_rate
+        self.recovery = recovery  # Rate regained per successful request
+        self.max_wait = max_wait  # Longest a request may be delayed before it is skipped
+        self.buckets = {}
+
+    def bucket(self, host):
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.base_rate, self.burst)
+        return self.buckets[host]
+
+    def reserve(self, host):
+        """Seconds to wait before requesting host, or None if it should be skipped"""
+        bucket = self.bucket(host)
+        wait = bucket.reserve(time.monotonic())
+        if wait > self.max_wait:
+            bucket.refund()
+            return None
+        return wait
+
+    def throttled(self, host, retry_after=None):
+        """Slow a host down after a 429/503, honouring Retry-After if given"""
+        bucket = self.bucket(host)
+        bucket.rate = max(self.min_rate, bucket.rate / 2)
+        if retry_after:
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + retry_after)
+
+    def succeeded(self, host):
+        bucket = self.bucket(host)
+        bucket.rate = min(self.base_rate, bucket.rate + self.recovery)
+
+    def rate(self, host):
+        return self.bucket(host).rate
+
+    def options(self):
+        """Constructor arguments, to build an equivalent limiter in another process"""
+        return {'rate': self.base_rate, 'burst': self.burst, 'min_rate': self.min_rate,
+                'recovery': self.recovery, 'max_wait': self.max_wait}
+
+    def export(self, hosts=None):
+        """{host: {'rate', 'blocked_for'}} for the given hosts (default all), to send to another process
+
+        Retry-After blocks are sent as seconds remaining, since monotonic
+        clocks are not comparable between processes.
+        """
+        now = time.monotonic()
+        return {host: {'rate': bucket.rate, 'blocked_for': max(0.0, bucket.blocked_until - now)}
+                for host, bucket in self.buckets.items() if hosts is None or host in hosts}
+
+    def merge(self, state):
+        """Take over host rates and blocks exported by another limiter"""
+        now = time.monotonic()
+        for host, entry in state.items():
+            bucket = self.bucket(host)
+            bucket.rate = entry['rate']
+            bucket.blocked_until = now + entry['blocked_for'] if entry['blocked_for'] else 0.0
@@ -0,0 +1,120 @@
+"""
+Background crawl runs for /api/jobs/refresh with coalescing and progress tracking
+"""
+
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+MAX_TRACKED_RUNS = 20  # Finished runs kept around for status polling
+
+class CrawlRunner:
+    """Runs at most one crawl at a time; new requests join the one in flight
+
+    A full crawl requested while a partial one (e.g. only the due sites)
+    is running cannot join it, since that run will not visit every site.
+    It is queued instead and starts when the partial run finishes; further
+    full requests join the queued one.
+    """
+
+    def __init__(self, target):
+        self.target = target  # Default callable accepting progress=callback(done, total)
+        self.runs = OrderedDict()
+        self.current_id = None
+        self.queued_id = None  # Full crawl waiting for the current partial run
+        self.lock = threading.Lock()
+
+    def start(self, target=None, run_id=None, requested_at=None):
+        """Queue a crawl, or join the running one
+
+        target overrides the default crawl callable for this run, e.g. to
+        crawl only the sites the scheduler says are due; such a partial
+        run always joins a crawl in flight. run_id and requested_at let the
+        crawler daemon keep the id an API process already handed out.
+        Returns (status, coalesced) where coalesced is True when the
+        request was folded into a crawl that was already running or queued.
+        """
+        full = target is None
+        with self.lock:
+            if self.current_id is not None:
+                if not full or self.runs[self.current_id]['full']:
+                    return dict(self.runs[self.current_id]), True
+                if self.queued_id is not None:
+                    return dict(self.runs[self.queued_id]), True
+                self.queued_id = self._add_run(run_id, requested_at, full)
+                return dict(self.runs[self.queued_id]), False
+            run_id = self.current_id = self._add_run(run_id, requested_at, full)
+            status = dict(self.runs[run_id])
+
+        self._spawn(run_id, target or self.target)
+        return status, False
+
+    def full_pending(self):
+        """True while a full crawl is running or queued"""
+        with self.lock:
+            return self.queued_id is not None or (
+                self.current_id is not None and self.runs[self.current_id]['full'])
+
+    def _add_run(self, run_id, requested_at, full):
+        run_id = run_id or secrets.token_urlsafe(8)
+        self.runs[run_id] = {
+            'job_id': run_id,
+            'status': 'queued',
+            'full': full,
+            'sites_total': None,
+            'sites_done': 0,
+            'sites_pending': None,
+            'requested_at': requested_at or datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'error': None
+        }
+        while len(self.runs) > MAX_TRACKED_RUNS:
+            self.runs.popitem(last=False)
+        return run_id
+
+    def _spawn(self, run_id, target):
+        thread = threading.Thread(target=self._run, args=(run_id, target), daemon=True)
+        thread.start()
+
+    def get(self, run_id):
+        with self.lock:
+            run = self.runs.get(run_id)
+            return dict(run) if run else None
+
+    def current(self):
+        with self.lock:
+            return dict(self.runs[self.current_id]) if self.current_id else None
+
+    def snapshot(self):
+        """(runs, current_id, queued_id) copy, for publishing to other processes"""
+        with self.lock:
+            return {run_id: dict(run) for run_id, run in self.runs.items()}, self.current_id, self.queued_id
+
+    def _update(self, run_id, **fields):
+        with self.lock:
+            if run_id in self.runs:
+                self.runs[run_id].update(fields)
+
+    def _run(self, run_id, target):
+        self._update(run_id, status='running', started_at=datetime.now().isoformat())
+
+        def progress(done, total):
+            self._update(run_id, sites_done=done, sites_total=total, sites_pending=total - done)
+
+        try:
+            target(progress=progress)
+            self._update(run_id, status='completed')
+        except Exception as e:
+            print(f"Crawl {run_id} failed: {e}")
+            self._update(run_id, status='failed', error=str(e))
+        finally:
+            self._update(run_id, finished_at=datetime.now().isoformat())
+            with self.lock:
+                next_id = None
+                if self.current_id == run_id:
+                    self.current_id = next_id = self.queued_id
+                    self.queued_id = None
+            if next_id is not None:
+                self._spawn(next_id, self.target)
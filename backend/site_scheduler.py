@@ -0,0 +1,124 @@
+"""
+Adaptive per-site crawl frequency scheduler
+
+Every site has its own revisit interval. Sites that keep producing new
+jobs are revisited more often, quiet sites drift towards the maximum
+interval, and failing sites back off exponentially. Sites sit in a heap
+keyed by their next due time; each tick crawls at most `budget` of the
+most overdue ones.
+"""
+
+import heapq
+import json
+import os
+import threading
+import time
+
+CHANGED = 'changed'
+UNCHANGED = 'unchanged'
+ERROR = 'error'
+
+class SiteScheduler:
+    """Per-site intervals, change/error history and a next-due priority queue"""
+
+    def __init__(self, path, min_interval=15 * 60, default_interval=30 * 60, max_interval=24 * 3600,
+                 speedup=0.5, slowdown=1.5):
+        self.path = path
+        self.min_interval = min_interval
+        self.default_interval = default_interval
+        self.max_interval = max_interval
+        self.speedup = speedup  # Interval multiplier after a change
+        self.slowdown = slowdown  # Interval multiplier after an unchanged check
+        self.sites = {}
+        self.heap = []  # (next_due, url); stale entries are skipped lazily
+        self.lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                self.sites = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.sites = {}
+        self.heap = [(state['next_due'], url) for url, state in self.sites.items()]
+        heapq.heapify(self.heap)
+        return self
+
+    def save(self):
+        with self.lock:
+            data = json.dumps(self.sites, indent=2)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def _state(self, url, now):
+        if url not in self.sites:
+            self.sites[url] = {
+                'interval': self.default_interval,
+                'next_due': now,
+                'last_checked': None,
+                'checks': 0,
+                'changes': 0,
+                'errors': 0,
+                'consecutive_errors': 0
+            }
+            heapq.heappush(self.heap, (now, url))
+        return self.sites[url]
+
+    def due(self, websites, budget, now=None):
+        """Up to `budget` WEBSITES entries whose next check is due, most overdue first"""
+        now = now or time.time()
+        by_url = {site['url']: site for site in websites}
+        picked = []
+        with self.lock:
+            for url in by_url:
+                self._state(url, now)
+            skipped = []
+            while self.heap and len(picked) < budget:
+                next_due, url = self.heap[0]
+                if next_due > now:
+                    break
+                heapq.heappop(self.heap)
+                state = self.sites.get(url)
+                if state is None or state['next_due'] != next_due:
+                    continue  # Stale entry; the site was rescheduled
+                if url not in by_url:
+                    skipped.append((next_due, url))  # No longer configured
+                    continue
+                if by_url[url] in picked:
+                    continue  # Duplicate heap entry
+                picked.append(by_url[url])
+            for entry in skipped:
+                heapq.heappush(self.heap, entry)
+            # Picked sites stay due until record() reschedules them
+            for site in picked:
+                heapq.heappush(self.heap, (self.sites[site['url']]['next_due'], site['url']))
+        return picked
+
+    def record(self, url, outcome, now=None):
+        """Reschedule a site after a check with outcome CHANGED, UNCHANGED or ERROR"""
+        now = now or time.time()
+        with self.lock:
+            state = self._state(url, now)
+            state['checks'] += 1
+            state['last_checked'] = now
+            if outcome == ERROR:
+                state['errors'] += 1
+                state['consecutive_errors'] += 1
+                # Back off failing sites exponentially without touching their learned interval
+                delay = min(self.max_interval, state['interval'] * (2 ** state['consecutive_errors']))
+            else:
+                state['consecutive_errors'] = 0
+                if outcome == CHANGED:
+                    state['changes'] += 1
+                    state['interval'] = max(self.min_interval, state['interval'] * self.speedup)
+                else:
+                    state['interval'] = min(self.max_interval, state['interval'] * self.slowdown)
+                delay = state['interval']
+            state['next_due'] = now + delay
+            heapq.heappush(self.heap, (state['next_due'], url))
+
+    def next_due(self):
+        """Earliest next_due across known sites, or None"""
+        with self.lock:
+            return min((state['next_due'] for state in self.sites.values()), default=None)
@@ -0,0 +1,23 @@
+import pytest
+
+from ats_sources import SourceAdapter, find_source
+
+@pytest.mark.parametrize('url, feed', [
+    ('https://jobs.lever.co/acme', 'https://api.lever.co/v0/postings/acme?mode=json'),
+    ('https://jobs.eu.lever.co/acme/', 'https://api.eu.lever.co/v0/postings/acme?mode=json'),
+    ('https://boards.greenhouse.io/acme', 'https://boards-api.greenhouse.io/v1/boards/acme/jobs?content=true'),
+    ('https://jobs.ashbyhq.com/acme', 'https://api.ashbyhq.com/posting-api/job-board/acme'),
+])
+def test_feed_urls(url, feed):
+    assert find_source(url)[1] == feed
+
+def test_other_hosts_have_no_source():
+    assert find_source('https://example.com/careers') is None
+
+def test_adapters_must_implement_the_feed():
+    class Incomplete(SourceAdapter):
+        def listings(self, data):
+            return []
+
+    with pytest.raises(TypeError):
+        Incomplete()
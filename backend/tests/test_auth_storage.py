@@ -0,0 +1,74 @@
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from flask import Flask
+
+import migrate_auth_data
+from auth_storage import AuthRepository, JsonRepository, SqlRepository, parse_timestamp
+from auth_stats import signup_day
+from models import db
+
+@pytest.fixture
+def utc_plus_two(monkeypatch):
+    monkeypatch.setenv('TZ', 'EET-2')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_repositories_must_implement_every_operation():
+    with pytest.raises(TypeError):
+        AuthRepository()
+
+def test_legacy_local_timestamps_are_converted_to_utc(utc_plus_two):
+    assert parse_timestamp('2026-10-18T01:30:00') == datetime(2026, 10, 17, 23, 30)
+    assert parse_timestamp('2026-10-18T01:30:00+00:00') == datetime(2026, 10, 18, 1, 30)
+    assert signup_day('2026-10-18T01:30:00') == '2026-10-17'
+    assert signup_day(datetime(2026, 10, 18, 1, 30)) == '2026-10-18'  # Database values are already UTC
+
+def test_json_and_migrated_database_agree_on_signup_days(tmp_path, utc_plus_two):
+    users_path, onboarding_path = str(tmp_path / 'users.json'), str(tmp_path / 'onboarding.json')
+    json_repo = JsonRepository(users_path, onboarding_path)
+    day = date.today() - timedelta(days=5)
+    before = day - timedelta(days=1)
+    # Local 01:30 at UTC+2 is 23:30 UTC the day before
+    created = [f'{day}T01:30:00', f'{before}T12:00:00', datetime.now().isoformat(), f'{before}T22:30:00+00:00']
+    for number, created_at in enumerate(created):
+        json_repo.add_user({'id': str(number), 'email': f'user{number}@example.com', 'password_hash': 'x',
+                            'created_at': created_at, 'is_admin': number == 0})
+    json_repo.users.compact()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'auth.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        migrate_auth_data.migrate(users_path, onboarding_path)
+        sql_stats = SqlRepository(db).stats(days=30)
+    json_stats = json_repo.stats(days=30)
+    assert json_stats == sql_stats
+    days = {entry['date']: entry['count'] for entry in json_stats['signups'] if entry['count']}
+    assert days.get(before.isoformat()) == 3
+
+def test_rerun_updates_changed_users_and_reports_id_conflicts(tmp_path):
+    users_path, onboarding_path = str(tmp_path / 'users.json'), str(tmp_path / 'onboarding.json')
+    json_repo = JsonRepository(users_path, onboarding_path)
+    json_repo.add_user({'id': '1', 'email': 'paid@example.com', 'password_hash': 'old'})
+    json_repo.users.compact()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'auth.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        migrate_auth_data.migrate(users_path, onboarding_path)
+        json_repo.update_user('paid@example.com', password_hash='new', payment_completed=True, is_admin=True)
+        json_repo.add_user({'id': '1', 'email': 'clash@example.com', 'password_hash': 'x'})
+        json_repo.users.compact()
+        counts = migrate_auth_data.migrate(users_path, onboarding_path)
+        user = SqlRepository(db).get_user('paid@example.com')
+        assert SqlRepository(db).get_user('clash@example.com') is None
+    assert (counts['users'], counts['users_updated'], counts['users_skipped']) == (0, 1, 0)
+    assert counts['users_id_conflicts'] == ['clash@example.com']
+    assert (user['password_hash'], user['payment_completed'], user['is_admin']) == ('new', True, True)
@@ -0,0 +1,58 @@
+import pytest
+
+import main
+from crawl_metrics import CrawlMetrics, ParsedJobs
+from http_cache import NOT_MODIFIED
+from job_store import JobStore
+from site_scheduler import SiteScheduler
+
+URL = 'https://example.com/careers'
+
+def job(title):
+    listed = main.filter_listings([(title, '/jobs/1', 'Remote role working with React')], URL)
+    return listed[0]
+
+@pytest.fixture
+def crawl(tmp_path, monkeypatch):
+    """check_websites on a temporary store, with crawl results supplied by the test"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, 'job_store', JobStore(str(tmp_path / 'jobs.db')))
+    monkeypatch.setattr(main, 'site_scheduler', SiteScheduler(str(tmp_path / 'schedule.json')))
+    monkeypatch.setattr(main, 'crawl_metrics', CrawlMetrics(str(tmp_path / 'metrics.json')))
+    monkeypatch.setattr(main, 'dedup_index', None)
+    monkeypatch.setattr(main, 'SEND_EMAILS', False)
+    monkeypatch.setattr(main, 'CRAWL_WORKERS', 0)
+    monkeypatch.setattr(main, 'CRAWL_FRONTIER', False)
+
+    def run(jobs):
+        monkeypatch.setattr(main, 'crawl_websites', lambda websites, parse, **options: {URL: jobs})
+        main.check_websites(websites=[{'url': URL, 'selector': 'a'}])
+        return main.job_store.load_all(canonical_only=False).get(URL, [])
+    return run
+
+def test_page_without_matching_listings_retires_the_stored_jobs(crawl):
+    assert len(crawl(ParsedJobs([job('Full Stack Engineer')], listings=1))) == 1
+    assert crawl(ParsedJobs(listings=3)) == []
+    assert main.dedup_index.signatures == {}
+
+def test_page_without_any_listings_keeps_the_stored_jobs(crawl):
+    crawl(ParsedJobs([job('Full Stack Engineer')], listings=1))
+    assert len(crawl(ParsedJobs(listings=0))) == 1
+
+def test_unchanged_and_failed_pages_keep_the_stored_jobs(crawl):
+    crawl(ParsedJobs([job('Full Stack Engineer')], listings=1))
+    assert len(crawl(NOT_MODIFIED)) == 1
+    assert len(crawl(None)) == 1
+
+def test_empty_store_fetches_without_validators(crawl, monkeypatch):
+    validators = main.ValidatorCache(main.HTTP_CACHE_FILE)
+    validators.is_unchanged(URL, 200, {'ETag': '"v1"'}, b'page')
+    validators.save()
+    sent = []
+
+    def crawl_websites(websites, parse, cache, **options):
+        sent.append(cache.request_headers(URL))
+        return {URL: ParsedJobs([job('Full Stack Engineer')], listings=1)}
+    monkeypatch.setattr(main, 'crawl_websites', crawl_websites)
+    main.check_websites(websites=[{'url': URL, 'selector': 'a'}])
+    assert sent == [{}]
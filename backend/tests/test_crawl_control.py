@@ -0,0 +1,22 @@
+import os
+
+from crawl_control import read_run, request_refresh, take_refresh_request
+
+def test_request_is_claimed_once(tmp_path):
+    request_path, status_path = str(tmp_path / 'refresh.json'), str(tmp_path / 'status.json')
+    status, coalesced = request_refresh(request_path, status_path)
+    assert not coalesced
+    assert request_refresh(request_path, status_path) == (status, True)
+    assert read_run(request_path, status_path, status['job_id']) == status
+
+    assert take_refresh_request(request_path) == status
+    assert take_refresh_request(request_path) is None
+    assert os.listdir(tmp_path) == []
+
+def test_concurrent_requests_share_one_file(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    request_path, status_path = str(tmp_path / 'refresh.json'), str(tmp_path / 'status.json')
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: request_refresh(request_path, status_path), range(32)))
+    assert len({status['job_id'] for status, _ in results}) == 1
+    assert [coalesced for _, coalesced in results].count(False) == 1
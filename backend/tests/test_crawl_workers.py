@@ -0,0 +1,51 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import crawl_workers
+from crawl_workers import crawl_in_processes
+from rate_limiter import DomainRateLimiter
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(429)
+        self.send_header('Retry-After', '30')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+def parse(html, url, selector):
+    return []
+
+@pytest.fixture
+def throttling_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ThrottlingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}/careers'
+    server.shutdown()
+
+def test_limiter_state_round_trips():
+    limiter = DomainRateLimiter(rate=2.0)
+    limiter.throttled('a.example', retry_after=30)
+    other = DomainRateLimiter(**limiter.options())
+    other.merge(limiter.export({'a.example'}))
+    assert other.rate('a.example') == 1.0
+    assert 29 < other.export()['a.example']['blocked_for'] <= 30
+
+def test_workers_send_throttling_back_to_the_coordinator(throttling_server):
+    limiter = DomainRateLimiter(rate=2.0)
+    results = crawl_in_processes([{'url': throttling_server, 'selector': 'a'}], parse, workers=1,
+                                 limiter=limiter, retries=0)
+    assert results == {throttling_server: None}
+    assert limiter.rate('127.0.0.1') < 2.0
+    assert limiter.export()['127.0.0.1']['blocked_for'] > 0
+
+def test_workers_are_kept_between_cycles(throttling_server):
+    sites = [{'url': throttling_server, 'selector': 'a'}]
+    crawl_in_processes(sites, parse, workers=1, retries=0)
+    pids = [process.pid for process in crawl_workers._pool.processes]
+    assert crawl_in_processes(sites, parse, workers=1, retries=0) == {throttling_server: None}
+    assert [process.pid for process in crawl_workers._pool.processes] == pids
@@ -0,0 +1,35 @@
+import pytest
+
+from html_parsers import StreamingExtractor, extract_listings
+
+PAGE = '''<ul>
+<li class="job">
+  <noscript><h2>Enable JavaScript</h2><a href="/no-js">Jobs</a></noscript>
+  <h2>Full Stack Engineer<script>track()</script></h2>
+  <noscript><p>Please enable JavaScript</p></noscript>
+  <p>React and <style>.x {}</style>Python, remote</p>
+  <a href="">Share</a>
+  <a href=" /jobs/1 ">Apply</a>
+</li>
+<li class="job"><h3>Backend Engineer</h3><a href="   ">Apply</a></li>
+</ul>'''
+
+EXPECTED = [
+    ('Full Stack Engineer', '/jobs/1', 'React andPython, remote'),
+    ('Backend Engineer', '', 'Backend EngineerApply'),
+]
+
+@pytest.mark.parametrize('backend', ['selectolax', 'lxml', 'bs4'])
+def test_backends_agree_on_hidden_text_and_blank_links(backend):
+    assert list(extract_listings(PAGE, 'li.job', backend)) == EXPECTED
+
+def test_streaming_matches_the_backends():
+    extractor = StreamingExtractor('li.job')
+    assert extractor.feed(PAGE.encode()) + extractor.close() == EXPECTED
+
+def test_streaming_falls_back_to_buffered_without_lxml(monkeypatch):
+    import crawler
+    monkeypatch.setattr(crawler, 'LXML_AVAILABLE', False)
+    ctx = crawler.CrawlContext(None, None, concurrency=1, per_host=1, listing_filter=lambda listings, url: [],
+                               stream=True)
+    assert not ctx.stream and ctx.stream_executor is None
@@ -0,0 +1,67 @@
+import asyncio
+
+import httpx
+import pytest
+
+from crawler import CrawlContext, fetch_site
+from http_cache import NOT_MODIFIED, ValidatorCache
+
+URL = 'https://example.com/careers'
+PAGE = b'<html><body><a class="job" href="/1">Engineer</a></body></html>'
+
+def test_first_response_is_changed_and_stored():
+    cache = ValidatorCache(None)
+    assert not cache.is_unchanged(URL, 200, {'ETag': '"v1"'}, PAGE)
+    assert cache.request_headers(URL) == {'If-None-Match': '"v1"'}
+    assert cache.dirty
+
+def test_same_body_is_unchanged():
+    cache = ValidatorCache(None)
+    cache.is_unchanged(URL, 200, {}, PAGE)
+    assert cache.is_unchanged(URL, 200, {}, PAGE)
+    assert not cache.is_unchanged(URL, 200, {}, PAGE + b' ')
+
+def test_304_needs_a_known_entry():
+    cache = ValidatorCache(None)
+    assert not cache.is_unchanged(URL, 304, {})
+    cache.is_unchanged(URL, 200, {'Last-Modified': 'Sun, 18 Oct 2026 00:00:00 GMT'}, PAGE)
+    assert cache.is_unchanged(URL, 304, {})
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'validators.json')
+    cache = ValidatorCache(path)
+    cache.is_unchanged(URL, 200, {'ETag': '"v1"'}, PAGE)
+    cache.save()
+    assert not cache.dirty
+    assert ValidatorCache(path).load().entries == cache.entries
+
+def test_forget_makes_the_next_fetch_unconditional():
+    cache = ValidatorCache(None)
+    cache.is_unchanged(URL, 200, {'ETag': '"v1"'}, PAGE)
+    cache.forget(URL)
+    assert cache.request_headers(URL) == {}
+    assert not cache.is_unchanged(URL, 200, {}, PAGE)
+
+async def fetch_twice(cache, parse):
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, headers={'ETag': '"v1"'}, content=PAGE))
+    async with httpx.AsyncClient(transport=transport) as client:
+        site = {'url': URL, 'selector': 'a.job'}
+        ctx = CrawlContext(client, parse, concurrency=1, per_host=1, cache=cache, retries=0)
+        with pytest.raises(ValueError):
+            await fetch_site(ctx, site)
+        return await fetch_site(ctx, site)
+
+def test_failed_parse_does_not_leave_the_page_unchanged():
+    calls = []
+
+    def parse(html, url, selector):
+        calls.append(url)
+        if len(calls) == 1:
+            raise ValueError('broken page')
+        return []
+
+    cache = ValidatorCache(None)
+    jobs = asyncio.run(fetch_twice(cache, parse))
+    assert jobs is not NOT_MODIFIED
+    assert len(calls) == 2
+    assert cache.request_headers(URL) == {'If-None-Match': '"v1"'}
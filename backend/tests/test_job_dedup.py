@@ -0,0 +1,60 @@
+import job_dedup
+from job_dedup import DedupIndex, job_identity
+
+TITLE = 'Senior Full Stack Engineer'
+LINKEDIN = 'https://www.linkedin.com/jobs'
+
+def test_aggregator_copy_joins_the_direct_posting():
+    index = DedupIndex()
+    index.add(('https://stripe.com/jobs', 'a'), TITLE, 'stripe', 'Remote')
+    company, title = job_identity(LINKEDIN, None, f'{TITLE} at Stripe')
+    assert (company, title) == ('stripe', TITLE)
+    assert index.add((LINKEDIN, 'b'), title, company, 'Remote') == [('https://stripe.com/jobs', 'a')]
+
+def test_jobs_without_a_company_are_never_merged():
+    index = DedupIndex()
+    index.add(('https://stripe.com/jobs', 'a'), TITLE, 'stripe', 'Remote')
+    assert job_identity(LINKEDIN, None, TITLE) == ('', TITLE)
+    assert index.add((LINKEDIN, 'b'), TITLE, '', 'Remote') == []
+    assert index.add(('https://remote.co/jobs', 'c'), TITLE, '', 'Remote') == []
+    assert len({index.find(key) for key in index.parent}) == 3
+
+def test_same_site_jobs_are_never_merged():
+    index = DedupIndex()
+    index.add(('https://stripe.com/jobs', 'a'), TITLE, 'stripe', 'Remote')
+    assert index.add(('https://stripe.com/jobs', 'b'), TITLE, 'stripe', 'Remote') == []
+
+def test_other_companies_are_not_compared(monkeypatch):
+    calls = []
+    monkeypatch.setattr(job_dedup, 'similarity', lambda a, b: calls.append(1) or 1.0)
+    index = DedupIndex()
+    for number in range(50):
+        index.add((f'https://company{number}.com/jobs', 'a'), TITLE, f'company{number}', 'Remote')
+    assert calls == []
+
+def test_members_are_those_of_the_cluster():
+    index = DedupIndex()
+    direct = ('https://stripe.com/jobs', 'a')
+    copy = ('https://boards.greenhouse.io/stripe', 'b')
+    index.add(direct, TITLE, 'stripe', 'Remote')
+    index.add(copy, TITLE, 'stripe', 'Remote')
+    index.add(('https://figma.com/careers', 'c'), TITLE, 'figma', 'Remote')
+    assert sorted(index.members([copy])) == sorted([direct, copy])
+
+def test_removed_job_no_longer_matches():
+    index = DedupIndex()
+    retired = ('https://stripe.com/jobs', 'a')
+    index.add(retired, TITLE, 'stripe', 'Remote')
+    index.remove(retired)
+    assert index.add(('https://boards.greenhouse.io/stripe', 'b'), TITLE, 'stripe', 'Remote') == []
+    assert index.cluster_ids([retired]) == {retired: 'https://stripe.com/jobs|a'}
+
+def test_removed_job_that_returns_keeps_its_cluster():
+    index = DedupIndex()
+    direct = ('https://stripe.com/jobs', 'a')
+    copy = ('https://boards.greenhouse.io/stripe', 'b')
+    index.add(direct, TITLE, 'stripe', 'Remote')
+    index.add(copy, TITLE, 'stripe', 'Remote')
+    index.remove(direct)
+    assert index.add(direct, TITLE, 'stripe', 'Remote') == [copy]
+    assert index.find(direct) == index.find(copy)
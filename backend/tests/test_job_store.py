@@ -0,0 +1,83 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import main
+from job_store import JobStore
+
+START = datetime(2026, 10, 1, 9, 0)
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    for number in range(7):
+        site = f'https://site{number % 2}.example/jobs'
+        job = {'id': f'job{number}', 'title': f'Engineer {number}', 'link': '', 'technologies': ['react'],
+               'is_remote': number % 3 == 0, 'first_seen': (START + timedelta(hours=number // 2)).isoformat()}
+        store.upsert_jobs(site, [job])
+    return store
+
+def read_pages(store, **filters):
+    pages, after = [], None
+    while True:
+        rows = store.query_jobs(after=after, limit=3, **filters)
+        page = []
+        try:
+            while True:
+                page.append(next(rows))
+        except StopIteration as stop:
+            after = stop.value
+        pages.append([job['id'] for job in page])
+        if after is None:
+            return pages
+
+def test_keyset_pages_cover_every_job_once_newest_first(store):
+    # first_seen ties in pairs; the (site, id) tie-breakers keep the pages disjoint
+    pages = read_pages(store)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    ids = [job_id for page in pages for job_id in page]
+    assert sorted(ids) == [f'job{number}' for number in range(7)]
+    rows = {job['id']: job for job in store.query_jobs(limit=10)}
+    keys = [(rows[job_id]['first_seen'], rows[job_id]['site'], job_id) for job_id in ids]
+    assert keys == sorted(keys, reverse=True)
+
+def test_filters_apply_to_every_page(store):
+    pages = read_pages(store, remote=True)
+    assert sorted(job_id for page in pages for job_id in page) == ['job0', 'job3', 'job6']
+
+def test_upsert_replaces_technologies(store):
+    site = 'https://site0.example/jobs'
+    store.upsert_jobs(site, [{'id': 'job0', 'title': 'Engineer 0', 'technologies': ['vue']}])
+    assert [job['id'] for job in store.query_jobs(technology='react', limit=10)].count('job0') == 0
+    [job] = [job for job in store.query_jobs(technology='vue', limit=10)]
+    assert job['id'] == 'job0' and job['technologies'] == ['vue']
+
+def test_search_and_technology_list(store):
+    store.upsert_jobs('https://site0.example/jobs', [{'id': 'job9', 'title': '100%_Remote Vue Dev', 'technologies': ['vue']}])
+    assert [job['id'] for job in store.query_jobs(search='engineer 4', limit=10)] == ['job4']
+    assert [job['id'] for job in store.query_jobs(search='%_remote', limit=10)] == ['job9']
+    assert [job['id'] for job in store.query_jobs(search='5%', limit=10)] == []
+    assert len(list(store.query_jobs(technology=['vue', 'react'], limit=10))) == 8
+
+def test_until_bound_is_exclusive(store):
+    until = (START + timedelta(hours=1)).isoformat()
+    assert sorted(job['id'] for job in store.query_jobs(until=until, limit=10)) == ['job0', 'job1']
+
+@pytest.fixture
+def utc_plus_two(monkeypatch):
+    monkeypatch.setenv('TZ', 'EET-2')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_offset_bounds_are_converted_to_stored_local_time(utc_plus_two):
+    query = main.parse_job_query({'since': '2026-10-01T07:00:00Z', 'until': '2026-10-01T10:00:00+02:00'})
+    assert query['since'] == '2026-10-01T09:00:00'
+    assert query['until'] == '2026-10-01T10:00:00'
+
+def test_naive_bounds_are_kept_and_bad_ones_rejected():
+    assert main.parse_job_query({'since': '2026-10-01'})['since'] == '2026-10-01T00:00:00'
+    with pytest.raises(ValueError):
+        main.parse_job_query({'until': 'yesterday'})
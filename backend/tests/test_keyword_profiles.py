@@ -0,0 +1,40 @@
+import json
+
+import main
+from job_store import JobStore
+from keyword_matcher import KeywordMatcher, KeywordProfile, load_keyword_profiles
+
+DEFAULT = KeywordProfile('default', ['remote'], ['full stack'], ['react'])
+
+def test_malformed_profiles_file_falls_back_to_the_default(tmp_path, capsys):
+    path = tmp_path / 'keyword_profiles.json'
+    path.write_text('{"data": {"full_stack": ["data engineer"],}')
+    assert [profile.name for profile in load_keyword_profiles(str(path), DEFAULT)] == ['default']
+    assert 'not valid JSON' in capsys.readouterr().out
+
+def test_profiles_of_the_wrong_shape_fall_back_to_the_default(tmp_path, capsys):
+    path = tmp_path / 'keyword_profiles.json'
+    for data in (['data'], {'data': ['data engineer']}, {'data': {'full_stack': 'data engineer'}}):
+        path.write_text(json.dumps(data))
+        assert [profile.name for profile in load_keyword_profiles(str(path), DEFAULT)] == ['default']
+        assert 'using the default keyword profile' in capsys.readouterr().out
+
+def test_extra_profiles_are_loaded(tmp_path):
+    path = tmp_path / 'keyword_profiles.json'
+    path.write_text(json.dumps({'data': {'remote': ['remote'], 'full_stack': ['data engineer']}}))
+    assert [profile.name for profile in load_keyword_profiles(str(path), DEFAULT)] == ['default', 'data']
+
+def test_jobs_remember_and_filter_by_matched_profiles(tmp_path, monkeypatch):
+    data = KeywordProfile('data', ['remote'], ['data engineer'], ['python'])
+    monkeypatch.setattr(main, 'keyword_matcher', KeywordMatcher([DEFAULT, data]))
+    jobs = main.filter_listings([
+        ('Full Stack Engineer', '/1', 'Remote, React'),
+        ('Data Engineer', '/2', 'Remote, Python'),
+        ('Sales Lead', '/3', 'Remote'),
+    ], 'https://example.com')
+    assert [job['profiles'] for job in jobs] == [['default'], ['data']]
+
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    store.upsert_jobs('https://example.com', jobs)
+    assert [job['title'] for job in store.query_jobs(profile='data')] == ['Data Engineer']
+    assert main.parse_job_query({'profile': 'data'})['profile'] == 'data'
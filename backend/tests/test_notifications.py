@@ -0,0 +1,15 @@
+from notifications import DigestNotifier
+
+class DroppedConnection:
+    def noop(self):
+        raise ConnectionResetError(104, 'Connection reset by peer')
+
+    def quit(self):
+        raise ConnectionResetError(104, 'Connection reset by peer')
+
+def test_reset_pooled_connection_is_replaced(monkeypatch):
+    notifier = DigestNotifier('localhost', 1025, 'from@example.com', '', ['to@example.com'], use_ssl=False)
+    fresh = object()
+    monkeypatch.setattr(notifier, '_connect', lambda: fresh)
+    notifier.smtp = DroppedConnection()
+    assert notifier.connection() is fresh
@@ -0,0 +1,17 @@
+import time
+
+import pytest
+
+from password_hashing import HasherBusy, PasswordHasher
+
+def test_timeout_is_reported_as_busy():
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=1, queue_limit=0, timeout=0.5)
+    try:
+        with pytest.raises(HasherBusy):
+            hasher._run(time.sleep, 1)
+        with pytest.raises(HasherBusy):
+            hasher.hash_password('secret')  # The slow job still holds the only slot
+        time.sleep(1)
+        assert hasher.hash_password('secret').startswith('pbkdf2:sha256:1000$')
+    finally:
+        hasher.shutdown()
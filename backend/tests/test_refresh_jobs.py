@@ -0,0 +1,45 @@
+import threading
+
+from refresh_jobs import CrawlRunner
+
+def wait_idle(runner):
+    for _ in range(200):
+        if runner.current() is None:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError('crawl did not finish')
+
+def test_full_refresh_waits_behind_a_partial_run():
+    release = threading.Event()
+    full_runs = []
+    runner = CrawlRunner(lambda progress: full_runs.append(1))
+
+    partial, _ = runner.start(lambda progress: release.wait(5))
+    full, coalesced = runner.start()
+    assert not coalesced
+    assert full['job_id'] != partial['job_id']
+    assert runner.start()[0]['job_id'] == full['job_id']  # Joins the queued one
+    assert runner.start(lambda progress: None) == (runner.current(), True)
+    assert full_runs == []
+
+    release.set()
+    wait_idle(runner)
+    assert full_runs == [1]
+    assert runner.get(full['job_id'])['status'] == 'completed'
+
+def test_full_refresh_joins_a_running_full_crawl():
+    release = threading.Event()
+    runner = CrawlRunner(lambda progress: release.wait(5))
+    first, _ = runner.start()
+    second, coalesced = runner.start()
+    assert coalesced and second['job_id'] == first['job_id']
+    release.set()
+    wait_idle(runner)
+
+def test_scheduler_tick_with_nothing_due_records_no_run(monkeypatch):
+    import main
+    runner = CrawlRunner(lambda progress: None)
+    monkeypatch.setattr(main, 'crawl_runner', runner)
+    monkeypatch.setattr(main.site_scheduler, 'due', lambda websites, budget: [])
+    main.start_due_crawl()
+    assert runner.snapshot() == ({}, None, None)
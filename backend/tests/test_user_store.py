@@ -0,0 +1,54 @@
+import json
+
+from user_store import UserStore, read_users
+
+def user(number, **fields):
+    return dict({'id': str(number), 'email': f'user{number}@example.com', 'password_hash': 'x'}, **fields)
+
+def new_store(tmp_path, compact_every=100):
+    return UserStore(str(tmp_path / 'users.json'), compact_every=compact_every)
+
+def test_log_is_replayed_over_the_snapshot(tmp_path):
+    store = new_store(tmp_path)
+    assert store.add('a@example.com', user(1))
+    assert not store.add('a@example.com', user(2))
+    store.add('b@example.com', user(3))
+    store.update('a@example.com', payment_completed=True)
+    store.delete('b@example.com')
+    # No close(): a crash leaves everything in the log, nothing in the snapshot
+    assert not (tmp_path / 'users.json').exists()
+
+    users, entries, torn = read_users(str(tmp_path / 'users.json'))
+    assert (entries, torn) == (4, False)
+    assert users == {'a@example.com': user(1, payment_completed=True)}
+    assert new_store(tmp_path).get('a@example.com') == user(1, payment_completed=True)
+
+def test_torn_last_line_is_dropped_and_later_writes_survive(tmp_path):
+    store = new_store(tmp_path)
+    store.add('a@example.com', user(1))
+    with open(tmp_path / 'users.json.wal', 'a') as f:
+        f.write('{"op": "put", "email": "b@exa')  # Crash in the middle of an append
+
+    assert read_users(str(tmp_path / 'users.json'))[1:] == (1, True)
+    reopened = new_store(tmp_path)
+    assert 'b@example.com' not in reopened
+    reopened.add('c@example.com', user(3))
+    assert sorted(new_store(tmp_path).all()) == ['a@example.com', 'c@example.com']
+
+def test_compaction_writes_the_snapshot_and_empties_the_log(tmp_path):
+    store = new_store(tmp_path, compact_every=3)
+    for number in range(4):
+        store.add(f'user{number}@example.com', user(number))
+    with open(tmp_path / 'users.json') as f:
+        assert sorted(json.load(f)) == [f'user{number}@example.com' for number in range(3)]
+    assert (tmp_path / 'users.json.wal').read_text().count('\n') == 1
+    store.close()
+    assert (tmp_path / 'users.json.wal').read_text() == ''
+    assert len(new_store(tmp_path)) == 4
+
+def test_lookups_return_copies(tmp_path):
+    store = new_store(tmp_path)
+    store.add('a@example.com', user(1))
+    store.get('a@example.com')['is_admin'] = True
+    store.all()['a@example.com']['role'] = 'admin'
+    assert store.get('a@example.com') == user(1)
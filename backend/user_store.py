@@ -0,0 +1,168 @@
+"""
+In-memory user index backed by a JSON snapshot and a write-ahead log
+
+The store reads users.json once and serves every lookup from a dict keyed
+by email, so login and /api/auth/me cost the same however many users
+there are. Each mutation is appended to a write-ahead log (one JSON line,
+fsynced) before it is applied in memory; after COMPACT_EVERY entries the
+index is written to a temporary snapshot, swapped in with os.replace and
+the log is truncated. On start the snapshot is loaded and the log replayed
+on top of it; a torn last line from a crash is ignored.
+
+Mutations are serialized by a lock, so concurrent registrations can
+neither overwrite each other nor both claim the same email. The store
+assumes one server process owns the files.
+"""
+
+import copy
+import json
+import os
+import threading
+
+COMPACT_EVERY = 500  # Log entries between snapshot rewrites
+
+def _fsync_dir(path):
+    if os.name != 'posix':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def write_json_atomic(path, data):
+    """Write JSON to a temporary file and swap it in, so readers never see a partial file"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+def _apply(users, entry):
+    if entry['op'] == 'put':
+        users[entry['email']] = entry['user']
+    elif entry['op'] == 'update':
+        users[entry['email']].update(entry['fields'])
+    elif entry['op'] == 'delete':
+        users.pop(entry['email'], None)
+
+def read_users(path, wal_path=None):
+    """(users, log entries replayed, torn) from a snapshot and its log, without writing either"""
+    try:
+        with open(path, 'r') as f:
+            users = json.load(f)
+    except FileNotFoundError:
+        users = {}
+    entries = 0
+    try:
+        with open(wal_path or f"{path}.wal", 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    return users, entries, True  # Torn write from a crash; nothing after it was acknowledged
+                _apply(users, entry)
+                entries += 1
+    except FileNotFoundError:
+        pass
+    return users, entries, False
+
+class UserStore:
+    """Users keyed by email: {email: user dict}"""
+
+    def __init__(self, path, wal_path=None, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.wal_path = wal_path or f"{path}.wal"
+        self.compact_every = compact_every
+        self.users = None
+        self.wal = None
+        self.wal_entries = 0
+        self.lock = threading.RLock()
+
+    def _load(self):
+        self.users, self.wal_entries, torn = read_users(self.path, self.wal_path)
+        if self.wal_entries or torn:
+            self.compact()  # Also drops a torn line that later appends would hide behind
+
+    def _ensure_loaded(self):
+        if self.users is None:
+            with self.lock:
+                if self.users is None:
+                    self._load()
+        return self.users
+
+    def _log(self, entry):
+        """Append an entry durably, then apply it to the index"""
+        if self.wal is None:
+            self.wal = open(self.wal_path, 'a')
+        self.wal.write(json.dumps(entry) + '\n')
+        self.wal.flush()
+        os.fsync(self.wal.fileno())
+        _apply(self.users, entry)
+        self.wal_entries += 1
+        if self.wal_entries >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Write the index as the new snapshot and start an empty log"""
+        with self.lock:
+            self._ensure_loaded()
+            write_json_atomic(self.path, self.users)
+            if self.wal is not None:
+                self.wal.close()
+            self.wal = open(self.wal_path, 'w')
+            self.wal_entries = 0
+
+    def get(self, email):
+        """Copy of a user, or None"""
+        user = self._ensure_loaded().get(email)
+        return copy.deepcopy(user) if user is not None else None
+
+    def __contains__(self, email):
+        return email in self._ensure_loaded()
+
+    def __len__(self):
+        return len(self._ensure_loaded())
+
+    def all(self):
+        """Copy of every user as {email: user}"""
+        with self.lock:
+            return copy.deepcopy(self._ensure_loaded())
+
+    def add(self, email, user):
+        """Insert a new user; False if the email is already taken"""
+        with self.lock:
+            if email in self._ensure_loaded():
+                return False
+            self._log({'op': 'put', 'email': email, 'user': user})
+            return True
+
+    def put(self, email, user):
+        """Insert or replace a user"""
+        with self.lock:
+            self._ensure_loaded()
+            self._log({'op': 'put', 'email': email, 'user': user})
+
+    def update(self, email, **fields):
+        """Change some fields of an existing user; False if there is no such user"""
+        with self.lock:
+            if email not in self._ensure_loaded():
+                return False
+            self._log({'op': 'update', 'email': email, 'fields': fields})
+            return True
+
+    def delete(self, email):
+        with self.lock:
+            if email not in self._ensure_loaded():
+                return False
+            self._log({'op': 'delete', 'email': email})
+            return True
+
+    def close(self):
+        with self.lock:
+            if self.wal is not None:
+                self.compact()
+                self.wal.close()
+                self.wal = None
@@ -1,22 +1,35 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import JobList from './components/JobList'
 import Header from './components/Header'
 import SearchAndFilter from './components/SearchAndFilter'
 import AuthFlow from './components/AuthFlow'
 import AdminDashboard from './components/AdminDashboard'
 import Profile from './components/Profile'
-import type { Job, JobSource } from './types/job'
-import { fetchJobs } from './services/jobService'
+import type { Job, JobPageQuery, PagedJob } from './types/job'
+import { fetchJobPage, fetchTechnologies, getRefreshStatus, refreshJobs } from './services/jobService'
 import { authService } from './services/authService'
 import './App.css'
 
+const toJob = ({ site, ...job }: PagedJob): Job => ({ ...job, source: site })
+
+const SEARCH_DEBOUNCE_MS = 300
+const REFRESH_POLL_MS = 2000
+
+const wait = (ms: number) => new Promise(resolve => setTimeout(resolve, ms))
+
 function App() {
-  const [jobs, setJobs] = useState<JobSource>({})
-  const [filteredJobs, setFilteredJobs] = useState<Job[]>([])
+  const [jobs, setJobs] = useState<Job[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [technologies, setTechnologies] = useState<string[]>([])
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
+  const [refreshing, setRefreshing] = useState(false)
   const [error, setError] = useState<string | null>(null)
   const [searchTerm, setSearchTerm] = useState('')
   const [selectedTechnologies, setSelectedTechnologies] = useState<string[]>([])
+  const [remoteOnly, setRemoteOnly] = useState(false)
+  // Responses for filters that have since changed are dropped
+  const latestRequest = useRef(0)
   const [isAuthenticated, setIsAuthenticated] = useState(false)
   const [authLoading, setAuthLoading] = useState(true)
   const [currentUser, setCurrentUser] = useState<any>(null)
@@ -28,13 +41,18 @@ function App() {
 
   useEffect(() => {
     if (isAuthenticated) {
-      loadJobs()
+      fetchTechnologies()
+        .then(setTechnologies)
+        .catch(err => console.error('Error loading technologies:', err))
     }
   }, [isAuthenticated])
 
+  // Filters run on the server, so a change starts again from the first page
   useEffect(() => {
-    filterJobs()
-  }, [jobs, searchTerm, selectedTechnologies])
+    if (!isAuthenticated) return
+    const timer = setTimeout(loadJobs, SEARCH_DEBOUNCE_MS)
+    return () => clearTimeout(timer)
+  }, [isAuthenticated, searchTerm, selectedTechnologies, remoteOnly])
 
   const checkAuthStatus = async () => {
     try {
@@ -53,7 +71,6 @@ function App() {
 
   const handleAuthComplete = () => {
     setIsAuthenticated(true)
-    loadJobs()
   }
 
   const handleLogout = () => {
@@ -61,69 +78,68 @@ function App() {
     setIsAuthenticated(false)
   }
 
+  const filterQuery = (): JobPageQuery => ({
+    search: searchTerm.trim() || undefined,
+    technology: selectedTechnologies.length > 0 ? selectedTechnologies.join(',') : undefined,
+    remote: remoteOnly || undefined
+  })
+
   const loadJobs = async () => {
+    const request = ++latestRequest.current
     try {
       setLoading(true)
-      const jobData = await fetchJobs()
-      setJobs(jobData)
+      const page = await fetchJobPage(filterQuery())
+      if (request !== latestRequest.current) return
+      setJobs(page.jobs.map(toJob))
+      setNextCursor(page.next_cursor)
       setError(null)
     } catch (err) {
       setError('Failed to load jobs. Please try again later.')
       console.error('Error loading jobs:', err)
     } finally {
-      setLoading(false)
+      if (request === latestRequest.current) setLoading(false)
     }
   }
 
-  const filterJobs = () => {
-    const allJobs: Job[] = []
-    
-    // Flatten all jobs from different sources
-    Object.entries(jobs).forEach(([source, sourceJobs]) => {
-      sourceJobs.forEach(job => {
-        allJobs.push({
-          ...job,
-          source: source
-        })
-      })
-    })
-
-    // Apply filters
-    let filtered = allJobs
-
-    // Search filter
-    if (searchTerm) {
-      filtered = filtered.filter(job =>
-        job.title.toLowerCase().includes(searchTerm.toLowerCase())
-      )
-    }
-
-    // Technology filter
-    if (selectedTechnologies.length > 0) {
-      filtered = filtered.filter(job =>
-        selectedTechnologies.some(tech =>
-          job.technologies.some(jobTech =>
-            jobTech.toLowerCase().includes(tech.toLowerCase())
-          )
-        )
-      )
+  // Crawl the sites again, then reload once the crawl has finished
+  const refreshAndReload = async () => {
+    try {
+      setRefreshing(true)
+      let status = await refreshJobs()
+      while (status.status === 'queued' || status.status === 'running') {
+        await wait(REFRESH_POLL_MS)
+        status = await getRefreshStatus(status.job_id)
+      }
+      if (status.status === 'failed') {
+        setError(status.error || 'Refresh failed. Please try again later.')
+        return
+      }
+      await loadJobs()
+    } catch (err) {
+      setError('Failed to refresh jobs. Please try again later.')
+      console.error('Error refreshing jobs:', err)
+    } finally {
+      setRefreshing(false)
     }
-
-    setFilteredJobs(filtered)
   }
 
-  const getUniqueTechnologies = (): string[] => {
-    const techs = new Set<string>()
-    Object.values(jobs).forEach(sourceJobs => {
-      sourceJobs.forEach(job => {
-        job.technologies.forEach(tech => techs.add(tech))
-      })
-    })
-    return Array.from(techs).sort()
-  }
-
-  const getTotalJobCount = (): number => {
-    return Object.values(jobs).reduce((total, sourceJobs) => total + sourceJobs.length, 0)
+  // Keyset pagination: each page resumes after the last job of the previous one
+  const loadMoreJobs = async () => {
+    if (!nextCursor) return
+    try {
+      setLoadingMore(true)
+      const request = latestRequest.current
+      const page = await fetchJobPage({ ...filterQuery(), cursor: nextCursor })
+      if (request !== latestRequest.current) return
+      setJobs(current => [...current, ...page.jobs.map(toJob)])
+      setNextCursor(page.next_cursor)
+      setError(null)
+    } catch (err) {
+      setError('Failed to load more jobs. Please try again later.')
+      console.error('Error loading more jobs:', err)
+    } finally {
+      setLoadingMore(false)
+    }
   }
 
   if (authLoading) {
@@ -155,9 +171,10 @@ function App() {
   return (
     <div className="min-h-screen bg-gradient-to-br from-white via-gray-50 to-gray-100">
       <Header 
-        totalJobs={getTotalJobCount()}
-        onRefresh={loadJobs}
-        loading={loading}
+        loadedJobs={jobs.length}
+        moreAvailable={nextCursor !== null}
+        onRefresh={refreshAndReload}
+        loading={loading || refreshing}
         onLogout={handleLogout}
         currentUser={currentUser}
         onViewChange={setCurrentView}
@@ -168,9 +185,11 @@ function App() {
         <SearchAndFilter
           searchTerm={searchTerm}
           onSearchChange={setSearchTerm}
-          technologies={getUniqueTechnologies()}
+          technologies={technologies}
           selectedTechnologies={selectedTechnologies}
           onTechnologiesChange={setSelectedTechnologies}
+          remoteOnly={remoteOnly}
+          onRemoteOnlyChange={setRemoteOnly}
         />
 
         {error && (
@@ -210,7 +229,20 @@ function App() {
             <p className="mt-4 text-gray-600 font-medium">Loading jobs<span className="loading-dots"></span></p>
           </div>
         ) : (
-          <JobList jobs={filteredJobs} />
+          <>
+            <JobList jobs={jobs} />
+            {nextCursor && (
+              <div className="flex justify-center mt-8">
+                <button
+                  onClick={loadMoreJobs}
+                  disabled={loadingMore}
+                  className="btn-secondary px-6 py-2 rounded-lg text-sm font-medium transition-all hover:shadow-medium disabled:opacity-50"
+                >
+                  {loadingMore ? 'Loading...' : 'Load more jobs'}
+                </button>
+              </div>
+            )}
+          </>
         )}
       </main>
     </div>
@@ -18,6 +18,7 @@ interface AdminStats {
   paid_users: number;
   users_with_onboarding: number;
   recent_users: number;
+  signups?: { date: string; count: number }[];
 }
 
 const AdminDashboard: React.FC = () => {
@@ -52,6 +53,8 @@ const AdminDashboard: React.FC = () => {
     }
   };
 
+  const signupPeak = Math.max(1, ...(stats?.signups ?? []).map((bucket) => bucket.count));
+
   const formatDate = (dateString: string) => {
     return new Date(dateString).toLocaleDateString('en-US', {
       year: 'numeric',
@@ -188,6 +191,27 @@ const AdminDashboard: React.FC = () => {
           </div>
         )}
 
+        {/* Daily signups */}
+        {stats?.signups && stats.signups.length > 0 && (
+          <Card className="mb-8">
+            <CardHeader>
+              <CardTitle>Signups (last {stats.signups.length} days)</CardTitle>
+            </CardHeader>
+            <CardContent>
+              <div className="flex items-end gap-1 h-32">
+                {stats.signups.map((bucket) => (
+                  <div
+                    key={bucket.date}
+                    className="flex-1 bg-blue-500 rounded-t"
+                    style={{ height: `${(bucket.count / signupPeak) * 100}%`, minHeight: bucket.count ? '2px' : '0' }}
+                    title={`${bucket.date}: ${bucket.count}`}
+                  />
+                ))}
+              </div>
+            </CardContent>
+          </Card>
+        )}
+
         {/* Users Table */}
         <Card className="mb-8">
           <CardHeader>
@@ -2,7 +2,8 @@ import React from 'react'
 import { RefreshCw, Briefcase, TrendingUp, Users, Zap, LogOut, Settings, Shield, User } from 'lucide-react'
 
 interface HeaderProps {
-  totalJobs: number
+  loadedJobs: number
+  moreAvailable: boolean
   onRefresh: () => void
   loading: boolean
   onLogout?: () => void
@@ -11,7 +12,7 @@ interface HeaderProps {
   currentView?: 'jobs' | 'admin' | 'profile'
 }
 
-const Header: React.FC<HeaderProps> = ({ totalJobs, onRefresh, loading, onLogout, currentUser, onViewChange, currentView }) => {
+const Header: React.FC<HeaderProps> = ({ loadedJobs, moreAvailable, onRefresh, loading, onLogout, currentUser, onViewChange, currentView }) => {
   return (
     <header className="bg-white shadow-sm border-b border-gray-200 sticky top-0 z-50">
       <div className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
@@ -42,7 +43,7 @@ const Header: React.FC<HeaderProps> = ({ totalJobs, onRefresh, loading, onLogout
                 <div className="flex items-center justify-center w-8 h-8 bg-gray-100 rounded-lg">
                   <TrendingUp className="w-4 h-4 text-gray-600" />
                 </div>
-                <p className="text-xs text-gray-500 mt-1">{totalJobs} jobs</p>
+                <p className="text-xs text-gray-500 mt-1">{loadedJobs}{moreAvailable ? '+' : ''} jobs</p>
               </div>
               
               <div className="text-center">
@@ -7,6 +7,8 @@ interface SearchAndFilterProps {
   technologies: string[]
   selectedTechnologies: string[]
   onTechnologiesChange: (techs: string[]) => void
+  remoteOnly: boolean
+  onRemoteOnlyChange: (remoteOnly: boolean) => void
 }
 
 const SearchAndFilter = ({
@@ -14,7 +16,9 @@ const SearchAndFilter = ({
   onSearchChange,
   technologies,
   selectedTechnologies,
-  onTechnologiesChange
+  onTechnologiesChange,
+  remoteOnly,
+  onRemoteOnlyChange
 }: SearchAndFilterProps) => {
   const [showFilters, setShowFilters] = useState(false)
 
@@ -29,9 +33,10 @@ const SearchAndFilter = ({
   const clearAllFilters = () => {
     onTechnologiesChange([])
     onSearchChange('')
+    onRemoteOnlyChange(false)
   }
 
-  const hasActiveFilters = searchTerm || selectedTechnologies.length > 0
+  const hasActiveFilters = searchTerm || selectedTechnologies.length > 0 || remoteOnly
 
   return (
     <div className="bg-white rounded-xl shadow-sm border border-gray-200 p-6 mb-6 animate-fade-in">
@@ -109,6 +114,15 @@ const SearchAndFilter = ({
               </button>
             ))}
           </div>
+          <label className="flex items-center space-x-2 mt-4 text-sm font-medium text-gray-700 cursor-pointer">
+            <input
+              type="checkbox"
+              checked={remoteOnly}
+              onChange={(e) => onRemoteOnlyChange(e.target.checked)}
+              className="rounded border-gray-300 text-black focus:ring-black"
+            />
+            <span>Remote only</span>
+          </label>
         </div>
       )}
 
@@ -132,6 +146,17 @@ const SearchAndFilter = ({
                 </button>
               </span>
             )}
+            {remoteOnly && (
+              <span className="inline-flex items-center px-3 py-1 rounded-lg text-sm bg-purple-100 text-purple-800 font-medium">
+                Remote only
+                <button
+                  onClick={() => onRemoteOnlyChange(false)}
+                  className="ml-1 text-purple-600 hover:text-purple-800 transition-colors"
+                >
+                  <X className="w-3 h-3" />
+                </button>
+              </span>
+            )}
             {selectedTechnologies.map((tech) => (
               <span
                 key={tech}
@@ -1,10 +1,20 @@
-import type { JobSource } from '../types/job'
+import type { JobPage, JobPageQuery, RefreshStatus } from '../types/job'
 
 const API_BASE_URL = 'http://localhost:8000'
 
-export const fetchJobs = async (): Promise<JobSource> => {
+export const fetchJobPage = async (query: JobPageQuery = {}): Promise<JobPage> => {
   try {
-    const response = await fetch(`${API_BASE_URL}/api/jobs`)
+    const params = new URLSearchParams()
+    Object.entries(query).forEach(([key, value]) => {
+      if (value !== undefined && value !== null && value !== '') {
+        params.set(key, String(value))
+      }
+    })
+    if (!params.has('limit')) {
+      params.set('limit', '50')
+    }
+
+    const response = await fetch(`${API_BASE_URL}/api/jobs?${params.toString()}`)
     
     if (!response.ok) {
       throw new Error(`HTTP error! status: ${response.status}`)
@@ -13,12 +23,28 @@ export const fetchJobs = async (): Promise<JobSource> => {
     const data = await response.json()
     return data
   } catch (error) {
-    console.error('Error fetching jobs:', error)
+    console.error('Error fetching job page:', error)
     throw error
   }
 }
 
-export const refreshJobs = async (): Promise<JobSource> => {
+export const fetchTechnologies = async (): Promise<string[]> => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/api/jobs/technologies`)
+    
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`)
+    }
+    
+    const data = await response.json()
+    return data
+  } catch (error) {
+    console.error('Error fetching technologies:', error)
+    throw error
+  }
+}
+
+export const refreshJobs = async (): Promise<RefreshStatus> => {
   try {
     const response = await fetch(`${API_BASE_URL}/api/jobs/refresh`, {
       method: 'POST'
@@ -35,3 +61,19 @@ export const refreshJobs = async (): Promise<JobSource> => {
     throw error
   }
 }
+
+export const getRefreshStatus = async (jobId: string): Promise<RefreshStatus> => {
+  try {
+    const response = await fetch(`${API_BASE_URL}/api/jobs/refresh/${encodeURIComponent(jobId)}`)
+    
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`)
+    }
+    
+    const data = await response.json()
+    return data
+  } catch (error) {
+    console.error('Error fetching refresh status:', error)
+    throw error
+  }
+}
@@ -1,12 +1,49 @@
 export interface Job {
+  id?: string
   title: string
   link: string
   technologies: string[]
   is_remote: boolean
   scraped_at: string
   source: string
+  location?: string | null
+  cluster_id?: string | null
+  profiles?: string[]
 }
 
-export interface JobSource {
-  [sourceUrl: string]: Omit<Job, 'source'>[]
+export interface PagedJob extends Omit<Job, 'source'> {
+  site: string
+  first_seen: string
+  last_seen: string
+}
+
+export interface JobPage {
+  jobs: PagedJob[]
+  next_cursor: string | null
+}
+
+export interface JobPageQuery {
+  limit?: number
+  cursor?: string
+  site?: string
+  search?: string
+  technology?: string  // Comma-separated; any of them matches
+  profile?: string
+  remote?: boolean
+  since?: string
+  until?: string
+  duplicates?: boolean
+}
+
+export interface RefreshStatus {
+  job_id: string
+  status: 'queued' | 'running' | 'completed' | 'failed'
+  sites_total: number | null
+  sites_done: number
+  sites_pending: number | null
+  requested_at: string
+  started_at: string | null
+  finished_at: string | null
+  error: string | null
+  coalesced?: boolean
 }